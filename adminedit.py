@@ -0,0 +1,253 @@
+"""
+Änderungen aus dem Admin-Bereich an Liga, Clubs, Spieler und Cheftrainer.
+
+Einzelne Formulare (update / delete / insert) und der Stapel-Modus
+(action "batch": viele Änderungen als JSON) laufen beide über apply_batch():
+alles in einer Transaktion auf einer Verbindung, gleichartige Updates und
+Deletes per executemany. Ist eine Zeile ungültig oder scheitert ein
+Statement (z. B. Fremdschlüssel), wird alles zurückgerollt. Die Ranglisten
+(leaderboards.py) werden in derselben Transaktion nachgeführt.
+
+Eine Änderung ist ein dict:
+    {"op": "update", "table": "Spieler", "pk": 12, "values": {"tore": "7"}}
+    {"op": "delete", "table": "Spieler", "pk": 12}
+    {"op": "insert", "table": "Spieler", "values": {"team": "3", "vorname": "Max", ...}}
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+
+import leaderboards
+import metrics
+import resultcache
+from db import db_read, get_conn
+from search import ADMIN_TABLES
+
+logger = logging.getLogger(__name__)
+
+ADMIN_BATCH_MAX = int(os.getenv("ADMIN_BATCH_MAX", "500"))
+
+PRIMARY_KEYS = {t: meta["pk"] for t, meta in ADMIN_TABLES.items()}
+
+# Whitelist: diese Spalten dürfen Admins ändern bzw. beim Einfügen setzen
+# (PKs sind AUTO_INCREMENT und werden nie aus dem Formular übernommen)
+UPDATABLE = {
+    "Liga": ("name", "land"),
+    "Clubs": ("liga", "tore", "gegentore", "name", "platzierung"),
+    "Spieler": ("team", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position"),
+    "Cheftrainer": ("team", "vorname", "nachname"),
+}
+INSERTABLE = UPDATABLE
+
+INT_COLUMNS = {t: tuple(c for c in meta["int"] if c != meta["pk"]) for t, meta in ADMIN_TABLES.items()}
+
+# Pflichtfelder beim Einfügen, mit der Meldung von früher
+REQUIRED = {
+    "Liga": (("name", "land"), "Liga: name und land sind Pflicht."),
+    "Clubs": (("name", "liga"), "Clubs: name und liga sind Pflicht."),
+    "Spieler": (("vorname", "team"), "Spieler: vorname und team sind Pflicht."),
+    "Cheftrainer": (("vorname", "team"), "Cheftrainer: vorname und team sind Pflicht."),
+}
+
+# Löschen: Kinder vor Eltern, sonst scheitert der Fremdschlüssel unnötig
+DELETE_ORDER = ("Spieler", "Cheftrainer", "Clubs", "Liga")
+
+
+class BatchError(ValueError):
+    """Ungültige Änderung; index = Position im Stapel (None = ganzer Stapel)."""
+
+    def __init__(self, message, index=None):
+        super().__init__(message if index is None else f"Änderung {index + 1}: {message}")
+        self.index = index
+
+
+@dataclass
+class BatchResult:
+    updated: dict = field(default_factory=dict)   # table -> [pk]
+    inserted: dict = field(default_factory=dict)  # table -> [neue pk]
+    deleted: dict = field(default_factory=dict)   # table -> [pk]
+
+    @property
+    def count(self):
+        return sum(len(v) for d in (self.updated, self.inserted, self.deleted) for v in d.values())
+
+    def changed_rows(self):
+        """table -> pks, die nach dem Speichern neu angezeigt werden sollen."""
+        out = {}
+        for d in (self.updated, self.inserted):
+            for table, pks in d.items():
+                out.setdefault(table, [])
+                out[table] += [pk for pk in pks if pk not in out[table]]
+        return out
+
+    def __str__(self):
+        parts = []
+        for label, d in (("geändert", self.updated), ("eingefügt", self.inserted), ("gelöscht", self.deleted)):
+            n = sum(len(v) for v in d.values())
+            if n:
+                parts.append(f"{n} {label}")
+        return ", ".join(parts) or "keine Änderungen"
+
+
+def _int_value(col, value, empty):
+    if value is None or str(value).strip() in ("", "None"):
+        return empty
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError(f"{col} muss eine Zahl sein") from None
+
+
+def validate(change, index=None):
+    """Eine Änderung prüfen -> (op, table, pk, {spalte: wert}); BatchError bei Unsinn."""
+    if not isinstance(change, dict):
+        raise BatchError("Ungültiges Format.", index)
+    op = change.get("op")
+    table = change.get("table")
+    if table not in PRIMARY_KEYS:
+        raise BatchError(f"Unbekannte Tabelle {table!r}.", index)
+    values = change.get("values") or {}
+    if not isinstance(values, dict):
+        raise BatchError("values muss ein Objekt sein.", index)
+
+    try:
+        if op in ("update", "delete"):
+            pk = _int_value(PRIMARY_KEYS[table], change.get("pk"), None)
+            if pk is None:
+                raise ValueError(f"{PRIMARY_KEYS[table]} fehlt")
+        if op == "delete":
+            return op, table, pk, {}
+
+        if op == "update":
+            unknown = set(values) - set(UPDATABLE[table])
+            if unknown:
+                raise ValueError(f"nicht änderbare Spalten: {', '.join(sorted(unknown))}")
+            if not values:
+                raise ValueError("Keine Felder zum Speichern gefunden.")
+            clean = {
+                c: _int_value(c, v, None) if c in INT_COLUMNS[table] else v
+                for c, v in values.items()
+            }
+            return op, table, pk, clean
+
+        if op == "insert":
+            required, message = REQUIRED[table]
+            if any(not values.get(c) for c in required):
+                raise ValueError(message)
+            clean = {}
+            for c in INSERTABLE[table]:
+                v = values.get(c)
+                clean[c] = _int_value(c, v, 0) if c in INT_COLUMNS[table] else v
+            return op, table, None, clean
+    except ValueError as e:
+        raise BatchError(str(e), index) from None
+
+    raise BatchError(f"Unbekannte Aktion {op!r}.", index)
+
+
+def _execute(cur, sql, params, many=False):
+    with metrics.timed_query(sql, "write") as q:
+        if many:
+            cur.executemany(sql, params)
+        else:
+            cur.execute(sql, params)
+        q.rows = cur.rowcount
+
+
+def _lock_rows(cur, ops):
+    """Betroffene Zeilen sperren (FOR UPDATE) und prüfen, dass es sie gibt."""
+    wanted = {}
+    for index, (op, table, pk, _) in enumerate(ops):
+        if op in ("update", "delete"):
+            wanted.setdefault(table, {}).setdefault(pk, index if len(ops) > 1 else None)
+    for table, pks in wanted.items():
+        pk_col = PRIMARY_KEYS[table]
+        marks = ", ".join(["%s"] * len(pks))
+        sql = f"SELECT {pk_col} FROM {table} WHERE {pk_col} IN ({marks}) FOR UPDATE"
+        _execute(cur, sql, tuple(pks))
+        found = {r[0] for r in cur.fetchall()}
+        for pk, index in pks.items():
+            if pk not in found:
+                raise BatchError(f"{table} {pk_col}={pk} gibt es nicht (mehr).", index)
+
+
+def apply_batch(changes):
+    """Alle Änderungen oder keine. Gibt BatchResult zurück."""
+    if not changes:
+        raise BatchError("Keine Änderungen.")
+    if len(changes) > ADMIN_BATCH_MAX:
+        raise BatchError(f"Höchstens {ADMIN_BATCH_MAX} Änderungen auf einmal.")
+    # Fehlermeldungen nur im Stapel mit "Änderung N:" davor
+    ops = [validate(c, i if len(changes) > 1 else None) for i, c in enumerate(changes)]
+    result = BatchResult()
+
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        _lock_rows(cur, ops)
+        # Ranglisten: alter Stand (Club vor einem Wechsel, Spieler gelöschter Clubs)
+        touched = leaderboards.Touched()
+        for table in PRIMARY_KEYS:
+            touched.add(conn, table, [pk for op, t, pk, _ in ops if t == table and op != "insert"])
+
+        # 1) Updates: gleiche Tabelle + gleiche Spalten -> ein executemany
+        groups = {}
+        for op, table, pk, values in ops:
+            if op == "update":
+                groups.setdefault((table, tuple(values)), []).append(tuple(values.values()) + (pk,))
+                result.updated.setdefault(table, []).append(pk)
+        for (table, cols), rows in groups.items():
+            sets = ", ".join(f"{c}=%s" for c in cols)
+            _execute(cur, f"UPDATE {table} SET {sets} WHERE {PRIMARY_KEYS[table]}=%s", rows, many=True)
+
+        # 2) Inserts einzeln, damit die neuen PKs bekannt sind
+        for op, table, _, values in ops:
+            if op == "insert":
+                cols = ", ".join(values)
+                marks = ", ".join(["%s"] * len(values))
+                _execute(cur, f"INSERT INTO {table} ({cols}) VALUES ({marks})", tuple(values.values()))
+                result.inserted.setdefault(table, []).append(cur.lastrowid)
+
+        # 3) Deletes: Kinder vor Eltern, pro Tabelle ein executemany
+        for table in DELETE_ORDER:
+            pks = [(pk,) for op, t, pk, _ in ops if op == "delete" and t == table]
+            if pks:
+                _execute(cur, f"DELETE FROM {table} WHERE {PRIMARY_KEYS[table]}=%s", pks, many=True)
+                result.deleted[table] = [pk for (pk,) in pks]
+
+        for table, pks in result.changed_rows().items():
+            touched.add(conn, table, pks)
+        leaderboards.refresh(conn, touched)
+        resultcache.bump(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+    resultcache.version.expire()
+
+    # gelöschte Zeilen nicht wieder anzeigen
+    for table, pks in result.deleted.items():
+        if table in result.updated:
+            result.updated[table] = [pk for pk in result.updated[table] if pk not in pks]
+    logger.info("admin batch: %s", result)
+    return result
+
+
+def fetch_rows(rows_by_table):
+    """Nur die geänderten Zeilen neu lesen: {table: [pk]} -> {table: [row-dict]}."""
+    out = {}
+    for table, pks in rows_by_table.items():
+        if not pks:
+            continue
+        cols = ", ".join(ADMIN_TABLES[table]["columns"])
+        marks = ", ".join(["%s"] * len(pks))
+        out[table] = db_read(
+            f"SELECT {cols} FROM {table} WHERE {PRIMARY_KEYS[table]} IN ({marks}) ORDER BY {PRIMARY_KEYS[table]}",
+            tuple(pks),
+        )
+    return out
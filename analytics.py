@@ -0,0 +1,174 @@
+"""
+Auswertungen über alle Spieler und Clubs, spaltenweise mit pandas/NumPy.
+
+load() liest Spieler und Clubs (mit Liga) in je einer Abfrage in
+DataFrames; compute() rechnet daraus ohne Schleife pro Zeile:
+
+    leagues          pro Liga: Clubs, Spieler, Kaderwert, Tore, Vorlagen und
+                     Perzentile (p50/p90/p99) von Toren, Vorlagen, Marktwert
+    efficiency       Spieler mit den meisten Scorerpunkten (Tore + Vorlagen)
+                     pro Mio. Marktwert, dazu ihr Perzentil in der Liga
+    goal_difference  Clubs nach Tordifferenz, mit Rang in der eigenen Liga
+    overperformers   Clubs, die besser platziert sind, als ihre Tordifferenz
+                     erwarten lässt (Rang nach Tordifferenz - Platzierung)
+
+summary() cached das Ergebnis im Ergebniscache (resultcache.py) bis zur
+nächsten Generation; berechnet wird höchstens einmal gleichzeitig.
+pandas wird erst beim ersten Aufruf geladen, nicht beim Start der App.
+
+    python tools/bench_analytics.py   # Laufzeit von 1k bis 1M Spielern
+"""
+import logging
+import os
+import threading
+import time
+
+import resultcache
+from db import get_conn
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_LIMIT = int(os.getenv("ANALYTICS_LIMIT", "25"))
+# Marktwert (Mio.) ab dem Scorerpunkte pro Mio. verglichen werden;
+# darunter ergibt jeder Treffer absurde Quoten
+ANALYTICS_MIN_VALUE = float(os.getenv("ANALYTICS_MIN_VALUE", "1"))
+QUANTILES = (0.5, 0.9, 0.99)
+
+PLAYER_COLUMNS = ("spielernr", "team", "vorname", "nachname", "position", "tore", "vorlagen", "marktwert")
+PLAYER_SQL = """
+    SELECT spielernr, team, vorname, nachname, position,
+           COALESCE(tore, 0), COALESCE(vorlagen, 0), COALESCE(marktwert, 0)
+    FROM Spieler
+"""
+CLUB_COLUMNS = ("teamnr", "liga", "club", "platzierung", "tore", "gegentore", "liga_name", "land")
+CLUB_SQL = """
+    SELECT C.teamnr, C.liga, C.name, COALESCE(C.platzierung, 0),
+           COALESCE(C.tore, 0), COALESCE(C.gegentore, 0), L.name, L.land
+    FROM Clubs C
+    JOIN Liga L ON L.liganr = C.liga
+"""
+INT_COLUMNS = ("tore", "vorlagen", "marktwert", "platzierung", "gegentore")
+
+_lock = threading.Lock()
+
+
+def frames(player_rows, club_rows):
+    """Zeilen (Tupel) -> (players, clubs) als DataFrames mit int64-Zahlenspalten."""
+    import pandas as pd
+
+    players = pd.DataFrame.from_records(player_rows, columns=PLAYER_COLUMNS)
+    clubs = pd.DataFrame.from_records(club_rows, columns=CLUB_COLUMNS)
+    for df in (players, clubs):
+        for col in INT_COLUMNS:
+            if col in df:
+                df[col] = df[col].astype("int64")
+    return players, clubs
+
+
+def load():
+    """Eine Abfrage pro Tabelle, alles in einem Rutsch -> (players, clubs)."""
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(PLAYER_SQL)
+        player_rows = cur.fetchall()
+        cur.execute(CLUB_SQL)
+        club_rows = cur.fetchall()
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+    return frames(player_rows, club_rows)
+
+
+def _records(df):
+    """DataFrame -> Liste von dicts mit Python-Typen, NaN -> None (für jsonify)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def compute(players, clubs, limit=ANALYTICS_LIMIT):
+    import numpy as np
+
+    clubs = clubs.assign(tordifferenz=clubs["tore"] - clubs["gegentore"])
+    p = players.merge(
+        clubs[["teamnr", "liga", "club", "liga_name"]], left_on="team", right_on="teamnr", how="inner", sort=False
+    )
+    p["scorer"] = p["tore"] + p["vorlagen"]
+    value = p["marktwert"].to_numpy(dtype="float64")
+    p["scorer_pro_mio"] = np.divide(
+        p["scorer"].to_numpy(dtype="float64"), value,
+        out=np.full(len(p), np.nan), where=value >= ANALYTICS_MIN_VALUE,
+    )
+    p["perzentil"] = p.groupby("liga")["scorer"].rank(pct=True) * 100
+
+    # Ligen
+    by_liga = p.groupby("liga")
+    leagues = by_liga.agg(
+        spieler=("spielernr", "size"),
+        tore=("tore", "sum"),
+        vorlagen=("vorlagen", "sum"),
+        kaderwert=("marktwert", "sum"),
+        marktwert_median=("marktwert", "median"),
+    )
+    quantiles = by_liga[["tore", "vorlagen", "marktwert"]].quantile(list(QUANTILES)).unstack()
+    quantiles.columns = [f"{col}_p{round(q * 100)}" for col, q in quantiles.columns]
+    leagues = (
+        clubs.groupby("liga")
+        .agg(name=("liga_name", "first"), land=("land", "first"), clubs=("teamnr", "size"))
+        .join(leagues)
+        .join(quantiles)
+    )
+    leagues[["spieler", "tore", "vorlagen", "kaderwert"]] = (
+        leagues[["spieler", "tore", "vorlagen", "kaderwert"]].fillna(0).astype("int64")
+    )
+    leagues = leagues.sort_values(["kaderwert", "name"], ascending=[False, True]).reset_index()
+
+    # Clubs: Rang nach Tordifferenz in der Liga gegen die Platzierung
+    clubs["kaderwert"] = clubs["teamnr"].map(p.groupby("team")["marktwert"].sum()).fillna(0).astype("int64")
+    clubs["rang_tordifferenz"] = clubs.groupby("liga")["tordifferenz"].rank(ascending=False, method="min").astype("int64")
+    clubs["abweichung"] = clubs["rang_tordifferenz"] - clubs["platzierung"]
+    club_cols = ["teamnr", "club", "liga_name", "platzierung", "tore", "gegentore", "tordifferenz",
+                 "rang_tordifferenz", "abweichung", "kaderwert"]
+    goal_difference = clubs.nlargest(limit, "tordifferenz")[club_cols]
+    placed = clubs[clubs["platzierung"] > 0]
+    overperformers = placed[placed["abweichung"] > 0].nlargest(limit, "abweichung")[club_cols]
+
+    efficiency = p[value >= ANALYTICS_MIN_VALUE].nlargest(limit, "scorer_pro_mio")[
+        ["spielernr", "vorname", "nachname", "club", "liga_name", "position", "tore", "vorlagen",
+         "marktwert", "scorer_pro_mio", "perzentil"]
+    ].round({"scorer_pro_mio": 2, "perzentil": 1})
+
+    return {
+        "players": int(len(p)),
+        "clubs": int(len(clubs)),
+        "leagues": _records(leagues.round(1)),
+        "efficiency": _records(efficiency),
+        "goal_difference": _records(goal_difference),
+        "overperformers": _records(overperformers),
+    }
+
+
+def summary():
+    """Ergebnis von compute() für den aktuellen Datenstand, aus dem Cache wenn möglich."""
+    key, result = resultcache.lookup("analytics", (ANALYTICS_LIMIT,))
+    if result is not None:
+        return result
+    with _lock:
+        # wer auf das Lock gewartet hat, findet das Ergebnis meist schon vor
+        key, result = resultcache.lookup("analytics", (ANALYTICS_LIMIT,))
+        if result is not None:
+            return result
+        t0 = time.perf_counter()
+        players, clubs = load()
+        t1 = time.perf_counter()
+        result = compute(players, clubs)
+        t2 = time.perf_counter()
+        result["generation"] = key[0] if key else None
+        result["seconds"] = {"load": round(t1 - t0, 3), "compute": round(t2 - t1, 3)}
+        resultcache.store(key, result)
+    logger.info(
+        "analytics: %d Spieler, %d Clubs, load %.2fs, compute %.2fs",
+        result["players"], result["clubs"], t1 - t0, t2 - t1,
+    )
+    return result
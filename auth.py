@@ -1,13 +1,76 @@
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from flask_login import LoginManager, UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from db import db_read, db_write
+import resultcache
 
 # Logger für dieses Modul
 logger = logging.getLogger(__name__)
 
 login_manager = LoginManager()
 
+# User-Cache für load_user(): spart pro Request einen DB-Roundtrip
+# (USER_CACHE_SIZE=0 schaltet ihn ab)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+
+class UserCache:
+    """
+    LRU mit TTL für User-Objekte, pro Prozess. Nach Änderungen an einem User
+    (Registrierung, Passwort, Username) invalidate() aufrufen.
+    """
+
+    def __init__(self, size=USER_CACHE_SIZE, ttl=USER_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._data = OrderedDict()  # user_id -> (ablauf, User)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                self._data.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            if entry:
+                del self._data[user_id]
+            self.misses += 1
+            return None
+
+    def put(self, user):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._data[user.id] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id=None, username=None):
+        """Einen User (per id oder username) oder ohne Argumente alles verwerfen."""
+        with self._lock:
+            if user_id is None and username is None:
+                self._data.clear()
+                return
+            for key, (_, user) in list(self._data.items()):
+                if key == user_id or (username is not None and user.username == username):
+                    del self._data[key]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "max_size": self.size}
+
+
+user_cache = UserCache()
+
 
 class User(UserMixin):
     def __init__(self, id, username, password):
@@ -61,11 +124,19 @@ class User(UserMixin):
 def load_user(user_id):
     logger.debug("load_user() aufgerufen mit user_id=%s", user_id)
     try:
-        user = User.get_by_id(int(user_id))
+        user_id = int(user_id)
     except ValueError:
         logger.error("load_user(): user_id=%r ist keine int", user_id)
         return None
 
+    user = user_cache.get(user_id)
+    if user:
+        return user
+
+    user = User.get_by_id(user_id)
+    if user:
+        user_cache.put(user)
+
     if user:
         logger.debug("load_user(): User gefunden: %s (id=%s)", user.username, user.id)
     else:
@@ -89,6 +160,10 @@ def register_user(username, password):
             "INSERT INTO users (username, password) VALUES (%s, %s)",
             (username, hashed)
         )
+        # falls ein alter Eintrag mit diesem Username noch im Cache liegt
+        user_cache.invalidate(username=username)
+        # ETags von /users verfallen lassen
+        resultcache.bump(dataset=resultcache.users_version)
         logger.info("register_user(): User '%s' erfolgreich angelegt", username)
     except Exception:
         logger.exception("Fehler beim Anlegen von User '%s'", username)
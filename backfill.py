@@ -0,0 +1,235 @@
+"""
+Backfill historischer Saisons in ClubSaison / SpielerSaison / TrainerSaison
+(db/migrations/006_season_history.sql).
+
+    python backfill.py --seasons 2015-2024 --leagues GB1,L1 --workers 3
+    python backfill.py --seasons 2023 --restart      # Checkpoints verwerfen
+    python backfill.py --seasons 2020-2024 --offline # nur aus dem HTML-Cache
+
+Arbeitseinheit ist (Saison, Liga). Einheiten laufen parallel, teilen sich
+aber den Fetcher aus transfermarktimport und damit den Token-Bucket pro
+Host: mehr Worker machen den Backfill nicht unhöflicher, sie überbrücken
+nur Wartezeiten. Nach der Tabellenseite und nach jedem Verein wird ein
+Checkpoint geschrieben (backfill_checkpoints); ein neuer Lauf macht dort
+weiter. Eine fehlgeschlagene Einheit (z. B. 403) hält die anderen nicht auf.
+"""
+import argparse
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import mysql.connector
+
+import transfermarktimport as tm
+from db import DB_CONFIG, bulk_insert
+
+logger = logging.getLogger("backfill")
+
+CLUB_COLUMNS = ("saison", "club_tm_id", "liga_tm_id", "name", "platzierung", "tore", "gegentore")
+SPIELER_COLUMNS = ("saison", "spieler_tm_id", "club_tm_id", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position")
+TRAINER_COLUMNS = ("saison", "club_tm_id", "trainer_tm_id", "vorname", "nachname")
+
+
+@dataclass
+class UnitResult:
+    season: int
+    league: str
+    clubs: int = 0
+    players: int = 0
+    skipped: int = 0  # schon per Checkpoint erledigte Schritte
+    seconds: float = 0.0
+    error: str = None
+    stats: str = ""
+
+    def __str__(self):
+        head = f"{self.league} {self.season}: "
+        if self.error:
+            return head + f"FEHLER {self.error}"
+        return head + (
+            f"{self.clubs} Vereine, {self.players} Spieler, {self.skipped} Schritte übersprungen, "
+            f"{self.seconds:.1f}s"
+        )
+
+
+def parse_seasons(text):
+    """"2019-2024" oder "2019,2021,2023" -> [2019, ...]"""
+    out = []
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            a, b = part.split("-", 1)
+            out.extend(range(int(a), int(b) + 1))
+        elif part:
+            out.append(int(part))
+    return sorted(set(out))
+
+
+def parse_leagues(text):
+    by_id = {l["wettbewerb_id"]: l for l in tm.TOP_LEAGUES}
+    if not text:
+        return list(tm.TOP_LEAGUES)
+    out = []
+    for wid in text.split(","):
+        wid = wid.strip().upper()
+        if wid not in by_id:
+            raise SystemExit(f"Unbekannte Liga {wid!r} (bekannt: {', '.join(by_id)})")
+        out.append(by_id[wid])
+    return out
+
+
+def _connect():
+    # eigene Verbindung pro Einheit: der Pool der Web-App ist dafür zu klein
+    return mysql.connector.connect(**DB_CONFIG)
+
+
+def _done_steps(cur, season, wid):
+    cur.execute("SELECT step FROM backfill_checkpoints WHERE saison=%s AND liga_tm_id=%s", (season, wid))
+    return {r[0] for r in cur.fetchall()}
+
+
+def _checkpoint(cur, season, wid, step, rows):
+    cur.execute(
+        """
+        INSERT INTO backfill_checkpoints (saison, liga_tm_id, step, rows_written) VALUES (%s, %s, %s, %s)
+        AS new ON DUPLICATE KEY UPDATE rows_written = new.rows_written, done_at = NOW()
+        """,
+        (season, wid, step, rows),
+    )
+
+
+def _upsert(conn, table, columns, rows, key_len):
+    if rows:
+        bulk_insert(table, columns, rows, conn=conn, update=columns[key_len:])
+
+
+def _stored_clubs(cur, season, league):
+    """Vereine einer schon erledigten Tabellenseite aus ClubSaison (für Wiederaufnahme)."""
+    cur.execute(
+        """
+        SELECT club_tm_id, name, platzierung, tore, gegentore FROM ClubSaison
+        WHERE saison=%s AND liga_tm_id=%s ORDER BY platzierung
+        """,
+        (season, league["wettbewerb_id"]),
+    )
+    return [
+        tm.ClubRow(0, league["liganr"], name, tm_id, platz, tore, gegentore, league["wettbewerb_id"])
+        for tm_id, name, platz, tore, gegentore in cur.fetchall()
+    ]
+
+
+def reset_checkpoints(seasons, leagues):
+    conn = _connect()
+    try:
+        cur = conn.cursor()
+        for season in seasons:
+            for l in leagues:
+                cur.execute(
+                    "DELETE FROM backfill_checkpoints WHERE saison=%s AND liga_tm_id=%s",
+                    (season, l["wettbewerb_id"]),
+                )
+        conn.commit()
+        cur.close()
+    finally:
+        conn.close()
+
+
+def run_unit(season, league):
+    """Eine (Saison, Liga)-Einheit, ab dem letzten Checkpoint."""
+    wid = league["wettbewerb_id"]
+    result = UnitResult(season, wid)
+    t0 = time.perf_counter()
+    conn = _connect()
+    cur = conn.cursor()
+    try:
+        done = _done_steps(cur, season, wid)
+
+        # 1) Tabellenseite -> ClubSaison
+        if "standings" in done:
+            clubs = _stored_clubs(cur, season, league)
+            result.skipped += 1
+        else:
+            clubs = list(tm.iter_clubs([league], season=season))
+            _upsert(conn, "ClubSaison", CLUB_COLUMNS, [
+                (season, c.tm_id, wid, c.name, c.platz, c.tore, c.gegentore) for c in clubs
+            ], 2)
+            _checkpoint(cur, season, wid, "standings", len(clubs))
+            conn.commit()
+        result.clubs = len(clubs)
+
+        # 2) Vereinsseiten -> SpielerSaison / TrainerSaison, Checkpoint pro Verein
+        todo = [c for c in clubs if f"club:{c.tm_id}" not in done]
+        result.skipped += len(clubs) - len(todo)
+        squads = tm.SquadPipeline(todo, season=season)
+        parsed = squads.stats.stage("parse", squads.parse(squads.stats.stage("fetch", squads.fetch())))
+        for parsed_club in parsed:
+            club = parsed_club[0]
+            players, coach = squads.normalize_club(*parsed_club)
+            _upsert(conn, "SpielerSaison", SPIELER_COLUMNS, [
+                (season, p.tm_id, club.tm_id, p.vorname, p.nachname, p.tore, p.vorlagen, p.marktwert, p.position)
+                for p in players
+            ], 3)
+            if coach:
+                _upsert(conn, "TrainerSaison", TRAINER_COLUMNS, [
+                    (season, club.tm_id, coach.tm_id, coach.vorname, coach.nachname)
+                ], 3)
+            _checkpoint(cur, season, wid, f"club:{club.tm_id}", len(players))
+            conn.commit()
+            result.players += len(players)
+        result.stats = str(squads.stats)
+    except Exception as e:
+        conn.rollback()
+        result.error = str(e)
+        logger.exception("%s %s fehlgeschlagen", wid, season)
+    finally:
+        cur.close()
+        conn.close()
+    result.seconds = time.perf_counter() - t0
+    return result
+
+
+def backfill(seasons, leagues, workers=2):
+    """Alle Einheiten abarbeiten, gibt [UnitResult] zurück (Reihenfolge = fertig)."""
+    units = [(season, l) for season in seasons for l in leagues]
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="backfill") as ex:
+        futures = [ex.submit(run_unit, season, l) for season, l in units]
+        for fut in as_completed(futures):
+            r = fut.result()
+            logger.info("%s", r)
+            if r.stats:
+                logger.info("  %s", r.stats)
+            results.append(r)
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Historische Saisons von Transfermarkt nachladen")
+    ap.add_argument("--seasons", required=True, help="z. B. 2019-2024 oder 2019,2021")
+    ap.add_argument("--leagues", default="", help="Wettbewerbs-IDs, z. B. GB1,L1 (Standard: alle)")
+    ap.add_argument("--workers", type=int, default=2, help="parallele (Saison, Liga)-Einheiten")
+    ap.add_argument("--restart", action="store_true", help="Checkpoints der Einheiten vorher löschen")
+    ap.add_argument("--offline", action="store_true", help="nur aus dem HTML-Cache lesen")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    seasons = parse_seasons(args.seasons)
+    leagues = parse_leagues(args.leagues)
+    if args.offline:
+        tm.set_offline(True)
+    if args.restart:
+        reset_checkpoints(seasons, leagues)
+
+    results = backfill(seasons, leagues, args.workers)
+    failed = [r for r in results if r.error]
+    print(f"{len(results) - len(failed)}/{len(results)} Einheiten fertig.")
+    for r in sorted(results, key=lambda r: (r.season, r.league)):
+        print(f"  {r}")
+    if failed:
+        print("Erneut starten, um bei den Checkpoints weiterzumachen.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
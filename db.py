@@ -1,6 +1,20 @@
 from dotenv import load_dotenv
 import os
-from mysql.connector import pooling
+import time
+import logging
+import tempfile
+import threading
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import mysql.connector
+from mysql.connector.errors import PoolError
+
+import metrics
+
+logger = logging.getLogger(__name__)
 
 load_dotenv()
 
@@ -11,17 +25,222 @@ DB_CONFIG = {
     "database": os.getenv("DB_DATABASE"),
 }
 
+# PythonAnywhere free: max_user_connections ist klein -> Pool klein halten
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "2"))
+# zusätzliche Verbindungen für Lastspitzen, werden nach Gebrauch geschlossen
+POOL_OVERFLOW = int(os.getenv("DB_POOL_OVERFLOW", "0"))
+# so lange wartet get_conn() auf eine freie Verbindung (Sekunden)
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+# höchstens so viele Threads warten gleichzeitig, danach sofort PoolTimeout
+POOL_MAX_WAITERS = int(os.getenv("DB_POOL_MAX_WAITERS", "32"))
+# Verbindungen nach so vielen Sekunden neu aufbauen (unter MySQL wait_timeout,
+# PythonAnywhere: 300s)
+POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "280"))
+# länger ungenutzte Verbindungen vor der Ausgabe anpingen
+POOL_PING_IDLE = float(os.getenv("DB_POOL_PING_IDLE", "30"))
+
+# "parallel": Multi-Query-Seiten verteilen ihre Abfragen auf den Pool
+# "serial":   alte Variante, eine Abfrage nach der anderen
+DB_FANOUT = os.getenv("DB_FANOUT", "parallel")
+
+# Bulk-Load: Zeilen pro executemany-Batch, "insert" oder "infile" (LOAD DATA LOCAL INFILE)
+BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", "500"))
+BULK_METHOD = os.getenv("DB_BULK_METHOD", "insert")
+
 _pool = None
+_executor = None
+
+class PoolTimeout(PoolError):
+    pass
+
+
+class PooledConnection:
+    """
+    Hülle um eine echte Verbindung: close() gibt sie an den Pool zurück
+    (offene Transaktion wird zurückgerollt, Session-Zustand wie Variablen,
+    temporäre Tabellen und GET_LOCK-Sperren per reset_session() verworfen),
+    alles andere geht durch.
+    """
+
+    def __init__(self, pool, raw, created):
+        self._pool = pool
+        self._raw = raw
+        self._created = created
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise PoolError("Verbindung wurde schon an den Pool zurückgegeben")
+        return getattr(self._raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is None:
+            return
+        broken = False
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            raw.reset_session()
+        except Exception:
+            broken = True
+        self._pool._release(raw, self._created, broken)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """
+    Pool mit Warteschlange statt sofortigem PoolError:
+    - size feste + overflow zusätzliche Verbindungen
+    - get_connection() wartet bis timeout, höchstens max_waiters Threads warten
+    - Verbindungen älter als recycle werden neu aufgebaut, nach ping_idle
+      Sekunden Leerlauf vorher angepingt (MySQL wait_timeout, Neustarts)
+    - metrics(): Wartezeiten, belegte Verbindungen, Timeouts, Reconnects
+    """
+
+    def __init__(self, config, size=POOL_SIZE, overflow=POOL_OVERFLOW, timeout=POOL_TIMEOUT,
+                 max_waiters=POOL_MAX_WAITERS, recycle=POOL_RECYCLE, ping_idle=POOL_PING_IDLE):
+        self.config = config
+        self.size = size
+        self.overflow = overflow
+        self.timeout = timeout
+        self.max_waiters = max_waiters
+        self.recycle = recycle
+        self.ping_idle = ping_idle
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw, erstellt, zuletzt benutzt)
+        self._total = 0
+        self._in_use = 0
+        self._waiting = 0
+
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.reconnects = 0
+        self.created = 0
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self.config)
+        with self._cond:
+            self.created += 1
+        return raw
+
+    def get_connection(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, created, last_used = self._idle.pop()  # zuletzt benutzte zuerst
+                    break
+                if self._total < self.size + self.overflow:
+                    self._total += 1
+                    raw = None
+                    break
+                remaining = deadline - time.monotonic()
+                if self._waiting >= self.max_waiters or remaining <= 0:
+                    self.timeouts += 1
+                    raise PoolTimeout(
+                        f"Keine freie DB-Verbindung nach {timeout:.1f}s "
+                        f"({self._in_use} belegt, {self._waiting} wartend)"
+                    )
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._in_use += 1
+            waited = time.monotonic() - t0
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        metrics.observe_checkout(waited)
+
+        try:
+            if raw is None:
+                raw, created = self._connect(), time.monotonic()
+            else:
+                raw, created = self._check(raw, created, last_used)
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._total -= 1
+                self._cond.notify()
+            raise
+        return PooledConnection(self, raw, created)
+
+    def _check(self, raw, created, last_used):
+        """Alte Verbindung neu aufbauen, lange ungenutzte anpingen."""
+        now = time.monotonic()
+        stale = self.recycle and now - created > self.recycle
+        if not stale and now - last_used > self.ping_idle:
+            try:
+                raw.ping(reconnect=False)
+            except Exception:
+                stale = True
+        if not stale:
+            return raw, created
+        logger.info("DB-Pool: Verbindung neu aufgebaut (Alter %.0fs)", now - created)
+        _close_quietly(raw)
+        with self._cond:
+            self.reconnects += 1
+        return self._connect(), time.monotonic()
+
+    def _release(self, raw, created, broken=False):
+        with self._cond:
+            self._in_use -= 1
+            if broken or (self._total > self.size and not self._waiting):
+                # kaputt oder Overflow ohne Wartende -> schliessen statt behalten
+                self._total -= 1
+                close = True
+            else:
+                self._idle.append((raw, created, time.monotonic()))
+                close = False
+            self._cond.notify()
+        if close:
+            _close_quietly(raw)
+
+    def free(self):
+        """Verbindungen, die gerade ohne Warten zu haben sind (leerlaufend + noch nicht geöffnet)."""
+        with self._cond:
+            return len(self._idle) + self.size + self.overflow - self._total
+
+    def metrics(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "overflow": self.overflow,
+                "open": self._total,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "waiting": self._waiting,
+                "checkouts": self.checkouts,
+                "wait_avg_ms": self.wait_total / self.checkouts * 1000 if self.checkouts else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+                "timeouts": self.timeouts,
+                "reconnects": self.reconnects,
+                "created": self.created,
+            }
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
 
 def get_pool():
     global _pool
     if _pool is None:
-        # PythonAnywhere free: max_user_connections ist klein -> Pool klein halten
-        _pool = pooling.MySQLConnectionPool(
-            pool_name="pool",
-            pool_size=2,   # <= wichtig (statt 5)
-            **DB_CONFIG
-        )
+        _pool = ConnectionPool(DB_CONFIG)
     return _pool
 
 def get_conn():
@@ -32,21 +251,236 @@ def db_read(sql, params=None, single=False):
     cur = None
     try:
         cur = conn.cursor(dictionary=True)
-        cur.execute(sql, params or ())
-        return cur.fetchone() if single else cur.fetchall()
+        with metrics.timed_query(sql, "read") as q:
+            cur.execute(sql, params or ())
+            result = cur.fetchone() if single else cur.fetchall()
+            q.rows = (1 if result else 0) if single else len(result)
+        return result
     finally:
         if cur:
             cur.close()
         conn.close()
 
 def db_write(sql, params=None):
+    """Ein Statement mit Commit; gibt die Zahl der betroffenen Zeilen zurück."""
     conn = get_conn()
     cur = None
     try:
         cur = conn.cursor()
-        cur.execute(sql, params or ())
+        with metrics.timed_query(sql, "write") as q:
+            cur.execute(sql, params or ())
+            conn.commit()
+            q.rows = cur.rowcount
+        return q.rows
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # nicht mehr Threads als feste Pool-Verbindungen, sonst warten sie nur
+        # (bzw. belegen die Overflow-Verbindungen der anderen Requests)
+        _executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="db-fanout")
+    return _executor
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def run_many(tasks, mode=None):
+    """
+    Führt mehrere unabhängige DB-Aufgaben aus: {name: callable}.
+
+    Gibt (results, timings) zurück:
+      results = {name: Rückgabewert}
+      timings = {name: Sekunden, ..., "total": Wall-Time}
+
+    mode "parallel" nutzt einen Executor mit POOL_SIZE Threads,
+    "serial" arbeitet die Aufgaben nacheinander ab. Ist der Pool gerade
+    ausgeschöpft, läuft auch "parallel" nacheinander; bekommt eine parallele
+    Aufgabe keine Verbindung (PoolError), wird sie danach im aufrufenden
+    Thread wiederholt.
+    """
+    mode = mode or DB_FANOUT
+    t0 = time.perf_counter()
+    results = {}
+    timings = {}
+
+    if mode == "parallel" and len(tasks) > 1 and get_pool().free() > 1:
+        executor = _get_executor()
+        # Kontext mitgeben, damit die Abfragen dem Request zugerechnet werden (metrics)
+        futures = {
+            name: executor.submit(contextvars.copy_context().run, _timed, fn)
+            for name, fn in tasks.items()
+        }
+        retry = []
+        for name, fut in futures.items():
+            try:
+                results[name], timings[name] = fut.result()
+            except PoolError:
+                retry.append(name)
+        for name in retry:
+            logger.info("run_many: %s ohne freie Verbindung, läuft nacheinander", name)
+            results[name], timings[name] = _timed(tasks[name])
+        results = {name: results[name] for name in tasks}
+    else:
+        for name, fn in tasks.items():
+            results[name], timings[name] = _timed(fn)
+
+    timings["total"] = time.perf_counter() - t0
+    logger.debug(
+        "run_many(%s): %s",
+        mode,
+        ", ".join(f"{k}={v * 1000:.1f}ms" for k, v in timings.items()),
+    )
+    return results, timings
+
+
+def db_read_many(queries, mode=None):
+    """db_read() für mehrere Abfragen {name: (sql, params)} -> (results, timings)"""
+    tasks = {
+        name: (lambda sql=sql, params=params: db_read(sql, params))
+        for name, (sql, params) in queries.items()
+    }
+    return run_many(tasks, mode)
+
+
+# =========================
+# Bulk-Load
+# =========================
+@dataclass
+class LoadStats:
+    table: str
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self):
+        return self.rows / self.seconds if self.seconds > 0 else float(self.rows)
+
+    def __str__(self):
+        return f"{self.table}: {self.rows} Zeilen in {self.seconds:.2f}s ({self.rows_per_sec:.0f}/s)"
+
+
+def chunked(rows, size):
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_insert(table, columns, rows, chunk_size=None, conn=None, update=None):
+    """
+    Zeilen (Iterable von Tupeln) per executemany in Batches einfügen.
+    mysql-connector macht aus jedem Batch ein einziges mehrzeiliges INSERT.
+
+    update: Spalten, die bei einem doppelten Schlüssel (PK oder UNIQUE)
+    überschrieben werden -> INSERT ... ON DUPLICATE KEY UPDATE (Upsert),
+    mit Zeilen-Alias statt des veralteten VALUES(col) (MySQL 8.0.19+).
+
+    Mit conn läuft alles in der Transaktion des Aufrufers (kein Commit),
+    sonst holt sich jeder Batch eine Pool-Verbindung und committet. So hält
+    ein langsamer Generator (Scrape mit Rate-Limit) keine Verbindung fest.
+    """
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    if update:
+        sql += " AS new ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = new.{c}" for c in update)
+
+    own_conn = conn is None
+    t0 = time.perf_counter()
+    n = 0
+    for chunk in chunked(rows, chunk_size):
+        c = get_conn() if own_conn else conn
+        cur = None
+        try:
+            cur = c.cursor()
+            cur.executemany(sql, chunk)
+            if own_conn:
+                c.commit()
+        finally:
+            if cur:
+                cur.close()
+            if own_conn:
+                c.close()
+        n += len(chunk)
+
+    stats = LoadStats(table, n, time.perf_counter() - t0)
+    logger.info("bulk_insert %s", stats)
+    return stats
+
+
+def _tsv_value(v):
+    if v is None:
+        return "\\N"
+    return (
+        str(v)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def bulk_load_infile(table, columns, rows):
+    """
+    Schneller Weg für grosse Tabellen: Zeilen in eine temporäre TSV-Datei
+    schreiben und per LOAD DATA LOCAL INFILE laden. Braucht eine eigene
+    Verbindung mit allow_local_infile (und local_infile=ON am Server).
+    """
+    t0 = time.perf_counter()
+    n = 0
+    with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", delete=False) as f:
+        path = f.name
+        for row in rows:
+            f.write("\t".join(_tsv_value(v) for v in row) + "\n")
+            n += 1
+
+    conn = mysql.connector.connect(allow_local_infile=True, **DB_CONFIG)
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+            LINES TERMINATED BY '\\n'
+            ({', '.join(columns)})
+            """,
+            (path,),
+        )
         conn.commit()
     finally:
         if cur:
             cur.close()
         conn.close()
+        os.remove(path)
+
+    stats = LoadStats(table, n, time.perf_counter() - t0)
+    logger.info("bulk_load_infile %s", stats)
+    return stats
+
+
+def bulk_load(table, columns, rows, chunk_size=None, conn=None, method=None):
+    """
+    Zeilen in table laden und LoadStats (Zeilen, Dauer, Zeilen/s) zurückgeben.
+
+    method "insert" (Standard): executemany-Batches, optional in conn
+    method "infile":            LOAD DATA LOCAL INFILE (eigene Verbindung,
+                                daher nicht zusammen mit conn)
+    """
+    method = method or BULK_METHOD
+    if method == "infile":
+        if conn is not None:
+            raise ValueError("bulk_load: method 'infile' läuft auf einer eigenen Verbindung, conn geht nicht")
+        return bulk_load_infile(table, columns, rows)
+    return bulk_insert(table, columns, rows, chunk_size=chunk_size, conn=conn)
@@ -0,0 +1,29 @@
+-- Indizes für die DB-Explorer-Suche (Wortanfang statt %q%)
+-- Ausführen in der MySQL-Konsole:  SOURCE mysite/db/migrations/001_search_indexes.sql;
+
+-- Stopwörter ("de", "la", "the", ...) kommen in Club- und Spielernamen vor
+-- und sollen trotzdem im FULLTEXT-Index landen.
+SET SESSION innodb_ft_enable_stopword = OFF;
+
+-- Spieler: gespeicherter Vollname + Präfix-Indizes auf Vor-/Nachname
+ALTER TABLE Spieler
+    ADD COLUMN fullname VARCHAR(41)
+        GENERATED ALWAYS AS (CONCAT_WS(' ', vorname, nachname)) STORED,
+    ADD INDEX idx_spieler_nachname (nachname, vorname),
+    ADD INDEX idx_spieler_vorname (vorname);
+ALTER TABLE Spieler ADD FULLTEXT INDEX ft_spieler_fullname (fullname);
+
+-- Cheftrainer: gleiches Schema wie Spieler
+ALTER TABLE Cheftrainer
+    ADD COLUMN fullname VARCHAR(41)
+        GENERATED ALWAYS AS (CONCAT_WS(' ', vorname, nachname)) STORED,
+    ADD INDEX idx_trainer_nachname (nachname, vorname),
+    ADD INDEX idx_trainer_vorname (vorname);
+ALTER TABLE Cheftrainer ADD FULLTEXT INDEX ft_trainer_fullname (fullname);
+
+-- Clubs / Liga: Name als Präfix- und FULLTEXT-Index
+ALTER TABLE Clubs ADD INDEX idx_clubs_name (name);
+ALTER TABLE Clubs ADD FULLTEXT INDEX ft_clubs_name (name);
+
+ALTER TABLE Liga ADD INDEX idx_liga_name (name);
+ALTER TABLE Liga ADD FULLTEXT INDEX ft_liga_name (name);
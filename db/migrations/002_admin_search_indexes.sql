@@ -0,0 +1,6 @@
+-- Indizes für die Admin-Suche (search.plan_admin_search)
+-- Die PK- und FK-Spalten (liga, team) sind bereits indiziert,
+-- Namen kommen aus 001_search_indexes.sql.
+
+ALTER TABLE Liga ADD INDEX idx_liga_land (land);
+ALTER TABLE Spieler ADD INDEX idx_spieler_position (position);
@@ -0,0 +1,17 @@
+-- Status der Import-Jobs (jobs.py). Liegt in der DB, damit jeder
+-- Web-Worker den Fortschritt anzeigen und einen Abbruch anfordern kann.
+
+CREATE TABLE import_jobs (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    status VARCHAR(20) NOT NULL,          -- queued, running, done, failed, cancelled
+    phase VARCHAR(40),
+    pages_fetched INT NOT NULL DEFAULT 0,
+    rows_written INT NOT NULL DEFAULT 0,
+    message VARCHAR(1000),
+    error VARCHAR(1000),
+    cancel_requested TINYINT NOT NULL DEFAULT 0,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    finished_at DATETIME,
+    INDEX idx_import_jobs_status (status)
+);
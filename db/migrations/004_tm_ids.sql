@@ -0,0 +1,8 @@
+-- Transfermarkt-IDs speichern, damit der Import inkrementell abgleichen kann
+-- (importer.run_incremental_import). Zeilen ohne tm_id hat ein Admin angelegt;
+-- der Import fasst sie nicht an.
+
+ALTER TABLE Liga ADD COLUMN tm_id VARCHAR(10) NULL, ADD UNIQUE INDEX uq_liga_tm_id (tm_id);
+ALTER TABLE Clubs ADD COLUMN tm_id INT NULL, ADD UNIQUE INDEX uq_clubs_tm_id (tm_id);
+ALTER TABLE Spieler ADD COLUMN tm_id INT NULL, ADD UNIQUE INDEX uq_spieler_tm_id (tm_id);
+ALTER TABLE Cheftrainer ADD COLUMN tm_id INT NULL, ADD UNIQUE INDEX uq_trainer_tm_id (tm_id);
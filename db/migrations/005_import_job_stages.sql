@@ -0,0 +1,4 @@
+-- Durchsatz pro Stufe der Kader-Pipeline (fetch/parse/normalize/write)
+-- für die Statusanzeige der Import-Jobs.
+
+ALTER TABLE import_jobs ADD COLUMN stages VARCHAR(1000) NULL AFTER rows_written;
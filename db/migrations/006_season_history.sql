@@ -0,0 +1,50 @@
+-- Historische Saisons (backfill.py). Die Live-Tabellen Liga/Clubs/Spieler/
+-- Cheftrainer bleiben die aktuelle Saison; hier liegt je Saison ein Stand,
+-- Schlüssel sind die Transfermarkt-IDs.
+
+CREATE TABLE ClubSaison (
+    saison INT NOT NULL,
+    club_tm_id INT NOT NULL,
+    liga_tm_id VARCHAR(10) NOT NULL,
+    name VARCHAR(30),
+    platzierung INT,
+    tore INT,
+    gegentore INT,
+    PRIMARY KEY (saison, club_tm_id),
+    INDEX idx_clubsaison_liga (liga_tm_id, saison)
+);
+
+-- Ein Spieler kann in einer Saison für zwei Vereine gespielt haben
+CREATE TABLE SpielerSaison (
+    saison INT NOT NULL,
+    spieler_tm_id INT NOT NULL,
+    club_tm_id INT NOT NULL,
+    vorname VARCHAR(20),
+    nachname VARCHAR(20),
+    tore INT,
+    vorlagen INT,
+    marktwert INT,
+    position VARCHAR(20),
+    PRIMARY KEY (saison, spieler_tm_id, club_tm_id),
+    INDEX idx_spielersaison_club (club_tm_id, saison)
+);
+
+CREATE TABLE TrainerSaison (
+    saison INT NOT NULL,
+    club_tm_id INT NOT NULL,
+    trainer_tm_id INT NOT NULL,
+    vorname VARCHAR(20),
+    nachname VARCHAR(20),
+    PRIMARY KEY (saison, club_tm_id, trainer_tm_id)
+);
+
+-- Fortschritt des Backfills: eine Zeile pro erledigter Seite bzw. Verein
+-- einer (Saison, Liga)-Einheit. Ein neuer Lauf überspringt diese.
+CREATE TABLE backfill_checkpoints (
+    saison INT NOT NULL,
+    liga_tm_id VARCHAR(10) NOT NULL,
+    step VARCHAR(40) NOT NULL,        -- 'standings' oder 'club:<tm_id>'
+    rows_written INT NOT NULL DEFAULT 0,
+    done_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (saison, liga_tm_id, step)
+);
@@ -0,0 +1,11 @@
+-- Generationszähler für den Ergebniscache (resultcache.py). Import und
+-- Admin-Änderungen erhöhen ihn; jeder Web-Worker liest ihn mit kurzer TTL,
+-- damit alle Worker alte Suchergebnisse verwerfen.
+
+CREATE TABLE dataset_versions (
+    name VARCHAR(40) PRIMARY KEY,
+    generation BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT INTO dataset_versions (name, generation) VALUES ('fussball', 1);
@@ -0,0 +1,42 @@
+-- Vorberechnete Ranglisten (leaderboards.py): Ligatabelle mit Kaderwert und
+-- Torjäger/Vorlagengeber. Admin-Änderungen und Import halten sie in ihrer
+-- Transaktion aktuell; nach dem Anlegen einmal füllen:
+--     python leaderboards.py rebuild
+
+-- Ein Club pro Zeile: Tabellenstand + Kennzahlen des Kaders
+CREATE TABLE Ligatabelle (
+    teamnr INT PRIMARY KEY,
+    liga INT NOT NULL,
+    club VARCHAR(30),
+    platzierung INT NOT NULL DEFAULT 0,
+    tore INT NOT NULL DEFAULT 0,
+    gegentore INT NOT NULL DEFAULT 0,
+    tordifferenz INT NOT NULL DEFAULT 0,
+    spieler INT NOT NULL DEFAULT 0,
+    kaderwert BIGINT NOT NULL DEFAULT 0,
+    spielertore INT NOT NULL DEFAULT 0,
+    spielervorlagen INT NOT NULL DEFAULT 0,
+    INDEX idx_ligatabelle_liga (liga, platzierung, teamnr),
+    INDEX idx_ligatabelle_kaderwert (kaderwert, teamnr),
+    INDEX idx_ligatabelle_liga_kaderwert (liga, kaderwert, teamnr)
+);
+
+-- Ein Spieler pro Zeile, mit Club und Liga, damit die Ranglisten ohne Join
+-- und ohne Sortierung direkt aus dem Index kommen
+CREATE TABLE SpielerRangliste (
+    spielernr INT PRIMARY KEY,
+    team INT NOT NULL,
+    liga INT NOT NULL,
+    vorname VARCHAR(20),
+    nachname VARCHAR(20),
+    club VARCHAR(30),
+    position VARCHAR(20),
+    tore INT NOT NULL DEFAULT 0,
+    vorlagen INT NOT NULL DEFAULT 0,
+    marktwert INT NOT NULL DEFAULT 0,
+    INDEX idx_rangliste_tore (tore, spielernr),
+    INDEX idx_rangliste_vorlagen (vorlagen, spielernr),
+    INDEX idx_rangliste_liga_tore (liga, tore, spielernr),
+    INDEX idx_rangliste_liga_vorlagen (liga, vorlagen, spielernr),
+    INDEX idx_rangliste_team (team)
+);
@@ -0,0 +1,272 @@
+"""
+Export der Fussball-Tabellen als NDJSON oder CSV, gestreamt.
+
+    GET /export                                   -> verfügbare Datensätze (JSON)
+    GET /export/spieler.ndjson?team=27&limit=50000
+    GET /export/spieler_clubs.csv?liga=3&q=kane
+    GET /export/spieler.ndjson?after=120345       -> ab dem nächsten PK weiter
+
+Die Zeilen kommen in PK-Reihenfolge aus einem ungepufferten Cursor
+(fetchmany in Blöcken von EXPORT_CHUNK) und werden sofort geschrieben; der
+Speicherbedarf hängt also nicht von der Tabellengrösse ab.
+
+Fortsetzen (Keyset): after=<letzter PK>. NDJSON endet immer mit einer
+Zeile {"_next": {"after": ...}} (limit erreicht) bzw. {"_next": null}
+(fertig); fehlt sie, ist der Stream abgebrochen. Bei CSV ist die erste
+Spalte der PK.
+
+Jeder Export hat eine eigene Verbindung (der Pool der Web-App ist mit
+2 Verbindungen zu klein, um eine davon minutenlang zu belegen); höchstens
+EXPORT_MAX_CONCURRENT Exporte laufen gleichzeitig.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import threading
+
+import mysql.connector
+
+import metrics
+import search
+from db import DB_CONFIG
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK = int(os.getenv("EXPORT_CHUNK", "1000"))
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "1"))
+# Server bricht sonst ab, wenn der Client langsamer liest als MySQL schreibt
+EXPORT_NET_WRITE_TIMEOUT = int(os.getenv("EXPORT_NET_WRITE_TIMEOUT", "600"))
+
+FORMATS = ("ndjson", "csv")
+
+# name -> from/columns/pk, Filter: int_filters/text_filters = Parameter -> Spalte,
+# q = (FULLTEXT-Spalte, Präfix-Spalten) für search.name_filter
+DATASETS = {
+    "liga": {
+        "from": "Liga L",
+        "columns": ["L.liganr", "L.tm_id", "L.name", "L.land"],
+        "pk": "L.liganr",
+        "text_filters": {"land": "L.land"},
+        "q": ("L.name", ("L.name",)),
+    },
+    "clubs": {
+        "from": "Clubs C",
+        "columns": ["C.teamnr", "C.tm_id", "C.liga", "C.name", "C.platzierung", "C.tore", "C.gegentore"],
+        "pk": "C.teamnr",
+        "int_filters": {"liga": "C.liga"},
+        "q": ("C.name", ("C.name",)),
+    },
+    "spieler": {
+        "from": "Spieler S",
+        "columns": ["S.spielernr", "S.tm_id", "S.team", "S.vorname", "S.nachname", "S.position",
+                    "S.tore", "S.vorlagen", "S.marktwert"],
+        "pk": "S.spielernr",
+        "int_filters": {"team": "S.team"},
+        "text_filters": {"position": "S.position"},
+        "q": ("S.fullname", ("S.vorname", "S.nachname")),
+    },
+    "cheftrainer": {
+        "from": "Cheftrainer T",
+        "columns": ["T.trainernr", "T.tm_id", "T.team", "T.vorname", "T.nachname"],
+        "pk": "T.trainernr",
+        "int_filters": {"team": "T.team"},
+        "q": ("T.fullname", ("T.vorname", "T.nachname")),
+    },
+    # wie im DB-Explorer: Spieler / Trainer mit Club, Clubs mit Liga
+    "spieler_clubs": {
+        "from": "Spieler S JOIN Clubs C ON C.teamnr = S.team JOIN Liga L ON L.liganr = C.liga",
+        "columns": ["S.spielernr", "S.vorname", "S.nachname", "S.position", "S.tore", "S.vorlagen",
+                    "S.marktwert", "S.team", "C.name AS club", "C.liga", "L.name AS liga_name"],
+        "pk": "S.spielernr",
+        "int_filters": {"team": "S.team", "liga": "C.liga"},
+        "text_filters": {"position": "S.position"},
+        "q": ("S.fullname", ("S.vorname", "S.nachname")),
+    },
+    "trainer_clubs": {
+        "from": "Cheftrainer T JOIN Clubs C ON C.teamnr = T.team JOIN Liga L ON L.liganr = C.liga",
+        "columns": ["T.trainernr", "T.vorname", "T.nachname", "T.team", "C.name AS club", "C.liga",
+                    "L.name AS liga_name"],
+        "pk": "T.trainernr",
+        "int_filters": {"team": "T.team", "liga": "C.liga"},
+        "q": ("T.fullname", ("T.vorname", "T.nachname")),
+    },
+    "liga_clubs": {
+        "from": "Clubs C JOIN Liga L ON L.liganr = C.liga",
+        "columns": ["C.teamnr", "C.name AS club", "C.platzierung", "C.tore", "C.gegentore", "C.liga",
+                    "L.name AS liga_name", "L.land"],
+        "pk": "C.teamnr",
+        "int_filters": {"liga": "C.liga"},
+        "text_filters": {"land": "L.land"},
+        "q": ("C.name", ("C.name",)),
+    },
+}
+
+_slots = threading.BoundedSemaphore(max(1, EXPORT_MAX_CONCURRENT))
+
+
+class ExportError(ValueError):
+    pass
+
+
+class ExportBusy(RuntimeError):
+    pass
+
+
+def column_names(dataset):
+    return [c.split(" AS ")[-1].split(".")[-1] for c in DATASETS[dataset]["columns"]]
+
+
+def describe():
+    """Für GET /export: Datensätze mit Spalten und Filtern."""
+    return {
+        name: {
+            "columns": column_names(name),
+            "filters": sorted(list(d.get("int_filters", {})) + list(d.get("text_filters", {})) + ["q", "mode"]),
+        }
+        for name, d in DATASETS.items()
+    }
+
+
+def _int(name, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ExportError(f"{name} muss eine Zahl sein")
+
+
+def build_query(dataset, args):
+    """(sql, params, limit) aus den Query-Parametern; ExportError bei Unsinn."""
+    d = DATASETS.get(dataset)
+    if d is None:
+        raise ExportError(f"Unbekannter Datensatz {dataset!r}")
+
+    where = []
+    params = []
+    for name, col in d.get("int_filters", {}).items():
+        if args.get(name):
+            where.append(f"{col} = %s")
+            params.append(_int(name, args[name]))
+    for name, col in d.get("text_filters", {}).items():
+        if args.get(name):
+            where.append(f"{col} = %s")
+            params.append(args[name])
+    q = (args.get("q") or "").strip()
+    if q:
+        fulltext_col, prefix_cols = d["q"]
+        frag, frag_params = search.name_filter(q, fulltext_col, prefix_cols, args.get("mode"))
+        where.append(frag)
+        params.extend(frag_params)
+    if args.get("after"):
+        where.append(f"{d['pk']} > %s")
+        params.append(_int("after", args["after"]))
+
+    limit = _int("limit", args["limit"]) if args.get("limit") else None
+    if limit is not None and limit < 1:
+        raise ExportError("limit muss mindestens 1 sein")
+
+    sql = f"SELECT {', '.join(d['columns'])} FROM {d['from']}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {d['pk']}"
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(limit)
+    return sql, tuple(params), limit
+
+
+def _ndjson_chunk(names, rows):
+    return "".join(json.dumps(dict(zip(names, r)), ensure_ascii=False, default=str) + "\n" for r in rows)
+
+
+def _csv_chunk(rows, header=None):
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    if header:
+        w.writerow(header)
+    w.writerows(rows)
+    return buf.getvalue()
+
+
+def stream(dataset, fmt, args):
+    """
+    Prüft die Parameter und holt einen Export-Slot, bevor etwas gesendet wird
+    (ExportError / ExportBusy); gibt dann den Generator für die Antwort zurück.
+    """
+    if fmt not in FORMATS:
+        raise ExportError(f"Format muss {' oder '.join(FORMATS)} sein")
+    sql, params, limit = build_query(dataset, args)
+    if not _slots.acquire(blocking=False):
+        raise ExportBusy("Es läuft schon ein Export, bitte später erneut versuchen")
+    try:
+        conn = mysql.connector.connect(**DB_CONFIG)
+    except Exception:
+        _slots.release()
+        raise
+    gen = _generate(conn, dataset, fmt, sql, params, limit)
+    # bis nach dem execute() laufen lassen: SQL-Fehler werden so noch ein
+    # normaler 500, und ein gestarteter Generator gibt Verbindung und Slot
+    # auch dann frei, wenn die Antwort nie gelesen wird (close() beim Aufräumen)
+    first = next(gen)
+    return _Resume(first, gen)
+
+
+class _Resume:
+    """
+    Erst first, dann der Rest von gen. Anders als itertools.chain hat es
+    close(): bricht der Client ab, schliesst Werkzeug die Antwort, und das
+    erreicht gen (Verbindung und Slot frei), auch wenn noch nichts gelesen ist.
+    """
+
+    def __init__(self, first, gen):
+        self._first = [first]
+        self._gen = gen
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._first:
+            return self._first.pop()
+        return next(self._gen)
+
+    def close(self):
+        self._gen.close()
+
+
+def _generate(conn, dataset, fmt, sql, params, limit):
+    names = column_names(dataset)
+    cur = None
+    n = 0
+    last_pk = None
+    try:
+        cur = conn.cursor(buffered=False)
+        cur.execute("SET SESSION net_write_timeout = %s", (EXPORT_NET_WRITE_TIMEOUT,))
+        with metrics.timed_query(sql, "export"):
+            cur.execute(sql, params)
+        yield _csv_chunk([], header=names) if fmt == "csv" else ""
+        while True:
+            rows = cur.fetchmany(EXPORT_CHUNK)
+            if not rows:
+                break
+            n += len(rows)
+            last_pk = rows[-1][0]
+            yield _ndjson_chunk(names, rows) if fmt == "ndjson" else _csv_chunk(rows)
+        if fmt == "ndjson":
+            more = limit is not None and n >= limit
+            yield json.dumps({"_next": {"after": last_pk} if more else None, "rows": n}) + "\n"
+        logger.info("export %s.%s: %d Zeilen", dataset, fmt, n)
+    finally:
+        # bei Abbruch durch den Client liegen noch ungelesene Zeilen an:
+        # Verbindung einfach schliessen, sie gehört keinem Pool
+        if cur is not None:
+            try:
+                cur.close()
+            except Exception:
+                pass
+        try:
+            conn.close()
+        except Exception:
+            pass
+        _slots.release()
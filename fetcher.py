@@ -0,0 +1,226 @@
+"""
+Fetch-Engine für den Transfermarkt-Import.
+
+- Token-Bucket pro Host: begrenzt die Request-Rate (Höflichkeitsbudget),
+  statt nach jeder Seite fix zu schlafen.
+- Worker-Pool: mehrere Seiten gleichzeitig unterwegs, die Rate bestimmt
+  trotzdem nur der Bucket.
+- Retries mit exponentiellem Backoff + Jitter, Retry-After wird respektiert
+  (und pausiert den ganzen Host, nicht nur den einen Worker).
+- Verbindungen werden über die gemeinsame requests.Session wiederverwendet.
+- Optional mit htmlcache.HtmlCache davor (TTL, Revalidierung, Offline-Modus).
+"""
+import logging
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Diese Status-Codes sind vorübergehend -> nochmal versuchen
+RETRY_STATUS = {403, 408, 425, 429, 500, 502, 503, 504}
+
+
+class FetchError(RuntimeError):
+    def __init__(self, url, status=None, message=None):
+        self.url = url
+        self.status = status
+        super().__init__(message or f"HTTP {status}: {url}")
+
+
+class TokenBucket:
+    """rate Tokens pro Sekunde, höchstens burst auf Vorrat."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        """Host sagt "langsamer" (Retry-After) -> bis dahin keine Tokens."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.paused_until:
+                    start = max(self.updated, self.paused_until)
+                    self.tokens = min(self.burst, self.tokens + (now - start) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1.0:
+                        self.tokens -= 1.0
+                        return
+                    wait = (1.0 - self.tokens) / self.rate
+                else:
+                    wait = self.paused_until - now
+            time.sleep(wait)
+
+
+def parse_retry_after(value):
+    """Retry-After als Sekunden (Zahl oder HTTP-Datum), sonst None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        dt = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, dt.timestamp() - time.time())
+
+
+class Fetcher:
+    def __init__(
+        self,
+        session,
+        headers=None,
+        rate=0.125,
+        burst=1.0,
+        workers=4,
+        retries=3,
+        backoff_base=5.0,
+        backoff_max=120.0,
+        timeout=40,
+        cache=None,
+    ):
+        self.session = session
+        self.cache = cache
+        self.headers = headers or {}
+        self.rate = rate
+        self.burst = burst
+        self.workers = workers
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, url) -> TokenBucket:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return self._buckets[host]
+
+    def backoff(self, attempt):
+        """Full Jitter: zufällig zwischen 0 und base * 2^attempt (gedeckelt)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url, season=None) -> str:
+        entry = self.cache.get(url, season) if self.cache else None
+        if entry and (entry.fresh or self.cache.offline):
+            return entry.body
+        if self.cache and self.cache.offline:
+            raise FetchError(url, message=f"Offline-Modus, nicht im Cache: {url}")
+
+        headers = dict(self.headers)
+        if entry:
+            headers.update(entry.conditional_headers())
+
+        r = self._request(url, headers)
+        if r.status_code == 304 and entry:
+            self.cache.touch(entry, season)
+            return entry.body
+        if self.cache:
+            self.cache.put(
+                url,
+                r.text,
+                season,
+                etag=r.headers.get("ETag"),
+                last_modified=r.headers.get("Last-Modified"),
+            )
+        return r.text
+
+    def _request(self, url, headers):
+        bucket = self.bucket(url)
+        for attempt in range(self.retries):
+            bucket.acquire()
+            last = attempt == self.retries - 1
+            try:
+                r = self.session.get(
+                    url,
+                    headers=headers,
+                    timeout=self.timeout,
+                    proxies={"http": None, "https": None},
+                )
+            except Exception as e:
+                if last:
+                    raise
+                wait = self.backoff(attempt)
+                logger.warning("GET %s fehlgeschlagen (%s), neuer Versuch in %.1fs", url, e, wait)
+                time.sleep(wait)
+                continue
+
+            if r.status_code < 400:
+                return r
+
+            if r.status_code not in RETRY_STATUS or last:
+                if r.status_code == 403:
+                    raise FetchError(url, 403, f"403 Forbidden (Transfermarkt blockt): {url}")
+                raise FetchError(url, r.status_code)
+
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+            if retry_after is not None:
+                # gilt für alle Worker auf diesem Host
+                bucket.pause(min(retry_after, self.backoff_max))
+                logger.warning("GET %s -> %s, Retry-After %.1fs", url, r.status_code, retry_after)
+            else:
+                wait = self.backoff(attempt)
+                logger.warning("GET %s -> %s, neuer Versuch in %.1fs", url, r.status_code, wait)
+                time.sleep(wait)
+
+    def map(self, urls, season=None):
+        """
+        Mehrere URLs gleichzeitig holen. Liefert (url, html, fehler) in der
+        Reihenfolge, in der sie fertig werden; fehler ist None oder die Exception.
+        """
+        for url, _, html, err in self.imap(((url, url) for url in urls), season):
+            yield url, html, err
+
+    def imap(self, jobs, season=None, window=None):
+        """
+        Wie map(), aber jobs ist ein (auch endloser) Iterator von (key, url):
+        es sind höchstens window Anfragen gleichzeitig offen, neue Jobs werden
+        erst gezogen, wenn alte fertig sind. Liefert (key, url, html, fehler).
+        """
+        window = window or self.workers * 2
+        jobs = iter(jobs)
+        ex = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch")
+        pending = {}
+
+        def refill():
+            while len(pending) < window:
+                job = next(jobs, None)
+                if job is None:
+                    return
+                key, url = job
+                pending[ex.submit(self.get, url, season)] = (key, url)
+
+        try:
+            refill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                results = []
+                for fut in done:
+                    key, url = pending.pop(fut)
+                    try:
+                        results.append((key, url, fut.result(), None))
+                    except Exception as e:
+                        results.append((key, url, None, e))
+                # neue Anfragen losschicken, bevor der Aufrufer die Seiten verarbeitet
+                refill()
+                yield from results
+        finally:
+            # bei Abbruch (Fehler, Generator geschlossen) nichts Neues mehr starten
+            ex.shutdown(wait=True, cancel_futures=True)
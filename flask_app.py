@@ -1,11 +1,26 @@
-from flask import Flask, redirect, render_template, request, url_for, session, flash
+from flask import (
+    Flask, redirect, render_template, request, url_for, session, flash, jsonify,
+    send_file, abort, make_response, Response, stream_with_context,
+)
 from dotenv import load_dotenv
 import os
 import git
 import hmac
 import hashlib
-from db import db_read, db_write, get_conn
-from auth import login_manager, authenticate, register_user
+import functools
+import json
+from db import db_read, db_write, run_many, get_pool
+from auth import login_manager, authenticate, register_user, user_cache
+import search
+import paging
+import resultcache
+import httpcache
+import export
+import adminedit
+import analytics
+import leaderboards
+import metrics
+import profiling
 from flask_login import login_user, logout_user, login_required, current_user
 import logging
 
@@ -35,6 +50,36 @@ ADMIN_PASSWORD = "goatedinfoprojekt"
 login_manager.init_app(app)
 login_manager.login_view = "login"
 
+
+# Metrics: latency per route + /metrics (admins, or METRICS_TOKEN for scrapers)
+def _pool_and_cache_metrics():
+    pool = get_pool().metrics()
+    cache = user_cache.stats()
+    results = resultcache.cache.stats()
+    return [
+        ("db_pool_connections", "gauge", "Pool-Verbindungen nach Zustand",
+         [({"state": k}, pool[k]) for k in ("open", "in_use", "idle", "waiting")]),
+        ("db_pool_timeouts_total", "counter", "Checkouts ohne freie Verbindung", [({}, pool["timeouts"])]),
+        ("db_pool_reconnects_total", "counter", "Neu aufgebaute Verbindungen", [({}, pool["reconnects"])]),
+        ("user_cache_requests_total", "counter", "load_user() Cache-Zugriffe",
+         [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])]),
+        ("result_cache_requests_total", "counter", "DB-Explorer Ergebniscache-Zugriffe",
+         [({"result": "hit"}, results["hits"]), ({"result": "miss"}, results["misses"])]),
+        ("result_cache_bytes", "gauge", "Geschätzte Grösse des Ergebniscaches", [({}, results["bytes"])]),
+        ("result_cache_evictions_total", "counter", "Verdrängte Einträge", [({}, results["evictions"])]),
+    ]
+
+
+metrics.init_app(app, allow=lambda: current_user.is_authenticated and admin_required())
+metrics.add_collector(_pool_and_cache_metrics)
+
+# Profiling: admins only, for the next N requests or with header X-Profile: 1
+profiling.init_app(
+    app,
+    is_admin=lambda: current_user.is_authenticated and admin_required(),
+    skip=("admin_profiles", "admin_profile_file"),
+)
+
 # DON'T CHANGE
 def is_valid_signature(x_hub_signature, data, private_key):
     hash_algorithm, github_signature = x_hub_signature.split('=', 1)
@@ -139,8 +184,11 @@ def complete():
 @app.route("/users", methods=["GET"])
 @login_required
 def users():
+    etag = httpcache.etag("users", resultcache.users_version.get(), request.args, current_user.id)
+    if httpcache.fresh(etag):
+        return httpcache.not_modified(etag)
     users = db_read("SELECT username FROM users ORDER BY username", ())
-    return render_template("users.html", users=users)
+    return httpcache.cacheable(make_response(render_template("users.html", users=users)), etag)
 
 
 #Chatgpt
@@ -148,140 +196,235 @@ def users():
 @app.route("/dbexplorer", methods=["GET", "POST"])
 @login_required
 def dbexplorer():
-    q = ""
+    # Suche läuft über GET (?q=...), damit Browser und Zurück/Vor die Seite
+    # wiederverwenden können; alte POST-Formulare landen per 303 dort
+    if request.method == "POST":
+        params = {k: v for k, v in request.form.items() if v}
+        return redirect(url_for("dbexplorer", **params), code=303)
+
+    etag = httpcache.etag("dbexplorer", resultcache.version.get(), request.args, current_user.id)
+    if httpcache.fresh(etag):
+        return httpcache.not_modified(etag)
+
+    q = (request.args.get("q") or "").strip()
+    mode = search.MODE_PREFIX
     club_players = []
     player_rows = []
     coach_rows = []
     league_teams = []
-
-    if request.method == "POST":
-        q = (request.form.get("q") or "").strip()
-
-        if q:
-            like = f"%{q}%"
-
-            # 1) Club search -> show all its players (values from Spieler)
-            clubs = db_read("SELECT teamnr, name FROM Clubs WHERE name LIKE %s", (like,))
-            if clubs:
-                teamnrs = [c["teamnr"] for c in clubs]
-                placeholders = ",".join(["%s"] * len(teamnrs))
-
-                club_players = db_read(
-                    f"""
-                    SELECT C.name AS club, S.spielernr, S.team, S.vorname, S.nachname, S.position,
-                           S.tore, S.vorlagen, S.marktwert
-                    FROM Spieler S
-                    JOIN Clubs C ON C.teamnr = S.team
-                    WHERE S.team IN ({placeholders})
-                    ORDER BY C.name, S.nachname, S.vorname
-                    """,
-                    tuple(teamnrs),
-                )
-
-            # 2) Player search (may return multiple if same name)
-            player_rows = db_read(
-                """
-                SELECT C.name AS club, S.spielernr, S.team, S.vorname, S.nachname, S.position,
-                       S.tore, S.vorlagen, S.marktwert
-                FROM Spieler S
-                JOIN Clubs C ON C.teamnr = S.team
-                WHERE CONCAT(S.vorname, ' ', S.nachname) LIKE %s
-                   OR S.vorname LIKE %s
-                   OR S.nachname LIKE %s
-                ORDER BY S.nachname, S.vorname, C.name
-                """,
-                (like, like, like),
-            )
-
-            # 3) Coach search (may return multiple if same name)
-            coach_rows = db_read(
-                """
-                SELECT C.name AS club, T.trainernr, T.team, T.vorname, T.nachname
-                FROM Cheftrainer T
-                JOIN Clubs C ON C.teamnr = T.team
-                WHERE CONCAT(T.vorname, ' ', T.nachname) LIKE %s
-                   OR T.vorname LIKE %s
-                   OR T.nachname LIKE %s
-                ORDER BY T.nachname, T.vorname, C.name
-                """,
-                (like, like, like),
+    pages = {}
+    page_size = paging.PAGE_SIZE
+    timings = None
+
+    if q:
+        # Teilstring-Suche nur auf ausdrücklichen Wunsch (Full Table Scan)
+        mode = search.normalize_mode(request.args.get("mode"))
+        page_size = paging.page_size_from(request.args.get("page_size"))
+        term = resultcache.normalize_term(q, mode)
+        # Cursor hier lesen: die Tasks laufen in Threads ohne Request-Kontext
+        tasks = {}
+        cache_keys = {}
+        for name, (sql, params) in search.explorer_queries(q, mode).items():
+            cursor = request.args.get(f"cursor_{name}")
+            direction = request.args.get(f"dir_{name}", "next")
+            cache_keys[name], page = resultcache.lookup(name, (term, mode, cursor, direction, page_size))
+            if page is not None:
+                pages[name] = page
+                continue
+            tasks[name] = functools.partial(
+                paging.fetch_page,
+                [(sql, params)],
+                search.EXPLORER_KEYS[name],
+                cursor=cursor,
+                direction=direction,
+                page_size=page_size,
             )
 
-            # 4) League search -> show teams ordered by platzierung + the league country
-            league_teams = db_read(
-                """
-                SELECT L.name AS liga, L.land, C.platzierung, C.name AS club, C.tore, C.gegentore
-                FROM Liga L
-                JOIN Clubs C ON C.liga = L.liganr
-                WHERE L.name LIKE %s
-                ORDER BY C.platzierung ASC, C.name
-                """,
-                (like,),
-            )
-
-    return render_template(
+        # fehlende Abfragen gleichzeitig (auf max. POOL_SIZE Verbindungen)
+        found, timings = run_many(tasks)
+        for name, page in found.items():
+            resultcache.store(cache_keys[name], page)
+        pages.update(found)
+        timings.update({name: None for name in pages if name not in found})
+        club_players = pages["club_players"].rows
+        player_rows = pages["player_rows"].rows
+        coach_rows = pages["coach_rows"].rows
+        league_teams = pages["league_teams"].rows
+
+    html = render_template(
         "dbexplorer.html",
         q=q,
+        mode=mode,
         club_players=club_players,
         player_rows=player_rows,
         coach_rows=coach_rows,
         league_teams=league_teams,
+        pages=pages,
+        page_size=page_size,
+        timings=timings,
     )
+    return httpcache.cacheable(make_response(html), etag)
 
 
 
 
+@app.route("/leaderboards", methods=["GET"])
+@login_required
+def leaderboard_page():
+    # Ligatabelle / SpielerRangliste sind vorberechnet (leaderboards.py),
+    # jede Liste ist ein Index-Lookup mit LIMIT
+    etag = httpcache.etag("leaderboards", resultcache.version.get(), request.args, current_user.id)
+    if httpcache.fresh(etag):
+        return httpcache.not_modified(etag)
+
+    liga = request.args.get("liga", type=int)
+    limit = leaderboards.clamp_limit(request.args.get("limit", type=int))
+    key, data = resultcache.lookup("leaderboards", (liga, limit))
+    if data is None:
+        data = {"ligen": leaderboards.leagues(), **leaderboards.boards(liga, limit)}
+        resultcache.store(key, data)
+
+    html = render_template("leaderboards.html", liga=liga, limit=limit, **data)
+    return httpcache.cacheable(make_response(html), etag)
+
+
+@app.route("/analytics", methods=["GET"])
+@login_required
+def analytics_page():
+    etag = httpcache.etag("analytics", resultcache.version.get(), request.args, current_user.id)
+    if httpcache.fresh(etag):
+        return httpcache.not_modified(etag)
+    html = render_template("analytics.html", a=analytics.summary(), min_value=analytics.ANALYTICS_MIN_VALUE)
+    return httpcache.cacheable(make_response(html), etag)
+
+
+@app.route("/analytics.json", methods=["GET"])
+@login_required
+def analytics_json():
+    etag = httpcache.etag("analytics.json", resultcache.version.get(), request.args, current_user.id)
+    if httpcache.fresh(etag):
+        return httpcache.not_modified(etag)
+    return httpcache.cacheable(jsonify(analytics.summary()), etag)
+
+
+@app.route("/export", methods=["GET"])
+@login_required
+def export_index():
+    return jsonify(export.describe())
+
+
+@app.route("/export/<dataset>.<fmt>", methods=["GET"])
+@login_required
+def export_dataset(dataset, fmt):
+    try:
+        chunks = export.stream(dataset, fmt, request.args)
+    except export.ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    except export.ExportBusy as e:
+        return jsonify({"error": str(e)}), 429, {"Retry-After": "30"}
+    if fmt == "csv":
+        mimetype = "text/csv; charset=utf-8"
+        headers = {"Content-Disposition": f'attachment; filename="{dataset}.csv"'}
+    else:
+        mimetype = "application/x-ndjson"
+        headers = {}
+    headers["X-Accel-Buffering"] = "no"  # Proxy soll nicht die ganze Antwort sammeln
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+
 #admin
-import transfermarktimport  # make sure the file is importable (transfermarktimport.py next to flask_app.py)
+import importer  # Transfermarkt-Import; transfermarktimport lädt erst der Import-Job
+import jobs  # Import läuft als Hintergrund-Job, nicht im Request
 
 def admin_required():
     """Small guard: user must be logged in AND admin session must be active."""
     return session.get("is_admin") is True
 
 
-def execute_sql_script(sql_text: str):
-    """
-    Execute a SQL script containing multiple statements (generated by transfermarktimport.build_sql()).
-    Your db_write() executes only one statement, so we need a multi-statement runner.
-    """
-    conn = get_conn()
+def _can_rollback():
     try:
-        cur = conn.cursor()
-        # naive split is OK here because the generated SQL is predictable (no semicolons inside values)
-        statements = [s.strip() for s in sql_text.split(";") if s.strip()]
-        for stmt in statements:
-            cur.execute(stmt)
-        conn.commit()
-    finally:
-        try:
-            cur.close()
-        except:
-            pass
-        conn.close()
-
-
-def empty_transfermarkt_tables():
+        return importer.has_previous_generation()
+    except Exception:
+        logging.exception("has_previous_generation failed")
+        return False
+
+
+def _import_job(progress, mode="incremental"):
     """
-    IMPORTANT: empty Clubs, Cheftrainer, Spieler, Liga before importing.
-    Use FK checks off + TRUNCATE to reset AUTO_INCREMENT.
+    Runs in the jobs worker thread.
+    incremental: Abgleich über tm_id, schreibt nur Änderungen
+    full:        lädt in *_new und tauscht am Ende atomar
     """
-    conn = get_conn()
+    if mode == "full":
+        stats, counts = importer.run_import(progress)
+        return (
+            "Import erfolgreich: neue Daten geladen, geprüft und live geschaltet ("
+            + "; ".join(str(st) for st in stats) + ")."
+        )
+    diffs = importer.run_incremental_import(progress)
+    return "Import erfolgreich (nur Änderungen): " + "; ".join(str(d) for d in diffs) + "."
+
+
+def _import_status():
     try:
-        cur = conn.cursor()
-        cur.execute("SET FOREIGN_KEY_CHECKS=0;")
-        # order matters with FKs
-        cur.execute("TRUNCATE TABLE Spieler;")
-        cur.execute("TRUNCATE TABLE Cheftrainer;")
-        cur.execute("TRUNCATE TABLE Clubs;")
-        cur.execute("TRUNCATE TABLE Liga;")
-        cur.execute("SET FOREIGN_KEY_CHECKS=1;")
-        conn.commit()
-    finally:
-        try:
-            cur.close()
-        except:
-            pass
-        conn.close()
+        return jobs.job_status(jobs.latest_job())
+    except Exception:
+        logging.exception("import status failed")
+        return None
+
+
+@app.route("/adminarea/import/status", methods=["GET"])
+def import_status():
+    if not current_user.is_authenticated or not admin_required():
+        return jsonify({"error": "forbidden"}), 403
+    job_id = request.args.get("id", type=int)
+    job = jobs.get_job(job_id) if job_id else jobs.latest_job()
+    return jsonify(jobs.job_status(job))
+
+
+@app.route("/adminarea/profiles", methods=["GET", "POST"])
+def admin_profiles():
+    if not current_user.is_authenticated:
+        return redirect(url_for("login", next=url_for("admin_profiles")))
+    if not admin_required():
+        return redirect(url_for("adminlogin"))
+
+    message = None
+    if request.method == "POST":
+        action = request.form.get("action", "")
+        if action == "start":
+            n = request.form.get("count", type=int) or 1
+            n = max(1, min(n, profiling.PROFILE_MAX_REQUESTS))
+            session[profiling.SESSION_KEY] = n
+            message = f"Die nächsten {n} Requests werden profiliert."
+        elif action == "stop":
+            session.pop(profiling.SESSION_KEY, None)
+            message = "Profiling ausgeschaltet."
+        elif action == "clear":
+            profiling.prune(keep=0)
+            message = "Alle Berichte gelöscht."
+        flash(message)
+        return redirect(url_for("admin_profiles"))
+
+    return render_template(
+        "admin_profiles.html",
+        reports=profiling.list_reports(),
+        remaining=session.get(profiling.SESSION_KEY, 0),
+        keep=profiling.PROFILE_KEEP,
+        max_requests=profiling.PROFILE_MAX_REQUESTS,
+    )
+
+
+@app.route("/adminarea/profiles/<filename>", methods=["GET"])
+def admin_profile_file(filename):
+    if not current_user.is_authenticated or not admin_required():
+        abort(403)
+    path = profiling.report_path(filename)
+    if path is None:
+        abort(404)
+    if filename.endswith(".txt"):
+        return send_file(path, mimetype="text/plain; charset=utf-8")
+    return send_file(path, as_attachment=True)
 
 
 @app.route("/adminlogin", methods=["GET", "POST"])
@@ -326,6 +469,7 @@ def adminarea():
 
     message = None
     error = None
+    batch_saved = False
 
     q = ""
     results = {
@@ -335,145 +479,88 @@ def adminarea():
         "Cheftrainer": [],
     }
 
-    def do_search(query: str):
-        """Search across all 4 tables (text + numeric via CAST)"""
-        like = f"%{query}%"
-
-        # Liga
-        liga_rows = db_read(
-            """
-            SELECT liganr, name, land
-            FROM Liga
-            WHERE CAST(liganr AS CHAR) LIKE %s
-               OR name LIKE %s
-               OR land LIKE %s
-            ORDER BY liganr
-            """,
-            (like, like, like),
-        )
-
-        # Clubs
-        clubs_rows = db_read(
-            """
-            SELECT teamnr, liga, tore, gegentore, name, platzierung
-            FROM Clubs
-            WHERE CAST(teamnr AS CHAR) LIKE %s
-               OR CAST(liga AS CHAR) LIKE %s
-               OR CAST(tore AS CHAR) LIKE %s
-               OR CAST(gegentore AS CHAR) LIKE %s
-               OR name LIKE %s
-               OR CAST(platzierung AS CHAR) LIKE %s
-            ORDER BY teamnr
-            """,
-            (like, like, like, like, like, like),
-        )
+    # Admin kann die Suche auf einzelne Tabellen einschränken (leer = alle)
+    search_tables = [t for t in request.form.getlist("tables") if t in results]
 
-        # Spieler
-        spieler_rows = db_read(
-            """
-            SELECT spielernr, team, vorname, nachname, tore, vorlagen, marktwert, position
-            FROM Spieler
-            WHERE CAST(spielernr AS CHAR) LIKE %s
-               OR CAST(team AS CHAR) LIKE %s
-               OR vorname LIKE %s
-               OR nachname LIKE %s
-               OR CAST(tore AS CHAR) LIKE %s
-               OR CAST(vorlagen AS CHAR) LIKE %s
-               OR CAST(marktwert AS CHAR) LIKE %s
-               OR position LIKE %s
-            ORDER BY spielernr
-            """,
-            (like, like, like, like, like, like, like, like),
-        )
+    pages = {}
+    page_size = paging.page_size_from(request.form.get("page_size"))
 
-        # Cheftrainer
-        coach_rows = db_read(
-            """
-            SELECT trainernr, team, vorname, nachname
-            FROM Cheftrainer
-            WHERE CAST(trainernr AS CHAR) LIKE %s
-               OR CAST(team AS CHAR) LIKE %s
-               OR vorname LIKE %s
-               OR nachname LIKE %s
-            ORDER BY trainernr
-            """,
-            (like, like, like, like),
-        )
-
-        return liga_rows, clubs_rows, spieler_rows, coach_rows
+    def do_search(query: str):
+        """
+        Search across the selected tables (planned per input type, see search.plan_admin_search).
+        Fills results/pages with one keyset page per table (ordered by PK).
+        """
+        tasks = {}
+        for table, selects in search.plan_admin_search(query, search_tables).items():
+            pk = search.ADMIN_TABLES[table]["pk"]
+            tasks[table] = functools.partial(
+                paging.fetch_page,
+                selects,
+                ((pk, pk),),
+                cursor=request.form.get(f"cursor_{table}"),
+                direction=request.form.get(f"dir_{table}", "next"),
+                page_size=page_size,
+            )
+        found, _ = run_many(tasks)
+        for table, page in found.items():
+            results[table] = page.rows
+            pages[table] = page
 
     if request.method == "POST":
         action = request.form.get("action", "")
 
-        # 1) run import
+        # 1) start import (runs in the background, see jobs.py)
         if action == "import":
             try:
-                empty_transfermarkt_tables()
-                sql_text = transfermarktimport.build_sql()
-                execute_sql_script(sql_text)
-                message = "Import erfolgreich: Tabellen geleert und Transfermarkt-Daten importiert."
+                mode = "full" if request.form.get("mode") == "full" else "incremental"
+                job_id = jobs.RUNNER.submit(functools.partial(_import_job, mode=mode))
+                message = f"Import-Job {job_id} gestartet. Der Fortschritt wird unten angezeigt."
+            except jobs.JobBusy as e:
+                error = str(e)
+            except Exception as e:
+                error = f"Import konnte nicht gestartet werden: {e}"
+                logging.exception("Import submit failed")
+
+        # 1a) cancel running import
+        elif action == "import_cancel":
+            try:
+                jobs.request_cancel(int(request.form.get("job_id", "0")))
+                message = "Abbruch angefordert (alte Daten bleiben aktiv)."
+            except Exception as e:
+                error = f"Abbruch fehlgeschlagen: {e}"
+
+        # 1b) back to the previous import generation
+        elif action == "rollback":
+            try:
+                importer.rollback()
+                message = "Rollback erfolgreich: vorheriger Import ist wieder aktiv."
             except Exception as e:
-                error = f"Import fehlgeschlagen: {e}"
+                error = f"Rollback fehlgeschlagen: {e}"
 
         # 2) search
         elif action == "search":
             q = (request.form.get("q") or "").strip()
             if q:
-                liga_rows, clubs_rows, spieler_rows, coach_rows = do_search(q)
-                results["Liga"] = liga_rows
-                results["Clubs"] = clubs_rows
-                results["Spieler"] = spieler_rows
-                results["Cheftrainer"] = coach_rows
+                do_search(q)
 
-        # 3) update a single row
+        # 3) update a single row (Whitelists in adminedit.py)
         elif action == "update":
             table = request.form.get("table")
             pk_name = request.form.get("pk_name")
             pk_value = request.form.get("pk_value")
             q = (request.form.get("q") or "").strip()
 
-            # Whitelist editable columns per table (protect against SQL injection)
-            allowed = {
-                "Liga": ( "name", "land" ),
-                "Clubs": ( "liga", "tore", "gegentore", "name", "platzierung" ),
-                "Spieler": ( "team", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position" ),
-                "Cheftrainer": ( "team", "vorname", "nachname" ),
-            }
-            pk_map = {
-                "Liga": "liganr",
-                "Clubs": "teamnr",
-                "Spieler": "spielernr",
-                "Cheftrainer": "trainernr",
-            }
-
             try:
-                if table not in allowed or pk_map.get(table) != pk_name:
+                if table not in adminedit.PRIMARY_KEYS or pk_name != adminedit.PRIMARY_KEYS[table]:
                     raise ValueError("Ungültige Update-Anfrage.")
-
-                # build SET clause from posted fields
-                sets = []
-                params = []
-                for col in allowed[table]:
-                    if col in request.form:
-                        sets.append(f"{col}=%s")
-                        params.append(request.form.get(col))
-
-                if not sets:
-                    raise ValueError("Keine Felder zum Speichern gefunden.")
-
-                params.append(pk_value)
-                sql = f"UPDATE {table} SET {', '.join(sets)} WHERE {pk_name}=%s"
-                db_write(sql, tuple(params))
+                values = {c: request.form.get(c) for c in adminedit.UPDATABLE[table] if c in request.form}
+                adminedit.apply_batch([{"op": "update", "table": table, "pk": pk_value, "values": values}])
 
                 message = f"{table} ({pk_name}={pk_value}) gespeichert."
 
                 # re-run search so the user still sees results
                 if q:
-                    liga_rows, clubs_rows, spieler_rows, coach_rows = do_search(q)
-                    results["Liga"] = liga_rows
-                    results["Clubs"] = clubs_rows
-                    results["Spieler"] = spieler_rows
-                    results["Cheftrainer"] = coach_rows
+                    do_search(q)
 
             except Exception as e:
                 error = f"Speichern fehlgeschlagen: {e}"
@@ -487,99 +574,80 @@ def adminarea():
             pk_value = request.form.get("pk_value")
             q = (request.form.get("q") or "").strip()
 
-            pk_map = {
-                "Liga": "liganr",
-                "Clubs": "teamnr",
-                "Spieler": "spielernr",
-                "Cheftrainer": "trainernr",
-            }
-
             try:
-                if table not in pk_map or pk_map.get(table) != pk_name:
+                if table not in adminedit.PRIMARY_KEYS or pk_name != adminedit.PRIMARY_KEYS[table]:
                     raise ValueError("Ungültige Delete-Anfrage.")
-
-                db_write(f"DELETE FROM {table} WHERE {pk_name}=%s", (pk_value,))
+                adminedit.apply_batch([{"op": "delete", "table": table, "pk": pk_value}])
                 message = f"{table} ({pk_name}={pk_value}) gelöscht."
 
                 if q:
-                    liga_rows, clubs_rows, spieler_rows, coach_rows = do_search(q)
-                    results["Liga"] = liga_rows
-                    results["Clubs"] = clubs_rows
-                    results["Spieler"] = spieler_rows
-                    results["Cheftrainer"] = coach_rows
+                    do_search(q)
 
             except Exception as e:
                 error = f"Löschen fehlgeschlagen: {e}"
 
         # ============================
-        # insert a row  (FIXED INDENT)
+        # insert a row
         # ============================
         elif action == "insert":
             table = request.form.get("table")
             q = (request.form.get("q") or "").strip()
 
-            # AUTO_INCREMENT PKs: wir insertieren OHNE PK-Spalte
-            allowed_insert = {
-                "Liga": ("name", "land"),
-                "Clubs": ("liga", "tore", "gegentore", "name", "platzierung"),
-                "Spieler": ("team", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position"),
-                "Cheftrainer": ("team", "vorname", "nachname"),
-            }
-
             try:
-                if table not in allowed_insert:
+                if table not in adminedit.INSERTABLE:
                     raise ValueError("Ungültige Tabelle für Insert.")
-
-                cols = allowed_insert[table]
-                values = [request.form.get(c) for c in cols]
-
-                # Basic int cleanup for numeric fields
-                int_fields = {
-                    "Clubs": ("liga", "tore", "gegentore", "platzierung"),
-                    "Spieler": ("team", "tore", "vorlagen", "marktwert"),
-                    "Cheftrainer": ("team",),
-                }
-                for i, col in enumerate(cols):
-                    if col in int_fields.get(table, ()):
-                        if values[i] in (None, ""):
-                            values[i] = 0
-                        values[i] = int(values[i])
-
-                # Pflichtfelder (sehr minimal)
-                if table == "Liga" and (not values[0] or not values[1]):
-                    raise ValueError("Liga: name und land sind Pflicht.")
-                if table == "Clubs" and (not request.form.get("name") or not request.form.get("liga")):
-                    raise ValueError("Clubs: name und liga sind Pflicht.")
-                if table == "Spieler" and (not request.form.get("vorname") or not request.form.get("team")):
-                    raise ValueError("Spieler: vorname und team sind Pflicht.")
-                if table == "Cheftrainer" and (not request.form.get("vorname") or not request.form.get("team")):
-                    raise ValueError("Cheftrainer: vorname und team sind Pflicht.")
-
-                placeholders = ", ".join(["%s"] * len(cols))
-                col_sql = ", ".join(cols)
-                sql = f"INSERT INTO {table} ({col_sql}) VALUES ({placeholders})"
-
-                db_write(sql, tuple(values))
+                values = {c: request.form.get(c) for c in adminedit.INSERTABLE[table]}
+                adminedit.apply_batch([{"op": "insert", "table": table, "values": values}])
                 message = f"Neue Zeile in {table} eingefügt."
 
                 # Immer danach Ergebnisse aktualisieren:
                 if q:
-                    liga_rows, clubs_rows, spieler_rows, coach_rows = do_search(q)
-                    results["Liga"] = liga_rows
-                    results["Clubs"] = clubs_rows
-                    results["Spieler"] = spieler_rows
-                    results["Cheftrainer"] = coach_rows
+                    do_search(q)
                 else:
                     # show something so user sees "it happened"
-                    results[table] = db_read(f"SELECT * FROM {table} ORDER BY 1 DESC LIMIT 25", ())
+                    # explizite Spalten: die generierte Spalte "fullname" soll nicht im Formular landen
+                    select_cols = ", ".join(search.ADMIN_TABLES[table]["columns"])
+                    results[table] = db_read(f"SELECT {select_cols} FROM {table} ORDER BY 1 DESC LIMIT 25", ())
 
             except Exception as e:
                 error = f"Einfügen fehlgeschlagen: {e}"
                 logging.exception("Insert failed")
 
+        # ============================
+        # batch: many staged changes (JSON), all or nothing
+        # ============================
+        elif action == "batch":
+            q = (request.form.get("q") or "").strip()
+            try:
+                changes = json.loads(request.form.get("changes") or "[]")
+                if not isinstance(changes, list):
+                    raise adminedit.BatchError("Ungültiges Format.")
+                result = adminedit.apply_batch(changes)
+                message = f"Stapel gespeichert: {result}."
+                # nur die geänderten Zeilen neu lesen statt die ganze Suche
+                results.update(adminedit.fetch_rows(result.changed_rows()))
+                batch_saved = True
+            except ValueError as e:  # inkl. BatchError und kaputtem JSON
+                error = f"Stapel nicht gespeichert, nichts wurde geändert: {e}"
+            except Exception as e:
+                error = f"Stapel nicht gespeichert, nichts wurde geändert: {e}"
+                logging.exception("Batch failed")
 
 
-    return render_template("admin_area.html", message=message, error=error, q=q, results=results)
+
+    return render_template(
+        "admin_area.html",
+        message=message,
+        error=error,
+        q=q,
+        results=results,
+        pages=pages,
+        page_size=page_size,
+        search_tables=search_tables,
+        can_rollback=_can_rollback(),
+        import_job=_import_status(),
+        batch_saved=batch_saved,
+    )
 
 
 
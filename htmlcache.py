@@ -0,0 +1,208 @@
+"""
+Persistenter HTML-Cache für den Transfermarkt-Import.
+
+- Schlüssel: sha256(Saison + URL), Inhalt gzip-komprimiert auf der Platte
+- TTL pro Eintrag; abgelaufene Einträge werden per If-None-Match /
+  If-Modified-Since revalidiert (304 -> alter Inhalt gilt wieder TTL lang)
+- Grössenlimit mit LRU-Verdrängung (letzter Zugriff = mtime der .json-Datei);
+  put() führt die Gesamtgrösse mit und durchsucht das Verzeichnis erst, wenn
+  max_bytes überschritten ist, dann bis auf EVICT_TO * max_bytes
+- Offline-Modus: nur aus dem Cache lesen, nie ins Netz (auch abgelaufen)
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Verdrängen bis auf diesen Anteil von max_bytes, damit nicht jedes put()
+# am Limit wieder das ganze Verzeichnis durchsucht
+EVICT_TO = 0.9
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    ttl: float
+
+    @property
+    def fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HtmlCache:
+    def __init__(self, directory, ttl=6 * 3600, max_bytes=200 * 1024 * 1024, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.lock = threading.Lock()
+        self._bytes = None  # Gesamtgrösse, None = noch nicht gezählt
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @staticmethod
+    def key(url, season=None):
+        return hashlib.sha256(f"{season}|{url}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key):
+        d = os.path.join(self.directory, key[:2])
+        return os.path.join(d, key + ".html.gz"), os.path.join(d, key + ".json")
+
+    def get(self, url, season=None) -> Optional[CacheEntry]:
+        body_path, meta_path = self._paths(self.key(url, season))
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            with gzip.open(body_path, "rt", encoding="utf-8") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        try:
+            os.utime(meta_path)  # LRU: Zugriff merken
+        except OSError:
+            pass  # gerade verdrängt
+        with self.lock:
+            self.hits += 1
+        return CacheEntry(
+            url=url,
+            body=body,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+            fetched_at=meta["fetched_at"],
+            ttl=self.ttl,
+        )
+
+    def put(self, url, body, season=None, etag=None, last_modified=None):
+        body_path, meta_path = self._paths(self.key(url, season))
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+        old_size = self._file_size(body_path) + self._file_size(meta_path)
+
+        # erst in Temp-Dateien schreiben, dann atomar ersetzen
+        tmp_body = f"{body_path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_body, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(body)
+        os.replace(tmp_body, body_path)
+        self._write_meta(meta_path, {
+            "url": url,
+            "season": season,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        })
+        new_size = self._file_size(body_path) + self._file_size(meta_path)
+
+        with self.lock:
+            if self._bytes is None:
+                self._bytes = sum(e[1] for e in self._entries())
+            else:
+                self._bytes += new_size - old_size
+            over = self._bytes > self.max_bytes
+        if over:
+            self.evict()
+
+    def touch(self, entry: CacheEntry, season=None):
+        """Nach 304 Not Modified: Eintrag gilt wieder eine volle TTL."""
+        _, meta_path = self._paths(self.key(entry.url, season))
+        self._write_meta(meta_path, {
+            "url": entry.url,
+            "season": season,
+            "etag": entry.etag,
+            "last_modified": entry.last_modified,
+            "fetched_at": time.time(),
+        })
+        with self.lock:
+            self.revalidated += 1
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _write_meta(meta_path, meta):
+        tmp_meta = f"{meta_path}.{threading.get_ident()}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+    def _entries(self):
+        """[(letzter Zugriff, Grösse, body_path, meta_path)]"""
+        out = []
+        if not os.path.isdir(self.directory):
+            return out
+        for sub in os.listdir(self.directory):
+            d = os.path.join(self.directory, sub)
+            if not os.path.isdir(d):
+                continue
+            for name in os.listdir(d):
+                if not name.endswith(".json"):
+                    continue
+                meta_path = os.path.join(d, name)
+                body_path = meta_path[:-len(".json")] + ".html.gz"
+                try:
+                    atime = os.path.getmtime(meta_path)
+                    size = os.path.getsize(body_path) + os.path.getsize(meta_path)
+                except OSError:
+                    continue
+                out.append((atime, size, body_path, meta_path))
+        return out
+
+    def size(self):
+        return sum(e[1] for e in self._entries())
+
+    def evict(self, target=None):
+        """
+        Am längsten nicht benutzte Einträge löschen, bis der Cache unter
+        target ist (Standard: EVICT_TO * max_bytes); zählt die Grösse neu.
+        """
+        target = self.max_bytes * EVICT_TO if target is None else target
+        with self.lock:
+            entries = sorted(self._entries())
+            total = sum(e[1] for e in entries)
+            for atime, size, body_path, meta_path in entries:
+                if total <= target:
+                    break
+                for path in (body_path, meta_path):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                logger.debug("HtmlCache: verdrängt %s", meta_path)
+            self._bytes = total
+
+    def stats(self):
+        size = self.size()
+        with self.lock:
+            self._bytes = size
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "bytes": size,
+            }
@@ -0,0 +1,69 @@
+"""
+ETag / 304 für Seiten, die nur von einer Datenstand-Generation
+(resultcache.DatasetVersion) und der URL abhängen.
+
+    etag = httpcache.etag("dbexplorer", generation, request.args, current_user.id)
+    if httpcache.fresh(etag):
+        return httpcache.not_modified(etag)
+    ...
+    return httpcache.cacheable(make_response(html), etag)
+
+Die Antworten sind "private, no-cache": Browser (auch Zurück/Vor) dürfen sie
+speichern, fragen aber jedes Mal mit If-None-Match nach. Die 304-Antwort
+kommt ohne SQL und ohne Template. Geteilte Proxies speichern nichts, weil
+die Seiten den eingeloggten Benutzer enthalten.
+
+Die ETags sind schwach (W/"..."): gleicher Tag heisst gleicher Inhalt, aber
+nicht byteweise gleich (z. B. die Laufzeiten im DB Explorer und in den
+Analysen ändern sich mit jeder Berechnung).
+"""
+import glob
+import hashlib
+import os
+
+from flask import Response, request
+
+_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _build_id():
+    """Ändert sich mit jedem Deploy (Templates und Code), in allen Workern gleich."""
+    h = hashlib.sha1()
+    files = glob.glob(os.path.join(_ROOT, "templates", "*.html")) + glob.glob(os.path.join(_ROOT, "*.py"))
+    for path in sorted(files):
+        st = os.stat(path)
+        h.update(f"{os.path.basename(path)}:{st.st_size}:{int(st.st_mtime)};".encode())
+    return h.hexdigest()[:12]
+
+
+BUILD_ID = os.getenv("APP_BUILD_ID") or _build_id()
+
+
+def etag(view, generation, args, user_id):
+    """ETag-Wert oder None, wenn die Generation unbekannt ist (dann nicht cachen)."""
+    if generation is None:
+        return None
+    items = sorted(args.items(multi=True)) if hasattr(args, "items") else sorted(args)
+    raw = repr((BUILD_ID, view, generation, items, user_id))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def fresh(tag):
+    return tag is not None and request.method in ("GET", "HEAD") and request.if_none_match.contains_weak(tag)
+
+
+def _headers(response, tag):
+    response.set_etag(tag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Cookie")
+    return response
+
+
+def not_modified(tag):
+    return _headers(Response(status=304), tag)
+
+
+def cacheable(response, tag):
+    if tag is None or response.status_code != 200:
+        return response
+    return _headers(response, tag)
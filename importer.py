@@ -0,0 +1,512 @@
+"""
+Transfermarkt-Import mit Schattentabellen.
+
+Ablauf:
+1. Liga_new, Clubs_new, Spieler_new, Cheftrainer_new anlegen
+   (CREATE TABLE ... LIKE + Fremdschlüssel unter den Schattentabellen)
+2. Daten per db.bulk_load in die Schattentabellen laden
+3. Zeilenzahlen und Fremdschlüssel prüfen
+4. Ein einziges RENAME TABLE: live -> _old, _new -> live (atomar)
+
+Leser sehen also entweder den alten oder den neuen Stand, nie leere oder
+halbe Tabellen. Die vorherige Generation bleibt als *_old liegen und kann
+mit rollback() sofort zurückgetauscht werden.
+
+Die automatisch benannten Fremdschlüssel (<tabelle>_ibfk_N) benennt MySQL 8
+beim RENAME TABLE mit um, deshalb bleiben die Constraint-Namen eindeutig.
+
+Standard ist aber der inkrementelle Import (run_incremental_import): Abgleich
+über die Transfermarkt-IDs (tm_id, Migration 004), geschrieben werden nur
+neue, geänderte und weggefallene Zeilen. PKs, Admin-Änderungen an anderen
+Zeilen und von Admins angelegte Zeilen (tm_id NULL) bleiben erhalten. Die
+Ranglisten (leaderboards.py) werden dabei nur für die betroffenen Clubs und
+Spieler nachgeführt. Spieler und Cheftrainer gehen blockweise in je einer
+kurzen Transaktion in die DB, während spätere Vereine noch geholt werden;
+dafür ist der Import nicht mehr atomar (siehe run_incremental_import).
+"""
+import logging
+import time
+from dataclasses import dataclass
+
+import leaderboards
+import resultcache
+from db import get_conn, bulk_load, bulk_insert, chunked, BULK_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Eltern vor Kindern
+TABLES = ("Liga", "Clubs", "Spieler", "Cheftrainer")
+
+FOREIGN_KEYS = {
+    "Clubs": [("liga", "Liga", "liganr")],
+    "Spieler": [("team", "Clubs", "teamnr")],
+    "Cheftrainer": [("team", "Clubs", "teamnr")],
+}
+
+PRIMARY_KEYS = {"Liga": "liganr", "Clubs": "teamnr", "Spieler": "spielernr", "Cheftrainer": "trainernr"}
+
+# Alte Zeilen ohne tm_id (aus der Zeit vor Migration 004) werden beim ersten
+# inkrementellen Import über diese Spalte übernommen statt doppelt angelegt.
+ADOPT_BY = {"Liga": "name", "Clubs": "name"}
+
+SHADOW = "_new"
+PREVIOUS = "_old"
+SWAP = "_swap"
+
+# Neuer Stand darf höchstens so stark schrumpfen (sonst ist vermutlich der Scrape kaputt)
+MIN_RATIO = 0.5
+
+
+class ImportValidationError(RuntimeError):
+    pass
+
+
+def _run(cur, sql, params=None):
+    logger.debug("importer: %s", sql)
+    cur.execute(sql, params or ())
+
+
+def _drop_generation(cur, suffix):
+    # Kinder zuerst, sonst blockieren die Fremdschlüssel
+    for t in reversed(TABLES):
+        _run(cur, f"DROP TABLE IF EXISTS {t}{suffix}")
+
+
+def create_shadow_tables():
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        _drop_generation(cur, SHADOW)
+        for t in TABLES:
+            # übernimmt Spalten, generierte Spalten und Indizes, aber keine FKs
+            _run(cur, f"CREATE TABLE {t}{SHADOW} LIKE {t}")
+        for t, fks in FOREIGN_KEYS.items():
+            for col, parent, parent_col in fks:
+                _run(cur, f"ALTER TABLE {t}{SHADOW} ADD FOREIGN KEY ({col}) REFERENCES {parent}{SHADOW}({parent_col})")
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def _count(cur, table):
+    cur.execute(f"SELECT COUNT(*) FROM {table}")
+    return cur.fetchone()[0]
+
+
+def validate_shadow_tables(loaded_tables, min_ratio=MIN_RATIO):
+    """
+    Prüft die Schattentabellen vor dem Tausch:
+    - importierte Tabellen dürfen nicht leer sein und nicht unter min_ratio
+      des aktuellen Stands fallen
+    - keine verwaisten Fremdschlüssel
+    Gibt {tabelle: zeilen} zurück.
+    """
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        counts = {}
+        for t in TABLES:
+            counts[t] = _count(cur, f"{t}{SHADOW}")
+            if t not in loaded_tables:
+                continue
+            live = _count(cur, t)
+            if counts[t] == 0:
+                raise ImportValidationError(f"{t}: Import hat keine Zeilen geliefert.")
+            if live and counts[t] < live * min_ratio:
+                raise ImportValidationError(
+                    f"{t}: nur {counts[t]} statt bisher {live} Zeilen (< {min_ratio:.0%})."
+                )
+
+        for t, fks in FOREIGN_KEYS.items():
+            for col, parent, parent_col in fks:
+                cur.execute(
+                    f"""
+                    SELECT COUNT(*) FROM {t}{SHADOW} c
+                    LEFT JOIN {parent}{SHADOW} p ON p.{parent_col} = c.{col}
+                    WHERE p.{parent_col} IS NULL
+                    """
+                )
+                orphans = cur.fetchone()[0]
+                if orphans:
+                    raise ImportValidationError(f"{t}.{col}: {orphans} Zeilen ohne {parent}.")
+        return counts
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def swap_in_shadow_tables():
+    """Alte Generation wegwerfen, live -> _old und _new -> live in einem RENAME."""
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        _drop_generation(cur, PREVIOUS)
+        renames = [f"{t} TO {t}{PREVIOUS}" for t in TABLES]
+        renames += [f"{t}{SHADOW} TO {t}" for t in TABLES]
+        t0 = time.perf_counter()
+        _run(cur, "RENAME TABLE " + ", ".join(renames))
+        logger.info("importer: Tabellen getauscht in %.1f ms", (time.perf_counter() - t0) * 1000)
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def has_previous_generation():
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute(
+            """
+            SELECT COUNT(*) FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name IN ({})
+            """.format(", ".join(["%s"] * len(TABLES))),
+            tuple(f"{t}{PREVIOUS}" for t in TABLES),
+        )
+        return cur.fetchone()[0] == len(TABLES)
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def rollback():
+    """Live und vorherige Generation in einem RENAME vertauschen."""
+    if not has_previous_generation():
+        raise RuntimeError("Keine vorherige Generation (*_old) vorhanden.")
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        renames = [f"{t} TO {t}{SWAP}" for t in TABLES]
+        renames += [f"{t}{PREVIOUS} TO {t}" for t in TABLES]
+        renames += [f"{t}{SWAP} TO {t}{PREVIOUS}" for t in TABLES]
+        _run(cur, "RENAME TABLE " + ", ".join(renames))
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+    _rebuild_leaderboards()
+    resultcache.bump()
+
+
+def run_import(progress=None):
+    """
+    Kompletter Import über Schattentabellen. Bei einem Fehler (oder Abbruch
+    über progress) bleiben die Live-Tabellen unverändert; die halb gefüllten
+    *_new werden weggeräumt. Gibt (LoadStats-Liste, Zeilen pro Tabelle) zurück.
+
+    progress ist optional (jobs.ImportProgress): Phase, Seiten, Zeilen, Abbruch.
+    """
+    import transfermarktimport  # Scraping-Stack erst im Import-Job laden
+
+    _phase(progress, "shadow tables")
+    create_shadow_tables()
+    try:
+        stats = []
+        for table, columns, rows in transfermarktimport.import_tables(progress=progress):
+            _phase(progress, f"load {table}")
+            if progress:
+                rows = progress.count_rows(rows)
+            stats.append(bulk_load(f"{table}{SHADOW}", columns, rows))
+        _phase(progress, "validate")
+        counts = validate_shadow_tables({st.table[:-len(SHADOW)] for st in stats})
+        _phase(progress, "swap")
+    except Exception:
+        _cleanup_shadow()
+        raise
+    swap_in_shadow_tables()
+    _rebuild_leaderboards()
+    resultcache.bump()
+    return stats, counts
+
+
+def _rebuild_leaderboards():
+    # nach einem RENAME TABLE passen die Ranglisten zu keiner Zeile mehr;
+    # die Live-Tabellen sind aber schon getauscht, also nur melden
+    try:
+        leaderboards.rebuild()
+    except Exception:
+        logger.exception("importer: Ranglisten veraltet, bitte 'python leaderboards.py rebuild'")
+
+
+def _phase(progress, phase):
+    if progress:
+        progress.set_phase(phase)
+        progress.check_cancelled()
+
+
+def _cleanup_shadow():
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        _drop_generation(cur, SHADOW)
+    except Exception:
+        logger.exception("importer: Schattentabellen konnten nicht gelöscht werden")
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+# =========================
+# Inkrementeller Import (Abgleich über tm_id)
+# =========================
+@dataclass
+class TableDiff:
+    table: str
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self):
+        return self.inserted + self.updated + self.deleted
+
+    def __str__(self):
+        return (
+            f"{self.table}: {self.inserted} neu, {self.updated} geändert, "
+            f"{self.deleted} gelöscht, {self.unchanged} unverändert"
+        )
+
+
+def _children(table):
+    """[(kindtabelle, spalte)] die auf table zeigen."""
+    return [(t, col) for t, fks in FOREIGN_KEYS.items() for col, parent, _ in fks if parent == table]
+
+
+def _tm_id_map(cur, table, tm_ids=None):
+    """tm_id -> PK, für alle Zeilen mit tm_id oder nur für tm_ids."""
+    sql = f"SELECT tm_id, {PRIMARY_KEYS[table]} AS pk FROM {table} WHERE tm_id IS NOT NULL"
+    if tm_ids is None:
+        cur.execute(sql)
+        return {r["tm_id"]: r["pk"] for r in cur.fetchall()}
+    out = {}
+    for chunk in chunked(tm_ids, BULK_CHUNK_SIZE):
+        cur.execute(f"{sql} AND tm_id IN ({', '.join(['%s'] * len(chunk))})", tuple(chunk))
+        out.update((r["tm_id"], r["pk"]) for r in cur.fetchall())
+    return out
+
+
+def check_count(table, n, live, min_ratio=MIN_RATIO):
+    """n Datensätze (verschiedene tm_ids) gegen live Zeilen mit tm_id; vor dem ersten Schreiben."""
+    if not n:
+        raise ImportValidationError(f"{table}: Import hat keine Zeilen geliefert.")
+    if n < live * min_ratio:
+        raise ImportValidationError(
+            f"{table}: nur {n} statt bisher {live} Zeilen (< {min_ratio:.0%})."
+        )
+
+
+def current_rows(cur, table, columns, records):
+    """Aktuelle Zeilen zu den tm_ids von records, bei ADOPT_BY auch alte Zeilen ohne tm_id gleichen Namens."""
+    marks = ", ".join(["%s"] * len(records))
+    where = f"tm_id IN ({marks})"
+    params = [rec["tm_id"] for rec in records]
+    adopt_col = ADOPT_BY.get(table)
+    if adopt_col:
+        where += f" OR (tm_id IS NULL AND {adopt_col} IN ({marks}))"
+        params += [rec[adopt_col] for rec in records]
+    cur.execute(f"SELECT {', '.join([PRIMARY_KEYS[table], 'tm_id'] + columns)} FROM {table} WHERE {where}", tuple(params))
+    return cur.fetchall()
+
+
+def diff_chunk(table, columns, records, current, parent_ids, diff):
+    """
+    Einen Block Datensätze (dicts mit tm_id, FKs als tm_id der Eltern) gegen
+    die zugehörigen aktuellen Zeilen (current_rows) abgleichen und in diff
+    mitzählen. Gibt die upserts zurück: Tupel (pk oder None, tm_id, *spalten).
+    """
+    pk = PRIMARY_KEYS[table]
+    by_tm = {r["tm_id"]: r for r in current if r["tm_id"] is not None}
+    adopt_col = ADOPT_BY.get(table)
+    untagged = {r[adopt_col]: r for r in current if r["tm_id"] is None} if adopt_col else {}
+    fks = {col: parent for col, parent, _ in FOREIGN_KEYS.get(table, [])}
+
+    upserts = []
+    for rec in records:
+        values = []
+        for col in columns:
+            v = rec[col]
+            if col in fks:
+                if v not in parent_ids[fks[col]]:
+                    raise ImportValidationError(f"{table}.{col}: {fks[col]} mit tm_id {v!r} fehlt.")
+                v = parent_ids[fks[col]][v]
+            values.append(v)
+
+        row = by_tm.pop(rec["tm_id"], None)
+        if row is None and adopt_col:
+            row = untagged.pop(rec[adopt_col], None)
+        if row is None:
+            upserts.append((None, rec["tm_id"], *values))
+            diff.inserted += 1
+        elif row["tm_id"] == rec["tm_id"] and all(row[c] == v for c, v in zip(columns, values)):
+            diff.unchanged += 1
+        else:
+            upserts.append((row[pk], rec["tm_id"], *values))
+            diff.updated += 1
+    return upserts
+
+
+def gone_rows(cur, table, seen):
+    """PKs der Zeilen mit tm_id, die der Import nicht mehr geliefert hat (gestreamt gelesen)."""
+    cur.execute(f"SELECT {PRIMARY_KEYS[table]} AS pk, tm_id FROM {table} WHERE tm_id IS NOT NULL")
+    gone = []
+    while True:
+        rows = cur.fetchmany(BULK_CHUNK_SIZE)
+        if not rows:
+            return gone
+        gone.extend(r["pk"] for r in rows if r["tm_id"] not in seen)
+
+
+def _delete(cur, table, column, keys):
+    n = 0
+    for chunk in chunked(keys, BULK_CHUNK_SIZE):
+        _run(cur, f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(chunk))})", chunk)
+        n += cur.rowcount
+    return n
+
+
+def _transaction(work):
+    """
+    work(conn, cur, touched) -> geändert? in einer eigenen kurzen Transaktion.
+    Ranglisten und Suchcache werden in derselben Transaktion nachgeführt.
+    """
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor(dictionary=True)
+        touched = leaderboards.Touched()
+        changed = work(conn, cur, touched)
+        if changed:
+            leaderboards.refresh(conn, touched)
+            resultcache.bump(conn)
+        conn.commit()
+        if changed:
+            resultcache.version.expire()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def _upsert_chunk(conn, cur, table, records, parent_ids, diff, touched):
+    """Einen Block abgleichen und schreiben; gibt die Zahl der geschriebenen Zeilen zurück."""
+    pk = PRIMARY_KEYS[table]
+    columns = [c for c in records[0] if c != "tm_id"]
+    upserts = diff_chunk(table, columns, records, current_rows(cur, table, columns, records), parent_ids, diff)
+    if not upserts:
+        return 0
+    # Ranglisten: alter Stand der geänderten Zeilen (z. B. Vereinswechsel)
+    touched.add(conn, table, [u[0] for u in upserts if u[0] is not None])
+    bulk_insert(table, [pk, "tm_id"] + columns, upserts, conn=conn, update=["tm_id"] + columns)
+    touched.add(conn, table, list(_tm_id_map(cur, table, [u[1] for u in upserts]).values()))
+    return len(upserts)
+
+
+def run_incremental_import(progress=None):
+    """
+    Import als Abgleich über tm_id, geschrieben wird schon während des Scrapens:
+    - Liga und Clubs (klein): ganz lesen, Zeilenzahl prüfen, in je einer
+      Transaktion schreiben
+    - Spieler und Cheftrainer: je BULK_CHUNK_SIZE Datensätze eine kurze
+      Transaktion, während spätere Vereine noch geholt werden; gelesen werden
+      nur die aktuellen Zeilen zu den tm_ids des Blocks
+    - zum Schluss in einer Transaktion löschen, was nicht mehr geliefert wurde
+    Der Preis: bricht der Import ab (Fehler, Abbruch, zu wenige Zeilen), bleiben
+    die schon geschriebenen Blöcke stehen, gelöscht wird dann aber nichts.
+    Gibt [TableDiff] in FK-Reihenfolge zurück.
+    """
+    import transfermarktimport  # Scraping-Stack erst im Import-Job laden
+
+    diffs = {}
+    seen = {}
+    parent_ids = {}
+
+    for table, records in transfermarktimport.import_records(progress=progress):
+        _phase(progress, f"write {table}")
+        diff = diffs[table] = TableDiff(table)
+        seen[table] = set()
+
+        if _children(table):
+            # Eltern: vor dem ersten Schreiben gegen den bisherigen Stand prüfen,
+            # danach tm_id -> PK für die Kinder
+            records = list({rec["tm_id"]: rec for rec in records}.values())  # doppelte tm_ids: letzte gewinnt
+
+            def work(conn, cur, touched, table=table, records=records, diff=diff):
+                cur.execute(f"SELECT COUNT(*) AS n FROM {table} WHERE tm_id IS NOT NULL")
+                check_count(table, len(records), cur.fetchone()["n"])
+                n = sum(
+                    _upsert_chunk(conn, cur, table, chunk, parent_ids, diff, touched)
+                    for chunk in chunked(records, BULK_CHUNK_SIZE)
+                )
+                parent_ids[table] = _tm_id_map(cur, table)
+                if progress:
+                    progress.add_rows(n)
+                return n
+
+            seen[table].update(rec["tm_id"] for rec in records)
+            _transaction(work)
+            continue
+
+        # Kinder: blockweise, das Scrapen läuft zwischen den Blöcken ohne Verbindung
+        for chunk in chunked(records, BULK_CHUNK_SIZE):
+            if progress:
+                progress.check_cancelled()
+            chunk = list({rec["tm_id"]: rec for rec in chunk}.values())
+            seen[table].update(rec["tm_id"] for rec in chunk)
+
+            def work(conn, cur, touched, table=table, chunk=chunk, diff=diff):
+                return _upsert_chunk(conn, cur, table, chunk, parent_ids, diff, touched)
+
+            n = _transaction(work)
+            if progress and n:
+                progress.add_rows(n)
+
+    # Löschen: Kinder vor Eltern; Zeilen, die noch auf gelöschte Eltern
+    # zeigen (auch von Admins angelegte), müssen vorher weg
+    _phase(progress, "delete")
+
+    def delete(conn, cur, touched):
+        deletes = {}
+        for table in diffs:
+            if not _children(table):
+                # Kinder sind schon geschrieben, geprüft wird vor dem Löschen
+                cur.execute(f"SELECT COUNT(*) AS n FROM {table} WHERE tm_id IS NOT NULL")
+                check_count(table, len(seen[table]), cur.fetchone()["n"])
+            # was nicht mehr kam, gibt es bei Transfermarkt nicht mehr (nur Zeilen mit tm_id)
+            deletes[table] = gone_rows(cur, table, seen[table])
+            diffs[table].deleted = len(deletes[table])
+        for table in reversed(TABLES):
+            keys = deletes.get(table)
+            if not keys:
+                continue
+            touched.add(conn, table, keys)
+            for child, col in _children(table):
+                touched.add(conn, child, keys, column=col)
+                n = _delete(cur, child, col, keys)
+                if n:
+                    diffs.setdefault(child, TableDiff(child)).deleted += n
+            _delete(cur, table, PRIMARY_KEYS[table], keys)
+            if progress:
+                progress.add_rows(len(keys))
+        if progress:
+            progress.check_cancelled()
+        return any(deletes.values())
+
+    _transaction(delete)
+
+    out = [diffs[t] for t in TABLES if t in diffs]
+    logger.info("importer: %s", "; ".join(str(d) for d in out))
+    return out
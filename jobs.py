@@ -0,0 +1,301 @@
+"""
+Hintergrund-Jobs für den Transfermarkt-Import.
+
+Die Admin-Aktion stellt nur einen Job in die lokale Queue und kehrt sofort
+zurück; ein Worker-Thread in diesem Prozess arbeitet ihn ab. Der Status
+steht in der Tabelle import_jobs (db/migrations/003_import_jobs.sql), damit
+jeder Web-Worker ihn anzeigen und einen Abbruch anfordern kann.
+
+Es läuft immer nur ein Import gleichzeitig: lokal durch die Queue mit
+einem Thread, über Prozesse hinweg durch GET_LOCK() auf einer eigenen
+Verbindung.
+
+Die Queue lebt im Prozess, der Status in der DB: stirbt der Worker (Reload
+über /update_server, Absturz), bleibt die Zeile auf queued/running stehen.
+recover_stale() erkennt solche Jobs daran, dass niemand den Lock hält, und
+schliesst sie ab; submit() und request_cancel() rufen es vorher auf.
+"""
+import logging
+import queue
+import threading
+import time
+
+import mysql.connector
+
+from db import DB_CONFIG, db_read, db_write, get_conn
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "fussball_import"
+
+# Fortschritt höchstens so oft in die DB schreiben / Abbruch prüfen
+PROGRESS_INTERVAL = 2.0
+
+# so lange darf ein Job ohne Lock-Inhaber in queued stehen (Worker holt ihn
+# sonst innerhalb von Sekunden ab), danach gilt er als verwaist
+QUEUED_TIMEOUT = 60
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobBusy(RuntimeError):
+    pass
+
+
+class ImportProgress:
+    """
+    Wird durch importer / transfermarktimport gereicht:
+    phase setzen, Seiten und Zeilen zählen, auf Abbruch prüfen.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.phase = "queued"
+        self.pages_fetched = 0
+        self.rows_written = 0
+        self.stages = None  # Durchsatz pro Pipeline-Stufe (Text)
+        self._last_sync = 0.0
+        self._cancelled = threading.Event()
+
+    def set_phase(self, phase):
+        self.phase = phase
+        logger.info("Import-Job %s: %s", self.job_id, phase)
+        self.sync(force=True)
+
+    def page_fetched(self, n=1):
+        self.pages_fetched += n
+        self.sync()
+
+    def set_stages(self, text):
+        self.stages = text[:1000]
+        self.sync()
+
+    def add_rows(self, n):
+        self.rows_written += n
+        self.sync()
+
+    def count_rows(self, rows):
+        """Zeilen-Generator durchreichen und dabei zählen (+ Abbruch prüfen)."""
+        for row in rows:
+            self.rows_written += 1
+            if self.rows_written % 100 == 0:
+                self.sync()
+            yield row
+
+    def check_cancelled(self):
+        self.sync()
+        if self._cancelled.is_set():
+            raise JobCancelled("Import abgebrochen.")
+
+    def sync(self, force=False):
+        """Fortschritt schreiben und cancel_requested lesen (gedrosselt)."""
+        now = time.monotonic()
+        if not force and now - self._last_sync < PROGRESS_INTERVAL:
+            if self._cancelled.is_set():
+                raise JobCancelled("Import abgebrochen.")
+            return
+        self._last_sync = now
+        db_write(
+            "UPDATE import_jobs SET phase=%s, pages_fetched=%s, rows_written=%s, stages=%s WHERE id=%s",
+            (self.phase, self.pages_fetched, self.rows_written, self.stages, self.job_id),
+        )
+        row = db_read("SELECT cancel_requested FROM import_jobs WHERE id=%s", (self.job_id,), single=True)
+        if row and row["cancel_requested"]:
+            self._cancelled.set()
+        if self._cancelled.is_set():
+            raise JobCancelled("Import abgebrochen.")
+
+
+class JobRunner:
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._work, name="import-jobs", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn):
+        """
+        Job anlegen und einreihen. fn(progress) macht die eigentliche Arbeit
+        und gibt eine Erfolgsmeldung zurück. Wirft JobBusy, wenn schon ein
+        Import wartet oder läuft.
+        """
+        recover_stale()
+        active = latest_job(active_only=True)
+        if active:
+            raise JobBusy(f"Import-Job {active['id']} ist noch {active['status']}.")
+
+        job_id = _insert_job()
+        self._queue.put((job_id, fn))
+        self._ensure_worker()
+        return job_id
+
+    def _work(self):
+        while True:
+            job_id, fn = self._queue.get()
+            try:
+                self._run(job_id, fn)
+            except Exception:
+                logger.exception("Import-Job %s: unerwarteter Fehler im Runner", job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id, fn):
+        # eigene Verbindung nur für den Lock, damit kein Pool-Slot blockiert wird
+        lock_conn = mysql.connector.connect(**DB_CONFIG)
+        cur = lock_conn.cursor()
+        try:
+            cur.execute("SELECT GET_LOCK(%s, 0)", (LOCK_NAME,))
+            if cur.fetchone()[0] != 1:
+                _finish(job_id, "failed", error="Ein anderer Prozess importiert gerade.")
+                return
+
+            # nur wenn der Job noch wartet (nicht schon abgebrochen/aufgeräumt)
+            if not db_write(
+                "UPDATE import_jobs SET status='running', started_at=NOW() WHERE id=%s AND status='queued'",
+                (job_id,),
+            ):
+                logger.info("Import-Job %s: nicht mehr queued, wird übersprungen", job_id)
+                cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cur.fetchone()
+                return
+            progress = ImportProgress(job_id)
+            try:
+                message = fn(progress)
+            except JobCancelled as e:
+                _finish(job_id, "cancelled", progress, error=str(e))
+            except Exception as e:
+                logger.exception("Import-Job %s fehlgeschlagen", job_id)
+                _finish(job_id, "failed", progress, error=str(e))
+            else:
+                _finish(job_id, "done", progress, message=message)
+            finally:
+                cur.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+                cur.fetchone()
+        finally:
+            cur.close()
+            lock_conn.close()
+
+
+def _insert_job():
+    # lastrowid statt latest_job(): ein gleichzeitiges submit() könnte dazwischen einfügen
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        cur.execute("INSERT INTO import_jobs (status, phase) VALUES ('queued', 'queued')")
+        conn.commit()
+        return cur.lastrowid
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+
+
+def _finish(job_id, status, progress=None, message=None, error=None):
+    db_write(
+        """
+        UPDATE import_jobs
+        SET status=%s, phase=%s, pages_fetched=%s, rows_written=%s, stages=%s,
+            message=%s, error=%s, finished_at=NOW()
+        WHERE id=%s
+        """,
+        (
+            status,
+            progress.phase if progress else status,
+            progress.pages_fetched if progress else 0,
+            progress.rows_written if progress else 0,
+            progress.stages if progress else None,
+            (message or "")[:1000] or None,
+            (error or "")[:1000] or None,
+            job_id,
+        ),
+    )
+
+
+def latest_job(active_only=False):
+    sql = "SELECT * FROM import_jobs"
+    if active_only:
+        sql += " WHERE status IN ('queued', 'running')"
+    return db_read(sql + " ORDER BY id DESC LIMIT 1", (), single=True)
+
+
+def get_job(job_id):
+    return db_read("SELECT * FROM import_jobs WHERE id=%s", (job_id,), single=True)
+
+
+def recover_stale():
+    """
+    Jobs abschliessen, die kein Prozess mehr bearbeitet: running ohne
+    Inhaber des Import-Locks (der Lock gehört der Verbindung des Runners und
+    verschwindet mit ihm), queued länger als QUEUED_TIMEOUT ohne Lock.
+    Gibt die Zahl der aufgeräumten Jobs zurück.
+    """
+    n = db_write(
+        """
+        UPDATE import_jobs
+        SET status = IF(cancel_requested, 'cancelled', 'failed'),
+            error = IF(cancel_requested, 'Import abgebrochen.',
+                       'Worker beendet (Neustart/Absturz), Import nicht abgeschlossen.'),
+            finished_at = NOW()
+        WHERE IS_USED_LOCK(%s) IS NULL
+          AND (status = 'running'
+               OR (status = 'queued' AND created_at < NOW() - INTERVAL %s SECOND))
+        """,
+        (LOCK_NAME, QUEUED_TIMEOUT),
+    )
+    if n:
+        logger.warning("%d verwaiste Import-Jobs abgeschlossen", n)
+    return n
+
+
+def request_cancel(job_id):
+    """
+    Abbruch anfordern. Ein wartender Job wird sofort abgeschlossen (der Runner
+    überspringt ihn dann), ein laufender liest das Flag beim nächsten sync(),
+    ein verwaister wird von recover_stale() abgeschlossen.
+    """
+    db_write(
+        """
+        UPDATE import_jobs
+        SET status='cancelled', cancel_requested=1, error='Import abgebrochen.', finished_at=NOW()
+        WHERE id=%s AND status='queued'
+        """,
+        (job_id,),
+    )
+    db_write(
+        "UPDATE import_jobs SET cancel_requested=1 WHERE id=%s AND status='running'",
+        (job_id,),
+    )
+    recover_stale()
+
+
+def job_status(job):
+    """Job-Zeile -> JSON-taugliches dict (inkl. Laufzeit in Sekunden)."""
+    if not job:
+        return None
+    out = dict(job)
+    start = job.get("started_at")
+    end = job.get("finished_at")
+    if start:
+        out["elapsed_sec"] = round(((end or _db_now()) - start).total_seconds(), 1)
+    else:
+        out["elapsed_sec"] = 0.0
+    for k in ("created_at", "started_at", "finished_at"):
+        if out.get(k):
+            out[k] = out[k].isoformat(sep=" ")
+    out["cancel_requested"] = bool(out.get("cancel_requested"))
+    return out
+
+
+def _db_now():
+    return db_read("SELECT NOW() AS now", (), single=True)["now"]
+
+
+RUNNER = JobRunner()
@@ -0,0 +1,287 @@
+"""
+Ranglisten aus vorberechneten Tabellen (db/migrations/008_leaderboards.sql).
+
+    Ligatabelle       ein Club pro Zeile: Platzierung, Tore, Tordifferenz,
+                      Kadergrösse, Kaderwert (SUM(marktwert)), Tore/Vorlagen der Spieler
+    SpielerRangliste  ein Spieler pro Zeile, mit Club und Liga
+
+Gelesen wird nur über Indizes (WHERE liga = ... ORDER BY ... LIMIT k), ohne
+GROUP BY über Clubs und Spieler. Geschrieben wird inkrementell in der
+Transaktion dessen, der Clubs oder Spieler ändert:
+
+    touched = leaderboards.Touched()
+    touched.add(conn, "Spieler", pks)   # vorher: alter Club
+    ... UPDATE / INSERT / DELETE ...
+    touched.add(conn, "Spieler", pks)   # nachher: neuer Club, neue Zeilen
+    leaderboards.refresh(conn, touched)
+    conn.commit()
+
+refresh() rechnet die betroffenen Clubs und Spieler aus den Quelltabellen
+neu aus, statt Deltas mitzuzählen; ein Fehler an einer Stelle kann sich
+also nicht aufsummieren. Der Import über Schattentabellen tauscht ganze
+Tabellen und baut danach alles neu auf (rebuild()).
+
+    python leaderboards.py rebuild   # komplett neu aufbauen
+    python leaderboards.py verify    # mit einer Neuberechnung vergleichen
+"""
+import argparse
+import logging
+import os
+import sys
+from dataclasses import dataclass, field
+
+import metrics
+import resultcache
+from db import BULK_CHUNK_SIZE, chunked, db_read, db_read_many, get_conn
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_LIMIT = int(os.getenv("LEADERBOARD_LIMIT", "25"))
+LEADERBOARD_MAX_LIMIT = 100
+# ab so vielen betroffenen Clubs + Spielern ist ein Neuaufbau billiger
+LEADERBOARD_REBUILD_AT = int(os.getenv("LEADERBOARD_REBUILD_AT", "5000"))
+
+CLUB_COLUMNS = (
+    "teamnr", "liga", "club", "platzierung", "tore", "gegentore", "tordifferenz",
+    "spieler", "kaderwert", "spielertore", "spielervorlagen",
+)
+CLUB_SELECT = """
+    SELECT C.teamnr, C.liga, C.name,
+           COALESCE(C.platzierung, 0), COALESCE(C.tore, 0), COALESCE(C.gegentore, 0),
+           COALESCE(C.tore, 0) - COALESCE(C.gegentore, 0),
+           COUNT(S.spielernr), COALESCE(SUM(S.marktwert), 0),
+           COALESCE(SUM(S.tore), 0), COALESCE(SUM(S.vorlagen), 0)
+    FROM Clubs C
+    LEFT JOIN Spieler S ON S.team = C.teamnr
+"""
+
+SPIELER_COLUMNS = (
+    "spielernr", "team", "liga", "vorname", "nachname", "club", "position",
+    "tore", "vorlagen", "marktwert",
+)
+SPIELER_SELECT = """
+    SELECT S.spielernr, S.team, C.liga, S.vorname, S.nachname, C.name, S.position,
+           COALESCE(S.tore, 0), COALESCE(S.vorlagen, 0), COALESCE(S.marktwert, 0)
+    FROM Spieler S
+    JOIN Clubs C ON C.teamnr = S.team
+"""
+
+PRIMARY_KEYS = {"Clubs": "teamnr", "Spieler": "spielernr"}
+
+
+def _run(cur, sql, params=()):
+    with metrics.timed_query(sql, "leaderboard") as q:
+        cur.execute(sql, params)
+        q.rows = cur.rowcount
+
+
+def _marks(keys):
+    return ", ".join(["%s"] * len(keys))
+
+
+@dataclass
+class Touched:
+    """Welche Zeilen der Ranglisten neu berechnet werden müssen."""
+
+    clubs: set = field(default_factory=set)
+    spieler: set = field(default_factory=set)
+    full: bool = False  # zu viele -> refresh() baut alles neu auf
+
+    def __len__(self):
+        return len(self.clubs) + len(self.spieler)
+
+    def add(self, conn, table, keys, column=None):
+        """
+        Zeilen von table mit column IN keys (Standard: PK) vormerken, dazu die
+        abhängigen: bei Spielern ihr Club (Kaderwert), bei Clubs ihre Spieler
+        (Clubname und Liga stehen in SpielerRangliste). Liga und Cheftrainer
+        gehen in keine Rangliste ein.
+        """
+        keys = [k for k in keys if k is not None]
+        if table not in PRIMARY_KEYS or not keys or self.full:
+            return
+        pk = PRIMARY_KEYS[table]
+        cur = conn.cursor()
+        try:
+            for chunk in chunked(keys, BULK_CHUNK_SIZE):
+                if column and column != pk:
+                    _run(cur, f"SELECT {pk} FROM {table} WHERE {column} IN ({_marks(chunk)})", tuple(chunk))
+                    chunk = [r[0] for r in cur.fetchall()]
+                    if not chunk:
+                        continue
+                if table == "Spieler":
+                    self.spieler.update(chunk)
+                    _run(cur, f"SELECT DISTINCT team FROM Spieler WHERE spielernr IN ({_marks(chunk)})", tuple(chunk))
+                    self.clubs.update(r[0] for r in cur.fetchall())
+                else:
+                    self.clubs.update(chunk)
+                    _run(cur, f"SELECT spielernr FROM Spieler WHERE team IN ({_marks(chunk)})", tuple(chunk))
+                    self.spieler.update(r[0] for r in cur.fetchall())
+                if len(self) > LEADERBOARD_REBUILD_AT:
+                    self.full = True
+                    self.clubs.clear()
+                    self.spieler.clear()
+                    return
+        finally:
+            cur.close()
+
+
+def _replace(cur, table, columns, select, group, key, keys):
+    for chunk in chunked(sorted(keys), BULK_CHUNK_SIZE):
+        params = tuple(chunk)
+        _run(cur, f"DELETE FROM {table} WHERE {columns[0]} IN ({_marks(chunk)})", params)
+        _run(cur, f"INSERT INTO {table} ({', '.join(columns)}) {select} WHERE {key} IN ({_marks(chunk)}){group}", params)
+
+
+def refresh(conn, touched):
+    """Vorgemerkte Zeilen in der Transaktion von conn neu berechnen (Commit macht der Aufrufer)."""
+    if touched.full:
+        return rebuild(conn)
+    if not touched:
+        return
+    cur = conn.cursor()
+    try:
+        _replace(cur, "Ligatabelle", CLUB_COLUMNS, CLUB_SELECT, " GROUP BY C.teamnr", "C.teamnr", touched.clubs)
+        _replace(cur, "SpielerRangliste", SPIELER_COLUMNS, SPIELER_SELECT, "", "S.spielernr", touched.spieler)
+    finally:
+        cur.close()
+    logger.debug("leaderboards: %d Clubs, %d Spieler neu berechnet", len(touched.clubs), len(touched.spieler))
+
+
+def rebuild(conn=None):
+    """
+    Beide Tabellen komplett neu aufbauen, in einer Transaktion (DELETE statt
+    TRUNCATE, Leser sehen bis zum Commit den alten Stand). Mit conn in der
+    Transaktion des Aufrufers. Gibt (clubs, spieler) zurück.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        _run(cur, "DELETE FROM Ligatabelle")
+        _run(cur, f"INSERT INTO Ligatabelle ({', '.join(CLUB_COLUMNS)}) {CLUB_SELECT} GROUP BY C.teamnr")
+        clubs = cur.rowcount
+        _run(cur, "DELETE FROM SpielerRangliste")
+        _run(cur, f"INSERT INTO SpielerRangliste ({', '.join(SPIELER_COLUMNS)}) {SPIELER_SELECT}")
+        spieler = cur.rowcount
+        if own_conn:
+            conn.commit()
+    except Exception:
+        if own_conn:
+            conn.rollback()
+        raise
+    finally:
+        if cur:
+            cur.close()
+        if own_conn:
+            conn.close()
+    logger.info("leaderboards: neu aufgebaut (%d Clubs, %d Spieler)", clubs, spieler)
+    return clubs, spieler
+
+
+def verify():
+    """
+    Ranglisten mit einer Neuberechnung vergleichen.
+    Gibt {tabelle: {"fehlt": [pk], "zuviel": [pk], "abweichend": [pk]}} zurück.
+    """
+    checks = {
+        "Ligatabelle": (CLUB_COLUMNS, CLUB_SELECT + " GROUP BY C.teamnr"),
+        "SpielerRangliste": (SPIELER_COLUMNS, SPIELER_SELECT),
+    }
+    out = {}
+    conn = get_conn()
+    cur = None
+    try:
+        cur = conn.cursor()
+        for table, (columns, select) in checks.items():
+            _run(cur, select)
+            expected = {r[0]: tuple(r) for r in cur.fetchall()}
+            _run(cur, f"SELECT {', '.join(columns)} FROM {table}")
+            actual = {r[0]: tuple(r) for r in cur.fetchall()}
+            out[table] = {
+                "fehlt": sorted(expected.keys() - actual.keys()),
+                "zuviel": sorted(actual.keys() - expected.keys()),
+                # SUM() kommt als Decimal, Decimal(3) == 3
+                "abweichend": sorted(k for k in expected.keys() & actual.keys() if expected[k] != actual[k]),
+            }
+    finally:
+        if cur:
+            cur.close()
+        conn.close()
+    return out
+
+
+# =========================
+# Lesen
+# =========================
+def clamp_limit(limit):
+    return min(max(limit or LEADERBOARD_LIMIT, 1), LEADERBOARD_MAX_LIMIT)
+
+
+def leagues():
+    return db_read("SELECT liganr, name, land FROM Liga ORDER BY name, liganr")
+
+
+def boards(liga=None, limit=LEADERBOARD_LIMIT):
+    """
+    Alle Ranglisten einer Liga (None = alle Ligen) -> {name: rows}.
+    Jede Abfrage liest höchstens limit Zeilen aus einem Index.
+    """
+    where = "WHERE liga = %s " if liga else ""
+    params = (liga,) if liga else ()
+    player_cols = ", ".join(SPIELER_COLUMNS)
+    club_cols = ", ".join(CLUB_COLUMNS)
+    queries = {
+        "scorers": (
+            f"SELECT {player_cols} FROM SpielerRangliste {where}ORDER BY tore DESC, spielernr DESC LIMIT %s",
+            params + (limit,),
+        ),
+        "assists": (
+            f"SELECT {player_cols} FROM SpielerRangliste {where}ORDER BY vorlagen DESC, spielernr DESC LIMIT %s",
+            params + (limit,),
+        ),
+        "values": (
+            f"SELECT {club_cols} FROM Ligatabelle {where}ORDER BY kaderwert DESC, teamnr DESC LIMIT %s",
+            params + (limit,),
+        ),
+    }
+    if liga:
+        queries["standings"] = (
+            f"SELECT {club_cols} FROM Ligatabelle WHERE liga = %s ORDER BY platzierung, teamnr",
+            (liga,),
+        )
+    results, _ = db_read_many(queries)
+    results.setdefault("standings", [])
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ranglisten (Ligatabelle, SpielerRangliste) pflegen")
+    ap.add_argument("command", choices=("rebuild", "verify"))
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.command == "rebuild":
+        clubs, spieler = rebuild()
+        resultcache.bump()  # ETags von /leaderboards
+        print(f"Neu aufgebaut: {clubs} Clubs, {spieler} Spieler.")
+        return 0
+
+    bad = 0
+    for table, diff in verify().items():
+        n = sum(len(v) for v in diff.values())
+        bad += n
+        print(f"{table}: {'ok' if not n else f'{n} Abweichungen'}")
+        for kind, keys in diff.items():
+            if keys:
+                more = f" (+{len(keys) - 10})" if len(keys) > 10 else ""
+                print(f"  {kind}: {', '.join(map(str, keys[:10]))}{more}")
+    if bad:
+        print("Mit 'python leaderboards.py rebuild' neu aufbauen.")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
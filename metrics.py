@@ -0,0 +1,293 @@
+"""
+Messwerte für DB-Abfragen und Routen, ausgegeben unter /metrics im
+Prometheus-Textformat.
+
+- observe_query(): Latenz-Histogramm pro normalisiertem SQL (Literale -> ?),
+  gelieferte/geänderte Zeilen, Fehler, Slow-Query-Log ab SLOW_QUERY_MS
+- observe_checkout(): Wartezeit auf eine Pool-Verbindung
+- init_app(app): Latenz pro Route und Anzahl Abfragen pro Request
+  (Header X-DB-Queries), dazu die Route /metrics
+
+Die Zahlen gelten pro Prozess. Der Zähler pro Request hängt an einer
+ContextVar; Threads aus db.run_many() bekommen den Kontext mitgegeben.
+"""
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("slowquery")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# /metrics nur mit diesem Token (Bearer oder ?token=), ohne Token nur für Admins
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+# höchstens so viele verschiedene SQL-Formen, der Rest landet unter "other"
+MAX_QUERIES = int(os.getenv("METRICS_MAX_QUERIES", "300"))
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+_RE_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_RE_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_RE_PARAM = re.compile(r"%s|%\(\w+\)s")
+_RE_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_SPACE = re.compile(r"\s+")
+
+_lock = threading.Lock()
+
+
+def normalize_sql(sql):
+    """SQL ohne Literale und Platzhalter-Listen, damit gleiche Abfragen zusammenfallen."""
+    s = _RE_STRING.sub("?", sql)
+    s = _RE_PARAM.sub("?", s)
+    s = _RE_NUMBER.sub("?", s)
+    s = _RE_IN_LIST.sub("(...)", s)
+    s = _RE_SPACE.sub(" ", s).strip()
+    return s[:300]
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class QueryStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.lock = threading.Lock()
+
+
+_queries = OrderedDict()  # (sql, kind) -> QueryStats
+_checkout = Histogram()
+_routes = {}  # (route, method, status) -> Histogram
+_route_queries = {}  # route -> Histogram (Abfragen pro Request)
+_collectors = []
+
+_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+# =========================
+# Erfassen
+# =========================
+def observe_query(sql, seconds, rows=0, kind="read", error=False):
+    key = normalize_sql(sql)
+    with _lock:
+        stats = _queries.get((key, kind))
+        if stats is None:
+            if len(_queries) >= MAX_QUERIES:
+                key = "other"
+            stats = _queries.setdefault((key, kind), QueryStats())
+        stats.latency.observe(seconds)
+        stats.rows += max(0, rows or 0)
+        if error:
+            stats.errors += 1
+        slow = seconds * 1000 >= SLOW_QUERY_MS
+        if slow:
+            stats.slow += 1
+
+    req = _request.get()
+    if req is not None:
+        with req.lock:
+            req.queries += 1
+            req.db_seconds += seconds
+
+    if slow:
+        slow_logger.warning("%.1f ms, %s Zeilen: %s", seconds * 1000, rows, key)
+
+
+class timed_query:
+    """
+    with metrics.timed_query(sql, "write") as q:
+        cur.execute(sql); q.rows = cur.rowcount
+    """
+
+    def __init__(self, sql, kind="read"):
+        self.sql = sql
+        self.kind = kind
+        self.rows = 0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe_query(self.sql, time.perf_counter() - self.t0, self.rows, self.kind, error=exc_type is not None)
+
+
+def observe_checkout(seconds):
+    with _lock:
+        _checkout.observe(seconds)
+
+
+def add_collector(fn):
+    """fn() -> [(name, typ, hilfe, [(labels-dict, wert), ...])] für /metrics"""
+    _collectors.append(fn)
+
+
+def start_request():
+    return _request.set(RequestStats())
+
+
+def current_request():
+    return _request.get()
+
+
+def end_request(token, route, method, status, seconds):
+    req = _request.get()
+    _request.reset(token)
+    with _lock:
+        _routes.setdefault((route, method, str(status)), Histogram()).observe(seconds)
+        if req is not None:
+            _route_queries.setdefault(route, Histogram(COUNT_BUCKETS)).observe(req.queries)
+    return req
+
+
+# =========================
+# Ausgabe (Prometheus-Textformat)
+# =========================
+def _label_value(v):
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_label_value(v)}"' for k, v in labels.items()) + "}"
+
+
+def _histogram_lines(name, labels, h):
+    out = []
+    cumulative = 0
+    for upper, n in zip(h.buckets, h.counts):
+        cumulative += n
+        out.append(f"{name}_bucket{_labels({**labels, 'le': upper})} {cumulative}")
+    out.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {h.count}")
+    out.append(f"{name}_sum{_labels(labels)} {h.sum:.6f}")
+    out.append(f"{name}_count{_labels(labels)} {h.count}")
+    return out
+
+
+def _header(name, typ, help_text):
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {typ}"]
+
+
+def render():
+    with _lock:
+        queries = [(k, s.latency, s.rows, s.errors, s.slow) for k, s in _queries.items()]
+        routes = list(_routes.items())
+        route_queries = list(_route_queries.items())
+        checkout = _checkout
+
+        lines = _header("db_query_duration_seconds", "histogram", "Laufzeit pro normalisierter Abfrage")
+        for (sql, kind), h, *_ in queries:
+            lines += _histogram_lines("db_query_duration_seconds", {"query": sql, "kind": kind}, h)
+
+        for name, idx, help_text in (
+            ("db_query_rows_total", 2, "Gelieferte bzw. geänderte Zeilen"),
+            ("db_query_errors_total", 3, "Fehlgeschlagene Abfragen"),
+            ("db_slow_queries_total", 4, f"Abfragen über {SLOW_QUERY_MS:g} ms"),
+        ):
+            lines += _header(name, "counter", help_text)
+            for q in queries:
+                (sql, kind) = q[0]
+                lines.append(f"{name}{_labels({'query': sql, 'kind': kind})} {q[idx]}")
+
+        lines += _header("db_pool_checkout_wait_seconds", "histogram", "Wartezeit auf eine Pool-Verbindung")
+        lines += _histogram_lines("db_pool_checkout_wait_seconds", {}, checkout)
+
+        lines += _header("http_request_duration_seconds", "histogram", "Latenz pro Route")
+        for (route, method, status), h in routes:
+            lines += _histogram_lines(
+                "http_request_duration_seconds", {"route": route, "method": method, "status": status}, h
+            )
+
+        lines += _header("http_request_db_queries", "histogram", "DB-Abfragen pro Request")
+        for route, h in route_queries:
+            lines += _histogram_lines("http_request_db_queries", {"route": route}, h)
+
+    for fn in _collectors:
+        try:
+            for name, typ, help_text, samples in fn():
+                lines += _header(name, typ, help_text)
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        except Exception:
+            logger.exception("metrics collector %r fehlgeschlagen", fn)
+
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    global _checkout
+    with _lock:
+        _queries.clear()
+        _routes.clear()
+        _route_queries.clear()
+        _checkout = Histogram()
+
+
+# =========================
+# Flask
+# =========================
+def init_app(app, allow=None):
+    """
+    Hooks für Latenz pro Route registrieren und /metrics anlegen.
+    allow() entscheidet ohne METRICS_TOKEN, wer /metrics sehen darf.
+    """
+    from flask import Response, g, request
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_t0 = time.perf_counter()
+        g._metrics_token = start_request()
+
+    @app.after_request
+    def _metrics_after(response):
+        g._metrics_status = response.status_code
+        req = current_request()
+        if req is not None:
+            response.headers["X-DB-Queries"] = str(req.queries)
+        return response
+
+    @app.teardown_request
+    def _metrics_end(exc):
+        token = g.pop("_metrics_token", None)
+        if token is None:
+            return
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        status = 500 if exc else getattr(g, "_metrics_status", 200)
+        end_request(token, route, request.method, status, time.perf_counter() - g._metrics_t0)
+
+    @app.route("/metrics")
+    def metrics_endpoint():
+        if METRICS_TOKEN:
+            given = request.args.get("token") or request.headers.get("Authorization", "").removeprefix("Bearer ")
+            if given != METRICS_TOKEN:
+                return Response("forbidden\n", status=403, mimetype="text/plain")
+        elif allow is not None and not allow():
+            return Response("forbidden\n", status=403, mimetype="text/plain")
+        return Response(render(), mimetype="text/plain; version=0.0.4")
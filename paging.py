@@ -0,0 +1,162 @@
+"""
+Keyset-(Seek-)Pagination für Ergebnistabellen.
+
+Statt OFFSET wird der Sortierschlüssel der letzten/ersten Zeile als Cursor
+weitergegeben; die nächste Seite holt nur "Schlüssel > Cursor LIMIT n+1".
+Bedingung und ORDER BY stehen auf den Tabellenspalten in der Abfrage selbst
+(keine abgeleitete Tabelle), damit ein Index Suche und Sortierung abdeckt.
+So bleibt jede Seite gleich teuer und es werden nie mehr als n+1 Zeilen
+als dicts in Python materialisiert.
+"""
+import base64
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+from db import db_read
+
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 500
+
+# Gezählt wird höchstens bis hierhin, darüber wird "1000+" angezeigt
+COUNT_CAP = int(os.getenv("PAGE_COUNT_CAP", "1000"))
+
+
+@dataclass
+class Page:
+    rows: List[dict]
+    next_cursor: Optional[str]
+    prev_cursor: Optional[str]
+    total: int
+    total_exact: bool
+
+    @property
+    def total_label(self):
+        return str(self.total) if self.total_exact else f"{self.total}+"
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def page_size_from(value):
+    try:
+        n = int(value)
+    except (TypeError, ValueError):
+        return PAGE_SIZE
+    return max(1, min(n, MAX_PAGE_SIZE))
+
+
+def _row_key(row, keys):
+    return [row[name] for name, _ in keys]
+
+
+def seek_condition(columns, values, backwards=False):
+    """
+    "Schlüssel > Cursor" (rückwärts "<") über die Spalten selbst, NULL-sicher
+    ausgeschrieben (MySQL sortiert NULL zuerst; ein Zeilenvergleich wäre bei
+    NULL unbekannt). Gibt (sql, params) zurück:
+    (a > x) OR (a <=> x AND b > y) OR (a <=> x AND b <=> y AND pk > z)
+    """
+    ors = []
+    params = []
+    for i, (col, value) in enumerate(zip(columns, values)):
+        if backwards:
+            if value is None:
+                continue  # vor NULL kommt nichts
+            cmp, cmp_params = f"({col} < %s OR {col} IS NULL)", [value]
+        elif value is None:
+            cmp, cmp_params = f"{col} IS NOT NULL", []
+        else:
+            cmp, cmp_params = f"{col} > %s", [value]
+        ors.append("(" + " AND ".join([f"{c} <=> %s" for c in columns[:i]] + [cmp]) + ")")
+        params += list(values[:i]) + cmp_params
+    if not ors:
+        return "1=0", []
+    return "(" + " OR ".join(ors) + ")", params
+
+
+def fetch_page(selects, keys, cursor=None, direction="next", page_size=PAGE_SIZE):
+    """
+    Eine Seite holen.
+
+    selects: [(sql, params)]: SELECTs ohne ORDER BY / LIMIT, die mit ihrer
+             WHERE-Bedingung enden (mit OR nur in Klammern). Mehrere werden
+             per UNION verbunden; jede Teilabfrage bekommt Suchbedingung,
+             ORDER BY und LIMIT selbst.
+    keys:    [(name, spalte)]: Sortierschlüssel, zusammen eindeutig (letzter
+             = PK). spalte ist die indizierte Tabellenspalte, nach der in der
+             Abfrage gesucht und sortiert wird, name ihr Name im Ergebnis.
+    cursor:  Token aus Page.next_cursor / Page.prev_cursor.
+    """
+    values = decode_cursor(cursor)
+    if values is not None and len(values) != len(keys):
+        values = None
+    backwards = values is not None and direction == "prev"
+
+    columns = [col for _, col in keys]
+    order = "DESC" if backwards else "ASC"
+    limit = f" LIMIT {int(page_size) + 1}"
+    parts = []
+    query_params = []
+    for sql, params in selects:
+        query_params += list(params or ())
+        if values is not None:
+            cond, cond_params = seek_condition(columns, values, backwards)
+            sql += f" AND {cond}"
+            query_params += cond_params
+        parts.append(sql + " ORDER BY " + ", ".join(f"{c} {order}" for c in columns) + limit)
+    if len(parts) == 1:
+        sql = parts[0]
+    else:
+        sql = "\nUNION\n".join(f"({p})" for p in parts)
+        sql += " ORDER BY " + ", ".join(f"{name} {order}" for name, _ in keys) + limit
+
+    rows = db_read(sql, tuple(query_params))
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    # vorwärts: "mehr" heisst es gibt eine nächste Seite, rückwärts eine vorherige
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, values is not None
+
+    next_cursor = encode_cursor(_row_key(rows[-1], keys)) if rows and has_next else None
+    prev_cursor = encode_cursor(_row_key(rows[0], keys)) if rows and has_prev else None
+
+    if not has_next and not has_prev:
+        total, exact = len(rows), True
+    else:
+        total, exact = estimate_count(selects)
+
+    return Page(rows, next_cursor, prev_cursor, total, exact)
+
+
+def estimate_count(selects):
+    """COUNT(*) mit Obergrenze COUNT_CAP -> (anzahl, exakt?)"""
+    base_sql = "\nUNION\n".join(sql for sql, _ in selects)
+    row = db_read(
+        f"SELECT COUNT(*) AS n FROM ({base_sql} LIMIT {COUNT_CAP + 1}) AS count_t",
+        tuple(p for _, params in selects for p in (params or ())),
+        single=True,
+    )
+    n = row["n"] if row else 0
+    if n > COUNT_CAP:
+        return COUNT_CAP, False
+    return n, True
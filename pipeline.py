@@ -0,0 +1,82 @@
+"""
+Zähler für Generator-Pipelines (z. B. den Kader-Import).
+
+Jede Stufe wird mit stats.stage(name, generator) umwickelt, in der
+Reihenfolge vorne -> hinten. Gezählt werden die Elemente pro Stufe und die
+Zeit, die next() der Stufe braucht; die eigene Zeit einer Stufe ist ihre
+Zeit minus die der Stufe davor. Was übrig bleibt, verbraucht der Abnehmer
+am Ende (sink, z. B. das Schreiben in die DB).
+"""
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class StageStats:
+    name: str
+    items: int = 0
+    cumulative: float = 0.0  # inkl. aller Stufen davor
+
+
+class PipelineStats:
+    def __init__(self, sink="write"):
+        self.sink = sink
+        self.stages = []
+        self.started = None
+        self.finished = None
+
+    def stage(self, name, iterable):
+        st = StageStats(name)
+        self.stages.append(st)
+        return self._count(st, iterable)
+
+    def _count(self, st, iterable):
+        it = iter(iterable)
+        while True:
+            t0 = time.perf_counter()
+            if self.started is None:
+                self.started = t0
+            try:
+                item = next(it)
+            except StopIteration:
+                st.cumulative += time.perf_counter() - t0
+                if st is self.stages[-1]:
+                    self.finished = time.perf_counter()
+                return
+            st.cumulative += time.perf_counter() - t0
+            st.items += 1
+            yield item
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def snapshot(self):
+        """[{stage, items, per_sec, busy_sec}] inkl. sink als letzte Stufe."""
+        elapsed = self.elapsed
+        out = []
+        before = 0.0
+        for st in self.stages:
+            out.append({
+                "stage": st.name,
+                "items": st.items,
+                "per_sec": st.items / elapsed if elapsed > 0 else 0.0,
+                "busy_sec": max(0.0, st.cumulative - before),
+            })
+            before = st.cumulative
+        if self.stages:
+            last = self.stages[-1]
+            out.append({
+                "stage": self.sink,
+                "items": last.items,
+                "per_sec": last.items / elapsed if elapsed > 0 else 0.0,
+                "busy_sec": max(0.0, elapsed - before),
+            })
+        return out
+
+    def __str__(self):
+        return " | ".join(
+            f"{s['stage']}: {s['items']} ({s['per_sec']:.1f}/s, {s['busy_sec']:.1f}s)" for s in self.snapshot()
+        )
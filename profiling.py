@@ -0,0 +1,161 @@
+"""
+Profiling einzelner Requests für Admins (cProfile).
+
+Ein Admin schaltet es für seine nächsten N Requests ein (Admin-Bereich ->
+Profiling) oder schickt einzelne Requests mit dem Header "X-Profile: 1".
+Pro Request entstehen in PROFILE_DIR ein .prof (pstats, z. B. für snakeviz)
+und ein .txt mit den teuersten Funktionen; dazu DB-Zeit und Abfragen aus
+metrics, damit man SQL, Rendering und Python-Overhead trennen kann.
+Es werden höchstens PROFILE_KEEP Berichte aufbewahrt.
+
+Ohne Profiling kostet es pro Request nur einen Blick in Session und Header.
+"""
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+PROFILE_MAX_REQUESTS = 50
+HEADER = "X-Profile"
+SESSION_KEY = "profile_remaining"
+
+# cProfile kann pro Prozess nur einmal gleichzeitig laufen (ab 3.12 global)
+_busy = threading.Lock()
+
+_RE_NAME = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9]+-[a-z0-9_-]+\.(prof|txt|json)$")
+
+
+def _slug(path):
+    return re.sub(r"[^a-z0-9]+", "-", path.lower()).strip("-")[:40] or "root"
+
+
+def save_report(profiler, method, path, status, seconds, req_stats=None):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}{os.getpid() % 100}-{_slug(path)}"
+    profiler.dump_stats(os.path.join(PROFILE_DIR, base + ".prof"))
+
+    meta = {
+        "name": base,
+        "method": method,
+        "path": path,
+        "status": status,
+        "total_ms": round(seconds * 1000, 1),
+        "db_ms": round(req_stats.db_seconds * 1000, 1) if req_stats else None,
+        "queries": req_stats.queries if req_stats else None,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+    out = io.StringIO()
+    out.write(f"{method} {path} -> {status}, {meta['total_ms']} ms gesamt")
+    if req_stats:
+        out.write(f", davon {meta['db_ms']} ms DB in {meta['queries']} Abfragen")
+    out.write("\n(Abfragen aus db.run_many laufen in anderen Threads und erscheinen hier als Wartezeit)\n\n")
+    stats = pstats.Stats(profiler, stream=out)
+    stats.sort_stats("cumulative").print_stats(40)
+    stats.sort_stats("tottime").print_stats(20)
+    with open(os.path.join(PROFILE_DIR, base + ".txt"), "w", encoding="utf-8") as f:
+        f.write(out.getvalue())
+    with open(os.path.join(PROFILE_DIR, base + ".json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    prune()
+    return meta
+
+
+def list_reports():
+    """Neueste zuerst, [meta-dict]."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    out = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(PROFILE_DIR, name), encoding="utf-8") as f:
+                out.append(json.load(f))
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def prune(keep=None):
+    keep = PROFILE_KEEP if keep is None else keep
+    for meta in list_reports()[keep:]:
+        for ext in (".prof", ".txt", ".json"):
+            try:
+                os.remove(os.path.join(PROFILE_DIR, meta["name"] + ext))
+            except OSError:
+                pass
+
+
+def report_path(filename):
+    """Pfad eines Berichts oder None (nur eigene Dateinamen, kein ../)."""
+    if not _RE_NAME.match(filename):
+        return None
+    path = os.path.join(PROFILE_DIR, filename)
+    return path if os.path.exists(path) else None
+
+
+def init_app(app, is_admin, skip=()):
+    """
+    is_admin() entscheidet, ob der aktuelle Request profiliert werden darf;
+    Endpunkte in skip (z. B. die Berichtsseite selbst) zählen nicht mit.
+    """
+    from flask import g, request, session
+
+    skip = {"static", "metrics_endpoint", *skip}
+
+    @app.before_request
+    def _profile_start():
+        remaining = session.get(SESSION_KEY)
+        if not remaining and request.headers.get(HEADER) != "1":
+            return
+        if request.endpoint in skip or not is_admin():
+            return
+        if not _busy.acquire(blocking=False):
+            return
+        if remaining:
+            session[SESSION_KEY] = remaining - 1
+        g._profiler = cProfile.Profile()
+        g._profile_t0 = time.perf_counter()
+        g._profiler.enable()
+
+    @app.after_request
+    def _profile_stop(response):
+        profiler = g.pop("_profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        _busy.release()
+        try:
+            meta = save_report(
+                profiler,
+                request.method,
+                request.path,
+                response.status_code,
+                time.perf_counter() - g._profile_t0,
+                metrics.current_request(),
+            )
+            response.headers["X-Profile-Report"] = meta["name"]
+        except Exception:
+            logger.exception("Profil konnte nicht gespeichert werden")
+        return response
+
+    @app.teardown_request
+    def _profile_abort(exc):
+        # View ist mit Exception ausgestiegen -> after_request lief nicht
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            _busy.release()
@@ -0,0 +1,210 @@
+"""
+Cache für Suchergebnisse des DB-Explorers.
+
+Liga, Clubs, Spieler und Cheftrainer ändern sich nur durch den Import und
+durch Admin-Änderungen. Jede solche Änderung erhöht die Generation in
+dataset_versions (db/migrations/007_dataset_versions.sql, bump()); die
+Generation ist Teil jedes Cache-Schlüssels, alte Einträge sind danach nicht
+mehr erreichbar und fallen per LRU heraus.
+
+Der Cache selbst liegt pro Prozess im Speicher (höchstens RESULT_CACHE_MB).
+Die Generation liest jeder Prozess höchstens alle DATASET_VERSION_TTL
+Sekunden aus der DB; andere Web-Worker sehen eine Änderung also spätestens
+nach dieser Zeit, der Prozess, der sie gemacht hat, sofort.
+RESULT_CACHE_MB=0 schaltet den Cache ab.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import search
+from db import db_read, db_write
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_MB = float(os.getenv("RESULT_CACHE_MB", "32"))
+DATASET_VERSION_TTL = float(os.getenv("DATASET_VERSION_TTL", "2"))
+
+# Zeilen in dataset_versions: Fussball-Tabellen bzw. users
+FOOTBALL = "fussball"
+USERS = "users"
+
+
+def estimate_size(value):
+    """Grobe Grösse in Bytes (Zeilen aus dem Cursor: dicts mit str/int/...)."""
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if hasattr(value, "__dataclass_fields__"):
+        return sys.getsizeof(value) + sum(estimate_size(getattr(value, f)) for f in value.__dataclass_fields__)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """LRU, begrenzt durch die geschätzte Grösse der Einträge."""
+
+    def __init__(self, max_bytes=int(RESULT_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (bytes, value)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        if self.max_bytes <= 0:
+            return
+        size = estimate_size(key) + estimate_size(value)
+        if size > self.max_bytes // 4:
+            return  # einzelne Riesenergebnisse würden den Cache leerfegen
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old:
+                self.bytes -= old[0]
+            self._data[key] = (size, value)
+            self.bytes += size
+            while self.bytes > self.max_bytes and self._data:
+                _, (n, _) = self._data.popitem(last=False)
+                self.bytes -= n
+                self.evictions += 1
+
+    def drop_older(self, generation):
+        """Einträge älterer Generationen freigeben (Schlüssel beginnen mit der Generation)."""
+        with self._lock:
+            for key in [k for k in self._data if k[0] != generation]:
+                self.bytes -= self._data.pop(key)[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._data),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+class DatasetVersion:
+    """Generation aus dataset_versions, lokal DATASET_VERSION_TTL Sekunden gemerkt."""
+
+    def __init__(self, name=FOOTBALL, ttl=DATASET_VERSION_TTL, cache=None):
+        self.name = name
+        self.ttl = ttl
+        self.cache = cache  # ResultCache, dessen alte Generationen freigegeben werden
+        self._value = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Aktuelle Generation oder None (Tabelle fehlt / DB-Fehler -> nicht cachen)."""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._expires:
+                return self._value
+        try:
+            rows = db_read("SELECT generation FROM dataset_versions WHERE name = %s", (self.name,))
+            value = rows[0]["generation"] if rows else 0
+        except Exception as e:
+            # z. B. Migration 007 fehlt; nach der TTL wird es erneut versucht
+            logger.warning("dataset_versions nicht lesbar, Ergebniscache aus: %s", e)
+            value = None
+        with self._lock:
+            if self.cache is not None and value is not None and value != self._value:
+                self.cache.drop_older(value)
+            self._value = value
+            self._expires = now + self.ttl
+        return value
+
+    def bump(self, conn=None):
+        """
+        Generation erhöhen. Mit conn in der Transaktion des Aufrufers (zählt
+        erst mit dessen Commit, danach expire() aufrufen), sonst sofort.
+        """
+        sql = (
+            "INSERT INTO dataset_versions (name, generation) VALUES (%s, 1) "
+            "ON DUPLICATE KEY UPDATE generation = generation + 1"
+        )
+        if conn is None:
+            db_write(sql, (self.name,))
+        else:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, (self.name,))
+            finally:
+                cur.close()
+            return
+        self.expire()
+
+    def expire(self):
+        with self._lock:
+            self._expires = 0.0
+
+
+cache = ResultCache()
+version = DatasetVersion(FOOTBALL, cache=cache)
+# users-Tabelle (nur für ETags von /users, siehe httpcache.py)
+users_version = DatasetVersion(USERS)
+
+
+def normalize_term(q, mode=None):
+    """
+    Suchbegriffe, die dieselben Treffer liefern, auf einen Schlüssel bringen
+    (Collation ist _ci). Nur für die Wortsuche: dort zählen nur die Wörter.
+    In der Teilstring-Suche geht der Begriff samt Leerzeichen ins LIKE
+    '%q%', "a  b" und "a b" finden also verschiedene Zeilen -> unverändert.
+    """
+    if search.normalize_mode(mode) == search.MODE_SUBSTRING:
+        return q or ""
+    return " ".join((q or "").lower().split())
+
+
+def lookup(section, params):
+    """
+    (key, wert) für einen Abschnitt einer Suche. wert None = nicht im Cache;
+    key None = Cache aus, dann auch nichts speichern.
+    """
+    if cache.max_bytes <= 0:
+        return None, None
+    generation = version.get()
+    if generation is None:
+        return None, None
+    key = (generation, section, params)
+    return key, cache.get(key)
+
+
+def store(key, value):
+    if key is not None:
+        cache.put(key, value)
+
+
+def bump(conn=None, dataset=None):
+    """Nach jeder Änderung an Liga/Clubs/Spieler/Cheftrainer aufrufen (bzw. users mit dataset=users_version)."""
+    try:
+        (dataset or version).bump(conn)
+    except Exception:
+        if conn is not None:
+            raise
+        # ohne Tabelle bleibt der Cache ohnehin aus (version.get() -> None)
+        logger.exception("dataset_versions konnte nicht erhöht werden")
@@ -0,0 +1,270 @@
+"""
+Suchlogik für den DB Explorer.
+
+Zwei Modi:
+- "prefix" (Standard): Wortanfang-Suche, nutzt die Indizes aus
+  db/migrations/001_search_indexes.sql (FULLTEXT + normale B-Tree-Indizes).
+- "substring": die alte %q%-Suche. Findet auch Treffer mitten im Wort,
+  macht aber immer einen Full Table Scan -> nur als expliziter Fallback.
+"""
+import re
+
+MODE_PREFIX = "prefix"
+MODE_SUBSTRING = "substring"
+MODES = (MODE_PREFIX, MODE_SUBSTRING)
+
+# innodb_ft_min_token_size (Default 3): kürzere Wörter stehen nicht im
+# FULLTEXT-Index und werden stattdessen mit LIKE 'w%' auf dem B-Tree gesucht.
+FT_MIN_TOKEN = 3
+
+# Operatoren der FULLTEXT BOOLEAN MODE Syntax, dürfen nicht aus der Eingabe kommen
+_FT_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+
+def normalize_mode(mode):
+    return mode if mode in MODES else MODE_PREFIX
+
+
+def like_escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def split_terms(q: str):
+    """Eingabe in Suchwörter zerlegen (ohne FULLTEXT-Operatoren)."""
+    return [w for w in _FT_OPERATORS.sub(" ", q or "").split() if w]
+
+
+def name_filter(q, fulltext_col, prefix_cols, mode=MODE_PREFIX):
+    """
+    WHERE-Fragment + Parameter für eine Namenssuche.
+
+    prefix:    jedes Wort muss ein Wortanfang im Namen sein.
+               Lange Wörter -> MATCH(fulltext_col) AGAINST('+w*' IN BOOLEAN MODE)
+               kurze Wörter -> (col1 LIKE 'w%' OR col2 LIKE 'w%')
+    substring: (fulltext_col LIKE '%q%' OR col1 LIKE '%q%' OR ...)
+    """
+    if normalize_mode(mode) == MODE_SUBSTRING:
+        like = f"%{q}%"
+        cols = [fulltext_col] + [c for c in prefix_cols if c != fulltext_col]
+        return "(" + " OR ".join(f"{c} LIKE %s" for c in cols) + ")", [like] * len(cols)
+
+    terms = split_terms(q)
+    if not terms:
+        # nur Sonderzeichen eingegeben -> nichts finden statt alles
+        return "1=0", []
+
+    parts = []
+    params = []
+
+    long_terms = [w for w in terms if len(w) >= FT_MIN_TOKEN]
+    if long_terms:
+        parts.append(f"MATCH({fulltext_col}) AGAINST (%s IN BOOLEAN MODE)")
+        params.append(" ".join(f"+{w}*" for w in long_terms))
+
+    for w in terms:
+        if len(w) >= FT_MIN_TOKEN:
+            continue
+        parts.append("(" + " OR ".join(f"{c} LIKE %s" for c in prefix_cols) + ")")
+        params.extend([like_escape(w) + "%"] * len(prefix_cols))
+
+    return " AND ".join(parts), params
+
+
+# Sortierschlüssel pro Abschnitt als (name im Ergebnis, Tabellenspalte), PK
+# als Tiebreaker. Gesucht und sortiert wird auf den Spalten selbst
+# (paging.fetch_page), Spieler und Trainer also über idx_*_nachname
+# (nachname, vorname + PK).
+EXPLORER_KEYS = {
+    "club_players": (("club", "C.name"), ("nachname", "S.nachname"), ("vorname", "S.vorname"), ("spielernr", "S.spielernr")),
+    "player_rows": (("nachname", "S.nachname"), ("vorname", "S.vorname"), ("spielernr", "S.spielernr")),
+    "coach_rows": (("nachname", "T.nachname"), ("vorname", "T.vorname"), ("trainernr", "T.trainernr")),
+    "league_teams": (("platzierung", "C.platzierung"), ("club", "C.name"), ("teamnr", "C.teamnr")),
+}
+
+
+def explorer_queries(q, mode=MODE_PREFIX):
+    """
+    Die vier DB-Explorer-Abfragen als {name: (sql, params)}, ohne ORDER BY,
+    mit der WHERE-Bedingung am Ende. Sortiert wird beim Blättern nach
+    EXPLORER_KEYS[name].
+    """
+    club_where, club_params = name_filter(q, "C.name", ("C.name",), mode)
+    player_where, player_params = name_filter(q, "S.fullname", ("S.vorname", "S.nachname"), mode)
+    coach_where, coach_params = name_filter(q, "T.fullname", ("T.vorname", "T.nachname"), mode)
+    league_where, league_params = name_filter(q, "L.name", ("L.name",), mode)
+
+    return {
+        # 1) Club search -> all its players (values from Spieler)
+        "club_players": (
+            f"""
+            SELECT C.name AS club, S.spielernr, S.team, S.vorname, S.nachname,
+                   S.position, S.tore, S.vorlagen, S.marktwert
+            FROM Clubs C
+            JOIN Spieler S ON S.team = C.teamnr
+            WHERE {club_where}
+            """,
+            tuple(club_params),
+        ),
+        # 2) Player search (may return multiple if same name)
+        "player_rows": (
+            f"""
+            SELECT C.name AS club, S.spielernr, S.team, S.vorname, S.nachname,
+                   S.position, S.tore, S.vorlagen, S.marktwert
+            FROM Spieler S
+            JOIN Clubs C ON C.teamnr = S.team
+            WHERE {player_where}
+            """,
+            tuple(player_params),
+        ),
+        # 3) Coach search (may return multiple if same name)
+        "coach_rows": (
+            f"""
+            SELECT C.name AS club, T.trainernr, T.team, T.vorname, T.nachname
+            FROM Cheftrainer T
+            JOIN Clubs C ON C.teamnr = T.team
+            WHERE {coach_where}
+            """,
+            tuple(coach_params),
+        ),
+        # 4) League search -> teams ordered by platzierung + the league country
+        "league_teams": (
+            f"""
+            SELECT L.name AS liga, L.land, C.platzierung, C.name AS club, C.teamnr, C.tore, C.gegentore
+            FROM Liga L
+            JOIN Clubs C ON C.liga = L.liganr
+            WHERE {league_where}
+            """,
+            tuple(league_params),
+        ),
+    }
+
+
+# =========================
+# Admin-Suche (Query-Planer)
+# =========================
+# Pro Tabelle: PK, angezeigte Spalten, Integer-Spalten, Schlüssel (PK + FK,
+# alle indiziert) und indizierte Textspalten. Die FK-Spalten (liga, team)
+# haben durch den FOREIGN KEY automatisch einen Index.
+ADMIN_TABLES = {
+    "Liga": {
+        "pk": "liganr",
+        "columns": ("liganr", "name", "land"),
+        "int": ("liganr",),
+        "keys": ("liganr",),
+        "fulltext": "name",
+        "names": ("name",),
+        "text": ("land",),
+    },
+    "Clubs": {
+        "pk": "teamnr",
+        "columns": ("teamnr", "liga", "tore", "gegentore", "name", "platzierung"),
+        "int": ("teamnr", "liga", "tore", "gegentore", "platzierung"),
+        "keys": ("teamnr", "liga"),
+        "fulltext": "name",
+        "names": ("name",),
+        "text": (),
+    },
+    "Spieler": {
+        "pk": "spielernr",
+        "columns": ("spielernr", "team", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position"),
+        "int": ("spielernr", "team", "tore", "vorlagen", "marktwert"),
+        "keys": ("spielernr", "team"),
+        "fulltext": "fullname",
+        "names": ("vorname", "nachname"),
+        "text": ("position",),
+    },
+    "Cheftrainer": {
+        "pk": "trainernr",
+        "columns": ("trainernr", "team", "vorname", "nachname"),
+        "int": ("trainernr", "team"),
+        "keys": ("trainernr", "team"),
+        "fulltext": "fullname",
+        "names": ("vorname", "nachname"),
+        "text": (),
+    },
+}
+
+_RE_INT = re.compile(r"^\d+$")
+_RE_RANGE = re.compile(r"^(\d+)\s*(?:-|\.\.)\s*(\d+)$")
+_RE_COLUMN = re.compile(r"^([A-Za-z_]+)\s*:\s*(.*)$")
+
+
+def _int_condition(col, value):
+    """'12' -> col = 12, '10-20' / '10..20' -> col BETWEEN 10 AND 20, sonst None"""
+    value = value.strip()
+    if _RE_INT.match(value):
+        return f"{col} = %s", [int(value)]
+    m = _RE_RANGE.match(value)
+    if m:
+        lo, hi = sorted((int(m.group(1)), int(m.group(2))))
+        return f"{col} BETWEEN %s AND %s", [lo, hi]
+    return None
+
+
+def classify_admin_query(q):
+    """
+    Eingabe einordnen:
+      ("column", spalte, wert)  bei "spalte:wert"
+      ("number", None, q)       bei "12" oder "10-20"
+      ("text", None, q)         sonst
+    """
+    q = (q or "").strip()
+    m = _RE_COLUMN.match(q)
+    if m and any(m.group(1) in t["columns"] for t in ADMIN_TABLES.values()):
+        return "column", m.group(1), m.group(2).strip()
+    if _int_condition("x", q):
+        return "number", None, q
+    return "text", None, q
+
+
+def _admin_where(meta, kind, column, value):
+    """
+    Liste von (where, params). Mehrere Einträge werden per UNION verbunden,
+    damit jede Teilabfrage ihren eigenen Index nutzen kann (ein MATCH in
+    einem OR kann den FULLTEXT-Index nicht verwenden).
+    """
+    if kind == "column":
+        if column not in meta["columns"]:
+            return []
+        if column in meta["int"]:
+            cond = _int_condition(column, value)
+            return [cond] if cond else []
+        if not value:
+            return []
+        return [(f"{column} LIKE %s", [like_escape(value) + "%"])]
+
+    if kind == "number":
+        # PK + FK: MySQL kombiniert die Indizes per index_merge
+        conds = [_int_condition(col, value) for col in meta["keys"]]
+        return [(" OR ".join(c[0] for c in conds), [p for c in conds for p in c[1]])]
+
+    # text: Namen über name_filter, weitere Textspalten als Präfix
+    conds = [name_filter(value, meta["fulltext"], meta["names"])]
+    for col in meta["text"]:
+        conds.append((f"{col} LIKE %s", [like_escape(value) + "%"]))
+    return conds
+
+
+def plan_admin_search(q, tables=None):
+    """
+    Admin-Suche planen: {tabelle: [(sql, params)]} nur für Tabellen,
+    in denen die Eingabe überhaupt sinnvoll gesucht werden kann.
+    Mehrere Teilabfragen verbindet paging.fetch_page per UNION; jede
+    blättert für sich nach dem PK (ADMIN_TABLES[tabelle]["pk"]).
+
+    - Zahl / Bereich ("12", "10-20") -> PK- und FK-Spalten (exakt / BETWEEN)
+    - Text                           -> indizierte Namensspalten (Wortanfang)
+    - "spalte:wert"                  -> nur diese Spalte
+    tables schränkt die Suche auf einzelne Tabellen ein (None = alle).
+    """
+    kind, column, value = classify_admin_query(q)
+    plan = {}
+    for table, meta in ADMIN_TABLES.items():
+        if tables and table not in tables:
+            continue
+        conds = _admin_where(meta, kind, column, value)
+        if not conds:
+            continue
+        cols = ", ".join(meta["columns"])
+        plan[table] = [(f"SELECT {cols} FROM {table} WHERE ({where})", tuple(params)) for where, params in conds]
+    return plan
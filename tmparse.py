@@ -0,0 +1,196 @@
+"""
+Schneller Parser für Transfermarkt-Seiten.
+
+Statt die ganze Seite (Werbung, Skripte, Navigation) als BeautifulSoup-Baum
+aufzubauen, wird nur die Zieltabelle (<table class="items">) per
+String-Suche ausgeschnitten und mit lxml geparst. Ergebnis sind einfache
+Tupel, keine Soup-Objekte.
+"""
+import re
+from html import unescape
+
+import lxml.html
+
+_RE_TABLE_TAG = re.compile(r"<table\b|</table\s*>", re.IGNORECASE)
+_RE_ITEMS_CLASS = re.compile(r"""<table\b[^>]*\bclass\s*=\s*["'][^"']*\bitems\b""", re.IGNORECASE)
+_RE_VEREIN = re.compile(r"/verein/(\d+)")
+_RE_SCORE = re.compile(r"(\d+)\s*:\s*(\d+)")
+_RE_SPIELER = re.compile(r"/profil/spieler/(\d+)")
+_RE_TRAINER = re.compile(r"""<a\b[^>]*href=["'][^"']*/profil/trainer/(\d+)[^"']*["'][^>]*>\s*([^<]+?)\s*</a>""", re.IGNORECASE)
+
+# Spaltenköpfe der Leistungsdaten (Titel des Icons oder Text, de/en)
+GOALS_HEADERS = {"tore", "goals"}
+ASSISTS_HEADERS = {"vorlagen", "assists"}
+
+
+def slice_table(html, start_re=_RE_ITEMS_CLASS):
+    """
+    HTML-Text der ersten passenden Tabelle inkl. verschachtelter Tabellen
+    (z. B. inline-table im Kader), oder None.
+    """
+    m = start_re.search(html)
+    if not m:
+        return None
+    depth = 0
+    for tag in _RE_TABLE_TAG.finditer(html, m.start()):
+        if tag.group(0)[1] == "/":
+            depth -= 1
+            if depth == 0:
+                return html[m.start():tag.end()]
+        else:
+            depth += 1
+    return None
+
+
+def items_table(html):
+    """lxml-Element der Tabelle table.items (Fallback: ganze Seite parsen)."""
+    fragment = slice_table(html)
+    if fragment is not None:
+        return lxml.html.fragment_fromstring(fragment)
+    doc = lxml.html.fromstring(html)
+    found = doc.xpath('//table[contains(concat(" ", normalize-space(@class), " "), " items ")]')
+    if not found:
+        raise ValueError("Tabelle 'table.items' nicht gefunden")
+    return found[0]
+
+
+def _has_class(el, name):
+    return name in (el.get("class") or "").split()
+
+
+def parse_standings(html, max_rank=5):
+    """
+    Tabelle einer Liga -> [(name, tm_id, tore, gegentore, platz), ...]
+    sortiert nach Platz, nur Plätze 1..max_rank.
+    """
+    table = items_table(html)
+    out = []
+    for tr in table.iterfind(".//tbody/tr"):
+        tds = tr.findall("td")
+        zentriert = [td for td in tds if _has_class(td, "zentriert")]
+        if not zentriert:
+            continue
+        rank_text = zentriert[0].text_content().strip()
+        if not rank_text.isdigit():
+            continue
+        rank = int(rank_text)
+        if rank > max_rank:
+            continue
+
+        club = None
+        for td in tds:
+            if _has_class(td, "hauptlink"):
+                club = td.find(".//a")
+                if club is not None:
+                    break
+        if club is None:
+            continue
+        m = _RE_VEREIN.search(club.get("href", ""))
+        if not m:
+            continue
+
+        tore, gegentore = 0, 0
+        for td in zentriert[1:]:
+            score = _RE_SCORE.search(td.text_content())
+            if score:
+                tore, gegentore = int(score.group(1)), int(score.group(2))
+                break
+
+        out.append((club.text_content().strip(), int(m.group(1)), tore, gegentore, rank))
+
+    out.sort(key=lambda x: x[4])
+    return out
+
+
+def _player_cell(tr):
+    """(tm_id, name, position) aus der inline-table eines Kader-Eintrags, sonst None."""
+    link = None
+    for td in tr.iterfind(".//td"):
+        if _has_class(td, "hauptlink"):
+            for a in td.iterfind(".//a"):
+                if _RE_SPIELER.search(a.get("href", "")):
+                    link = a
+                    break
+        if link is not None:
+            break
+    if link is None:
+        return None
+    tm_id = int(_RE_SPIELER.search(link.get("href")).group(1))
+    name = (link.get("title") or link.text_content()).strip()
+
+    position = None
+    inline = tr.find(".//table")
+    if inline is not None:
+        rows = inline.findall(".//tr")
+        if len(rows) > 1:
+            position = rows[-1].text_content().strip() or None
+    return tm_id, name, position
+
+
+def _player_rows(table):
+    """Nur die äusseren Zeilen (nicht die der inline-tables)."""
+    body = table.find("tbody")
+    return body.findall("tr") if body is not None else []
+
+
+def parse_squad(html):
+    """
+    Kaderseite (kader/.../plus/1) -> [(tm_id, name, position, marktwert_text)].
+    Marktwert ist der Text der rechten hauptlink-Spalte, z. B. "€45.00m".
+    """
+    out = []
+    for tr in _player_rows(items_table(html)):
+        player = _player_cell(tr)
+        if player is None:
+            continue
+        mv = ""
+        for td in tr.findall("td"):
+            if _has_class(td, "rechts") and _has_class(td, "hauptlink"):
+                mv = td.text_content().strip()
+        out.append((*player, mv))
+    return out
+
+
+def _header_index(table, names):
+    """Index der td-Spalte, deren Kopf (Text oder title) in names ist (colspan beachtet)."""
+    i = 0
+    for th in table.findall("./thead/tr/th"):
+        labels = {th.text_content().strip().lower()}
+        labels |= {(el.get("title") or "").strip().lower() for el in th.iter()}
+        if labels & names:
+            return i
+        i += int(th.get("colspan") or 1)
+    return None
+
+
+def _int_cell(tds, i):
+    if i is None or i >= len(tds):
+        return 0
+    text = tds[i].text_content().strip()
+    return int(text) if text.isdigit() else 0
+
+
+def parse_performance(html):
+    """
+    Leistungsdaten eines Vereins -> {tm_id: (tore, vorlagen)}.
+    Die Spalten werden über die Kopfzeile gefunden, "-" zählt als 0.
+    """
+    table = items_table(html)
+    goals_col = _header_index(table, GOALS_HEADERS)
+    assists_col = _header_index(table, ASSISTS_HEADERS)
+    out = {}
+    for tr in _player_rows(table):
+        player = _player_cell(tr)
+        if player is None:
+            continue
+        tds = tr.findall("td")
+        out[player[0]] = (_int_cell(tds, goals_col), _int_cell(tds, assists_col))
+    return out
+
+
+def parse_coach(html):
+    """Startseite eines Vereins -> (tm_id, name) des ersten Trainer-Links oder None."""
+    m = _RE_TRAINER.search(html)
+    if not m:
+        return None
+    return int(m.group(1)), unescape(m.group(2)).strip()
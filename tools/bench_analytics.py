@@ -0,0 +1,128 @@
+"""
+Benchmark: analytics.compute() auf synthetischen Daten von 1k bis 1M Spielern.
+
+Die Daten entstehen direkt als DataFrames (gleiche Verteilungen wie
+tools/seed_synthetic.py), gemessen wird nur die Rechnung, ohne DB.
+
+    python tools/bench_analytics.py
+    python tools/bench_analytics.py --sizes 1000,10000 --repeat 5
+    python tools/bench_analytics.py --python-max 0     # ohne Python-Vergleich
+    python tools/bench_analytics.py --db               # zusätzlich analytics.load() gegen .env
+
+Zum Vergleich rechnet eine reine Python-Fassung (Schleife pro Zeile) die
+Liga-Perzentile und die Scorerpunkte pro Mio. bis --python-max Spieler.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import analytics  # noqa: E402
+from make_fixtures import FIRST_NAMES, LAST_NAMES, POSITIONS  # noqa: E402
+
+PLAYERS_PER_CLUB = 25
+CLUBS_PER_LEAGUE = 18
+
+
+def synthetic(n_players, seed=42):
+    """(players, clubs) wie analytics.load() sie liefert."""
+    rnd = np.random.default_rng(seed)
+    n_clubs = max(1, n_players // PLAYERS_PER_CLUB)
+    club_ids = np.arange(1, n_clubs + 1)
+    liga = (club_ids - 1) % max(1, n_clubs // CLUBS_PER_LEAGUE) + 1
+    clubs = pd.DataFrame({
+        "teamnr": club_ids,
+        "liga": liga,
+        "club": [f"Syn FC {i}" for i in club_ids],
+        "platzierung": pd.Series(liga).groupby(liga).cumcount().to_numpy() + 1,
+        "tore": rnd.integers(10, 91, n_clubs),
+        "gegentore": rnd.integers(10, 91, n_clubs),
+        "liga_name": [f"Syn Liga {i}" for i in liga],
+        "land": "Synthetisch",
+    })
+    players = pd.DataFrame({
+        "spielernr": np.arange(1, n_players + 1),
+        "team": rnd.integers(1, n_clubs + 1, n_players),
+        "vorname": rnd.choice(FIRST_NAMES, n_players),
+        "nachname": rnd.choice(LAST_NAMES, n_players),
+        "position": rnd.choice(POSITIONS, n_players),
+        "tore": rnd.integers(0, 41, n_players),
+        "vorlagen": rnd.integers(0, 26, n_players),
+        # Marktwert in Mio., grob logarithmisch verteilt wie in echt
+        "marktwert": np.minimum(200, rnd.lognormal(1.5, 1.2, n_players)).astype("int64"),
+    })
+    return players, clubs
+
+
+def python_reference(players, clubs, limit=analytics.ANALYTICS_LIMIT):
+    """Dasselbe für Perzentile und Scorer/Mio., Zeile für Zeile in Python."""
+    liga_of = dict(zip(clubs["teamnr"].tolist(), clubs["liga"].tolist()))
+    rows = players[["spielernr", "team", "tore", "vorlagen", "marktwert"]].itertuples(index=False)
+
+    t0 = time.perf_counter()
+    per_liga = defaultdict(list)
+    efficiency = []
+    for spielernr, team, tore, vorlagen, marktwert in rows:
+        liga = liga_of.get(team)
+        if liga is None:
+            continue
+        per_liga[liga].append((tore, vorlagen, marktwert))
+        if marktwert >= analytics.ANALYTICS_MIN_VALUE:
+            efficiency.append(((tore + vorlagen) / marktwert, spielernr))
+    quantiles = {}
+    for liga, values in per_liga.items():
+        for i, name in enumerate(("tore", "vorlagen", "marktwert")):
+            col = sorted(v[i] for v in values)
+            quantiles[(liga, name)] = [col[min(len(col) - 1, int(q * len(col)))] for q in analytics.QUANTILES]
+    efficiency.sort(reverse=True)
+    return time.perf_counter() - t0, efficiency[:limit]
+
+
+def _median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="analytics.compute() von 1k bis 1M Spielern messen")
+    ap.add_argument("--sizes", default="1000,10000,100000,1000000")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--python-max", type=int, default=100000, help="Python-Vergleich bis zu so vielen Spielern")
+    ap.add_argument("--db", action="store_true", help="zusätzlich load() + compute() auf der echten DB")
+    args = ap.parse_args()
+
+    print(f"{'spieler':>9} {'clubs':>7} {'compute':>9} {'spieler/s':>11} {'python':>9} {'faktor':>7}")
+    for n in [int(s) for s in args.sizes.split(",") if s]:
+        players, clubs = synthetic(n)
+        analytics.compute(players, clubs)  # Aufwärmen (Imports, Caches von pandas)
+        seconds = _median_time(lambda: analytics.compute(players, clubs), args.repeat)
+        line = f"{n:>9} {len(clubs):>7} {seconds:>8.3f}s {n / seconds:>11.0f}"
+        if n <= args.python_max:
+            py_seconds = statistics.median(python_reference(players, clubs)[0] for _ in range(args.repeat))
+            line += f" {py_seconds:>8.3f}s {py_seconds / seconds:>6.1f}x"
+        print(line)
+
+    if args.db:
+        t0 = time.perf_counter()
+        players, clubs = analytics.load()
+        t1 = time.perf_counter()
+        analytics.compute(players, clubs)
+        t2 = time.perf_counter()
+        print(f"DB: {len(players)} Spieler, load {t1 - t0:.3f}s, compute {t2 - t1:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
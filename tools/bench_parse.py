@@ -0,0 +1,105 @@
+"""
+Parse-Benchmark über die eingecheckten Fixture-Seiten (fixtures/transfermarkt/).
+
+    python tools/bench_parse.py --repeat 20
+
+Vergleicht den alten Weg (ganzer BeautifulSoup-Baum) mit SoupStrainer und
+dem neuen tmparse (nur table.items mit lxml). Ausgabe: Seiten/Sekunde und
+Spitzenspeicher pro Seite (tracemalloc, d. h. Python-Objekte; der C-Heap von
+lxml wird nicht mitgezählt).
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup, SoupStrainer  # noqa: E402
+import tmparse  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS = os.path.join(ROOT, "fixtures", "transfermarkt", "standings_*.html")
+
+
+def _rows_from_table(table):
+    out = []
+    for tr in table.select("tbody tr"):
+        rank = tr.select_one("td.zentriert")
+        if not rank or not rank.text.isdigit():
+            continue
+        r = int(rank.text)
+        if r > 5:
+            continue
+        club = tr.select_one("td.hauptlink a")
+        tm_id = int(re.search(r"/verein/(\d+)", club.get("href", "")).group(1))
+        score = re.search(r"(\d+)\s*:\s*(\d+)", tr.text)
+        tore, gegentore = (int(score.group(1)), int(score.group(2))) if score else (0, 0)
+        out.append((club.text.strip(), tm_id, tore, gegentore, r))
+    out.sort(key=lambda x: x[4])
+    return out
+
+
+def parse_full_tree(html):
+    """So hat transfermarktimport bis jetzt geparst."""
+    return _rows_from_table(BeautifulSoup(html, "lxml").select_one("table.items"))
+
+
+def parse_strainer(html):
+    only = SoupStrainer("table", class_="items")
+    return _rows_from_table(BeautifulSoup(html, "lxml", parse_only=only))
+
+
+def parse_tmparse(html):
+    return tmparse.parse_standings(html, 5)
+
+
+PARSERS = [
+    ("bs4 ganzer Baum (alt)", parse_full_tree),
+    ("bs4 + SoupStrainer", parse_strainer),
+    ("tmparse lxml (neu)", parse_tmparse),
+]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    pages = []
+    for path in sorted(glob.glob(CORPUS)):
+        with open(path, encoding="utf-8") as f:
+            pages.append(f.read())
+    if not pages:
+        sys.exit(f"Keine Seiten gefunden: {CORPUS}")
+    print(f"{len(pages)} Seiten, {sum(len(p) for p in pages) / 1024:.0f} KiB, {args.repeat} Durchläufe\n")
+
+    expected = [parse_full_tree(p) for p in pages]
+
+    for name, fn in PARSERS:
+        # gleiche Ergebnisse wie der alte Parser?
+        same = all(fn(p) == e for p, e in zip(pages, expected))
+
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            for p in pages:
+                fn(p)
+        elapsed = time.perf_counter() - t0
+        rate = args.repeat * len(pages) / elapsed
+
+        tracemalloc.start()
+        peak = 0
+        for p in pages:
+            tracemalloc.reset_peak()
+            fn(p)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+        print(f"{name:<24} {rate:9.1f} Seiten/s   Peak {peak / 1024:8.0f} KiB   {'ok' if same else 'ABWEICHUNG'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: DB-Explorer-Suche "prefix" (Indizes) vs. "substring" (%q%).
+
+Nutzt die Datenbank aus .env. Vorher db/migrations/001_search_indexes.sql ausführen.
+
+    python tools/bench_search.py --seed 100000      # synthetische Spieler anlegen, messen, wieder löschen
+    python tools/bench_search.py --seed 100000 --keep
+    python tools/bench_search.py                    # nur messen
+    python tools/bench_search.py --terms kane "de br" mü
+
+Die Daten legt tools/seed_synthetic.py an (eine Liga, 500 Clubs, deterministisch);
+nach der Messung werden sie mit seed_synthetic.clean() wieder entfernt, sonst
+stünden sie später im DB Explorer und in den Ranglisten.
+
+Gibt pro Suchbegriff und Abfrage den EXPLAIN-Plan (type / key / rows)
+und die Median-Laufzeit beider Modi aus.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from db import get_conn  # noqa: E402
+import search  # noqa: E402
+import seed_synthetic  # noqa: E402
+
+BENCH_CLUBS = 500
+
+
+def seed(n_players, rnd_seed=42):
+    """Synthetische Liga mit BENCH_CLUBS Clubs und n_players Spielern (vorher aufräumen)."""
+    seed_synthetic.clean()
+    seed_synthetic.seed(1, BENCH_CLUBS, n_players, random.Random(rnd_seed))
+    seed_synthetic.refresh_derived()
+
+
+def clean():
+    n = seed_synthetic.clean()
+    seed_synthetic.refresh_derived()
+    return n
+
+
+def explain(cur, sql, params):
+    cur.execute("EXPLAIN " + sql, params)
+    cols = [d[0] for d in cur.description]
+    out = []
+    for row in cur.fetchall():
+        r = dict(zip(cols, row))
+        out.append(f"{r['table']}:{r['type']}/{r['key'] or '-'}/{r['rows']}")
+    return " ".join(out)
+
+
+def timed(cur, sql, params, repeat):
+    times = []
+    n = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        cur.execute(sql, params)
+        n = len(cur.fetchall())
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000, n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seed", type=int, default=0, help="so viele Spieler vorher anlegen")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--keep", action="store_true", help="mit --seed: Daten nach der Messung behalten")
+    ap.add_argument("--terms", nargs="*", default=["kane", "de br", "mü", "thomas müller", "syn fc 12"])
+    args = ap.parse_args()
+
+    if args.seed:
+        t0 = time.perf_counter()
+        seed(args.seed)
+        print(f"{args.seed} Spieler angelegt in {time.perf_counter() - t0:.1f}s")
+
+    conn = get_conn()
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) FROM Spieler")
+        print(f"Spieler in DB: {cur.fetchone()[0]}\n")
+
+        for term in args.terms:
+            print(f"=== '{term}' ===")
+            for mode in search.MODES:
+                for name, (sql, params) in search.explorer_queries(term, mode).items():
+                    order = ", ".join(col for _, col in search.EXPLORER_KEYS[name])
+                    sql = f"{sql} ORDER BY {order}"
+                    plan = explain(cur, sql, params)
+                    ms, n = timed(cur, sql, params, args.repeat)
+                    print(f"  {mode:<9} {name:<13} {ms:8.2f} ms  {n:6d} rows  {plan}")
+            print()
+    finally:
+        cur.close()
+        conn.close()
+        if args.seed and not args.keep:
+            print(f"{clean()} synthetische Liga gelöscht")
+
+
+if __name__ == "__main__":
+    main()
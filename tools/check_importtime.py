@@ -0,0 +1,103 @@
+"""
+Import-Zeit der Web-App prüfen (Kaltstart eines Workers, z. B. nach /update_server).
+
+Startet "python -X importtime -c 'import flask_app'" in einem frischen
+Prozess und schlägt fehl (Exit-Code 1), wenn
+- der Import im Median länger als das Budget dauert,
+- ein Modul des Scraping-Stacks geladen wird (nur der Import-Job braucht es),
+- der Import die Proxy-Variablen aus der Umgebung entfernt.
+
+    python tools/check_importtime.py
+    python tools/check_importtime.py --budget-ms 600 --runs 5 --top 15
+
+Das Budget hängt von der Maschine ab (IMPORT_BUDGET_MS); die Liste der
+verbotenen Module nicht.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "400"))
+# lädt transfermarktimport erst der Import-Job (importer.run_import / run_incremental_import)
+FORBIDDEN = ("transfermarktimport", "tmparse", "requests", "pandas", "numpy", "lxml", "bs4")
+PROXY_PROBE = "http://proxy.invalid:3128"
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)$")
+
+CODE = (
+    "import os, sys\n"
+    "import flask_app\n"
+    f"sys.exit(0 if os.environ.get('HTTP_PROXY') == {PROXY_PROBE!r} else 3)\n"
+)
+
+
+def measure():
+    """Ein Kaltstart -> (Millisekunden für flask_app, [(ms, modul)] direkt darunter, Module darunter, Exit-Code)."""
+    env = dict(os.environ, HTTP_PROXY=PROXY_PROBE)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CODE],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    # Unterimporte stehen vor ihrem Modul: alles seit der letzten Zeile
+    # auf oberster Ebene gehört zu flask_app (site & Co. davor nicht)
+    total = None
+    children = []
+    modules = set()
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        cumulative, depth, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        if depth == 1:
+            if name == "flask_app":
+                total = cumulative / 1000
+                break
+            children, modules = [], set()
+            continue
+        modules.add(name.split(".")[0])
+        if depth == 3:
+            children.append((cumulative / 1000, name))
+    if total is None:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit("import flask_app fehlgeschlagen")
+    return total, children, modules, proc.returncode
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Import-Zeit von flask_app gegen ein Budget prüfen")
+    ap.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--top", type=int, default=10, help="die langsamsten direkten Imports anzeigen")
+    args = ap.parse_args()
+
+    runs = [measure() for _ in range(max(1, args.runs))]
+    median = statistics.median(r[0] for r in runs)
+    _, children, modules, code = runs[-1]
+
+    print(f"import flask_app: {median:.0f} ms (Median aus {len(runs)}, Budget {args.budget_ms:.0f} ms)")
+    for ms, name in sorted(children, reverse=True)[:args.top]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"Budget überschritten: {median:.0f} ms > {args.budget_ms:.0f} ms")
+    loaded = [m for m in FORBIDDEN if m in modules]
+    if loaded:
+        failures.append(f"beim Start geladen, gehört in den Import-Job: {', '.join(loaded)}")
+    if code == 3:
+        failures.append("import flask_app entfernt die Proxy-Variablen (HTTP_PROXY)")
+    elif code:
+        failures.append(f"import flask_app endete mit Exit-Code {code}")
+
+    for f in failures:
+        print(f"FEHLER: {f}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
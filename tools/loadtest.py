@@ -0,0 +1,308 @@
+"""
+Lasttest gegen eine lokal laufende App (flask run) mit lokaler MySQL.
+
+Mehrere Clients (Threads, je eine eigene HTTP-Session mit Login) rufen eine
+Mischung aus Szenarien auf: Login, DB-Explorer-Suche, Admin-Suche und
+Admin-Änderungen. Ausgegeben werden pro Szenario Durchsatz, p50/p95/p99 und
+DB-Abfragen pro Request (Header X-DB-Queries aus metrics.py); das Ergebnis
+landet als JSON in .cache/loadtest/, damit man Läufe vergleichen kann.
+
+    python tools/seed_synthetic.py --players 100000 --user loadtest:geheim
+    ADMIN_PASSWORD=... python tools/loadtest.py --clients 8 --duration 30
+    python tools/loadtest.py --compare .cache/loadtest/vorher.json
+
+Ohne ADMIN_PASSWORD (oder --admin-password) laufen nur die Szenarien ohne
+Admin-Bereich. Die Admin-Änderungen betreffen nur synthetische Zeilen
+(tools/seed_synthetic.py); dafür liest das Skript ein paar IDs direkt aus
+der DB der .env.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+from make_fixtures import FIRST_NAMES, LAST_NAMES  # noqa: E402
+from seed_synthetic import SYNTH_LAND  # noqa: E402
+
+OUT_DIR = os.path.join(ROOT, ".cache", "loadtest")
+DEFAULT_MIX = "dbexplorer=6,admin_search=2,admin_update=1,admin_insert_delete=1,login=1"
+ADMIN_SCENARIOS = ("admin_search", "admin_update", "admin_insert_delete")
+
+
+def search_terms(rnd):
+    """Mischung aus Präfixen, vollen Namen und "Vorname Nachname" wie echte Suchen."""
+    name = rnd.choice(FIRST_NAMES if rnd.random() < 0.5 else LAST_NAMES)
+    kind = rnd.random()
+    if kind < 0.4:
+        return name[: rnd.randint(2, 4)].lower()
+    if kind < 0.8:
+        return name
+    return f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = {}  # name -> [(sekunden, abfragen | None, ok)]
+        self.active = False
+
+    def add(self, name, seconds, queries, ok):
+        if not self.active:
+            return
+        with self.lock:
+            self.samples.setdefault(name, []).append((seconds, queries, ok))
+
+    def summary(self, duration):
+        out = {}
+        for name, samples in sorted(self.samples.items()):
+            times = sorted(s for s, _, ok in samples if ok)
+            queries = [q for _, q, ok in samples if ok and q is not None]
+            out[name] = {
+                "requests": len(samples),
+                "errors": sum(1 for *_, ok in samples if not ok),
+                "rps": round(len(samples) / duration, 2) if duration > 0 else 0.0,
+                "p50_ms": round(percentile(times, 50) * 1000, 1),
+                "p95_ms": round(percentile(times, 95) * 1000, 1),
+                "p99_ms": round(percentile(times, 99) * 1000, 1),
+                "max_ms": round(times[-1] * 1000, 1) if times else 0.0,
+                "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+            }
+        return out
+
+
+class Client:
+    def __init__(self, n, args, recorder, ids):
+        self.n = n
+        self.args = args
+        self.base = args.url.rstrip("/")
+        self.recorder = recorder
+        self.ids = ids
+        self.rnd = random.Random(args.seed + n)
+        self.http = requests.Session()
+        self.counter = 0
+
+    def request(self, name, method, path, ok_status=(200,), **kw):
+        t0 = time.perf_counter()
+        try:
+            r = self.http.request(method, self.base + path, allow_redirects=False, timeout=self.args.timeout, **kw)
+        except requests.RequestException:
+            self.recorder.add(name, time.perf_counter() - t0, None, False)
+            return None
+        seconds = time.perf_counter() - t0
+        queries = r.headers.get("X-DB-Queries")
+        self.recorder.add(name, seconds, int(queries) if queries else None, r.status_code in ok_status)
+        return r
+
+    # --- Szenarien ---
+    def login(self):
+        data = {"username": self.args.user, "password": self.args.password}
+        return self.request("login", "POST", "/login", ok_status=(302,), data=data)
+
+    def admin_login(self):
+        r = self.http.post(
+            self.base + "/adminlogin", data={"admin_password": self.args.admin_password},
+            allow_redirects=False, timeout=self.args.timeout,
+        )
+        return r.status_code == 302 and r.headers.get("Location", "").endswith("/adminarea")
+
+    def dbexplorer(self):
+        self.request("dbexplorer", "GET", "/dbexplorer", params={"q": search_terms(self.rnd)})
+
+    def admin_search(self):
+        self.request("admin_search", "POST", "/adminarea", data={"action": "search", "q": search_terms(self.rnd)})
+
+    def admin_update(self):
+        data = {
+            "action": "update",
+            "table": "Spieler",
+            "pk_name": "spielernr",
+            "pk_value": self.rnd.choice(self.ids["players"]),
+            "tore": self.rnd.randint(0, 40),
+        }
+        self.request("admin_update", "POST", "/adminarea", data=data)
+
+    def admin_insert_delete(self):
+        import db
+
+        self.counter += 1
+        marker = f"LT{self.n}x{self.counter}"[:20]
+        data = {
+            "action": "insert", "table": "Spieler", "team": self.rnd.choice(self.ids["teams"]),
+            "vorname": marker, "nachname": "Loadtest", "tore": 0, "vorlagen": 0, "marktwert": 0, "position": "Test",
+        }
+        if self.request("admin_insert", "POST", "/adminarea", data=data) is None:
+            return
+        rows = db.db_read("SELECT MAX(spielernr) AS id FROM Spieler WHERE vorname = %s", (marker,))
+        if rows and rows[0]["id"]:
+            data = {"action": "delete", "table": "Spieler", "pk_name": "spielernr", "pk_value": rows[0]["id"]}
+            self.request("admin_delete", "POST", "/adminarea", data=data)
+
+    def run(self, scenarios, weights, stop):
+        r = self.login()
+        if r is None or r.status_code != 302:
+            print(f"Client {self.n}: Login fehlgeschlagen", file=sys.stderr)
+            return
+        if any(s in ADMIN_SCENARIOS for s in scenarios) and not self.admin_login():
+            print(f"Client {self.n}: Admin-Login fehlgeschlagen", file=sys.stderr)
+            return
+        while not stop.is_set():
+            name = self.rnd.choices(scenarios, weights)[0]
+            if name == "login":
+                self.login()
+            else:
+                getattr(self, name)()
+
+
+def load_ids():
+    """IDs synthetischer Teams und Spieler für die Admin-Änderungen."""
+    import db
+
+    teams = [r["teamnr"] for r in db.db_read(
+        "SELECT c.teamnr FROM Clubs c JOIN Liga l ON l.liganr = c.liga WHERE l.land = %s LIMIT 1000", (SYNTH_LAND,)
+    )]
+    if not teams:
+        raise SystemExit("Keine synthetischen Daten gefunden, erst tools/seed_synthetic.py ausführen.")
+    marks = ", ".join(["%s"] * len(teams))
+    players = [r["spielernr"] for r in db.db_read(
+        f"SELECT spielernr FROM Spieler WHERE team IN ({marks}) LIMIT 5000", tuple(teams)
+    )]
+    return {"teams": teams, "players": players}
+
+
+def parse_mix(text, with_admin):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if not hasattr(Client, name) or name in ("request", "run", "admin_login"):
+            raise SystemExit(f"Unbekanntes Szenario {name!r}")
+        if name in ADMIN_SCENARIOS and not with_admin:
+            continue
+        mix[name] = float(weight or 1)
+    if not mix:
+        raise SystemExit("Keine Szenarien übrig (Admin-Szenarien brauchen ADMIN_PASSWORD).")
+    return mix
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_table(results):
+    print(f"{'Szenario':<20} {'Req':>6} {'Fehler':>6} {'Req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'DB-Abfr.':>9}")
+    for name, r in results.items():
+        q = "-" if r["queries_per_request"] is None else f"{r['queries_per_request']:.1f}"
+        print(
+            f"{name:<20} {r['requests']:>6} {r['errors']:>6} {r['rps']:>7.1f} "
+            f"{r['p50_ms']:>6.1f}ms {r['p95_ms']:>6.1f}ms {r['p99_ms']:>6.1f}ms {q:>9}"
+        )
+
+
+def compare(before_path, after):
+    with open(before_path, encoding="utf-8") as f:
+        before = json.load(f)
+    print(f"\nVergleich mit {os.path.basename(before_path)} ({before.get('git') or '?'} -> {after.get('git') or '?'}):")
+    for name, r in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if not old:
+            continue
+
+        def delta(key):
+            if not old[key]:
+                return "   n/a"
+            return f"{(r[key] - old[key]) / old[key] * 100:+6.1f}%"
+
+        print(f"  {name:<20} Req/s {delta('rps')}  p95 {delta('p95_ms')}  p99 {delta('p99_ms')}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Lasttest gegen die lokale App")
+    ap.add_argument("--url", default="http://127.0.0.1:5000")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=30, help="Messdauer in Sekunden")
+    ap.add_argument("--warmup", type=float, default=3, help="Sekunden vorher, die nicht zählen")
+    ap.add_argument("--mix", default=DEFAULT_MIX, help="Szenario=Gewicht, kommagetrennt")
+    ap.add_argument("--user", default=os.getenv("LOADTEST_USER", "loadtest"))
+    ap.add_argument("--password", default=os.getenv("LOADTEST_PASSWORD", "loadtest"))
+    ap.add_argument("--admin-password", default=os.getenv("ADMIN_PASSWORD"))
+    ap.add_argument("--timeout", type=float, default=30)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--label", default="", help="frei wählbarer Name für den Lauf")
+    ap.add_argument("--out", default=None, help="JSON-Datei (Standard: .cache/loadtest/<zeit>.json)")
+    ap.add_argument("--compare", default=None, help="früheres Ergebnis zum Vergleich")
+    args = ap.parse_args()
+
+    if args.clients < 1:
+        raise SystemExit("--clients muss mindestens 1 sein")
+    mix = parse_mix(args.mix, with_admin=bool(args.admin_password))
+    ids = load_ids() if any(s in ("admin_update", "admin_insert_delete") for s in mix) else {}
+
+    recorder = Recorder()
+    stop = threading.Event()
+    clients = [Client(i, args, recorder, ids) for i in range(args.clients)]
+    threads = [
+        threading.Thread(target=c.run, args=(list(mix), list(mix.values()), stop), daemon=True) for c in clients
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(args.warmup)
+    recorder.active = True
+    t0 = time.perf_counter()
+    time.sleep(args.duration)
+    recorder.active = False
+    duration = time.perf_counter() - t0
+    stop.set()
+    for t in threads:
+        t.join(timeout=args.timeout)
+
+    result = {
+        "label": args.label,
+        "git": git_revision(),
+        "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time() - duration)),
+        "config": {
+            "url": args.url, "clients": args.clients, "duration": args.duration,
+            "warmup": args.warmup, "mix": mix, "seed": args.seed,
+        },
+        "duration": round(duration, 2),
+        "scenarios": recorder.summary(duration),
+    }
+    print_table(result["scenarios"])
+
+    out = args.out
+    if out is None:
+        os.makedirs(OUT_DIR, exist_ok=True)
+        name = time.strftime("%Y%m%d-%H%M%S") + (f"-{re.sub(r'[^A-Za-z0-9_-]+', '-', args.label)}" if args.label else "")
+        out = os.path.join(OUT_DIR, name + ".json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nErgebnis: {out}")
+
+    if args.compare:
+        compare(args.compare, result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Erzeugt die Fixture-Seiten in fixtures/transfermarkt/ (nachgebaute
+Transfermarkt-Seiten mit Navigation, Skripten und Werbung drumherum).
+
+    python tools/make_fixtures.py
+
+Die erzeugten Tabellenseiten sind eingecheckt; das Skript ist nur nötig, wenn
+sich der Aufbau der Seiten ändern soll. Deterministisch (fester Seed).
+Die Vereinsseiten (Kader, Leistungsdaten, Startseite) erzeugt der Stub-Server
+direkt aus den Funktionen hier (CLUB_PAGES).
+"""
+import os
+import random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUT = os.path.join(ROOT, "fixtures", "transfermarkt")
+
+LEAGUES = {
+    "GB1": [("Arsenal FC", 11), ("Manchester City", 281), ("Liverpool FC", 31), ("Chelsea FC", 631),
+            ("Aston Villa", 405), ("Newcastle United", 762), ("Tottenham Hotspur", 148),
+            ("Manchester United", 985), ("Brighton & Hove Albion", 1237), ("West Ham United", 379)],
+    "ES1": [("Real Madrid", 418), ("FC Barcelona", 131), ("Atlético de Madrid", 13), ("Athletic Bilbao", 621),
+            ("Villarreal CF", 1050), ("Real Betis Balompié", 150), ("Real Sociedad", 681),
+            ("Girona FC", 12321), ("Valencia CF", 1049), ("Sevilla FC", 368)],
+    "IT1": [("Inter Milan", 46), ("SSC Napoli", 6195), ("Juventus FC", 506), ("AC Milan", 5),
+            ("Atalanta BC", 800), ("AS Roma", 12), ("SS Lazio", 398), ("Bologna FC 1909", 1025),
+            ("ACF Fiorentina", 430), ("Torino FC", 416)],
+    "L1": [("Bayern Munich", 27), ("Bayer 04 Leverkusen", 15), ("Borussia Dortmund", 16),
+           ("RB Leipzig", 23826), ("VfB Stuttgart", 79), ("Eintracht Frankfurt", 24),
+           ("SC Freiburg", 60), ("VfL Wolfsburg", 82), ("TSG 1899 Hoffenheim", 533), ("1.FC Union Berlin", 89)],
+    "FR1": [("Paris Saint-Germain", 583), ("Olympique Marseille", 244), ("AS Monaco", 162),
+            ("LOSC Lille", 1082), ("Olympique Lyon", 1041), ("OGC Nice", 417), ("RC Lens", 826),
+            ("Stade Rennais FC", 273), ("Stade Brestois 29", 3911), ("RC Strasbourg Alsace", 667)],
+}
+
+SCRIPT = """<script type="text/javascript">
+window.tmConfig = window.tmConfig || {}; (function(){var q=[];for(var i=0;i<%d;i++){q.push({slot:'ad-'+i,
+sizes:[[300,250],[728,90]],targeting:{page:'tabelle',pos:i}})}window.tmConfig.adQueue=q;})();
+</script>"""
+
+NAV = "".join(
+    f'<li class="main-nav__item"><a href="/navigation/{i}" title="Menu {i}">Menüpunkt {i}</a>'
+    f'<ul class="sub">{"".join(f"<li><a href=/nav/{i}/{j}>Unterpunkt {j}</a></li>" for j in range(12))}</ul></li>'
+    for i in range(40)
+)
+
+
+def standings_page(wid, clubs, rnd):
+    rows = []
+    for rank, (name, tm_id) in enumerate(clubs, start=1):
+        played = 34
+        wins = rnd.randint(8, 25)
+        draws = rnd.randint(3, played - wins)
+        losses = played - wins - draws
+        tore = rnd.randint(35, 95)
+        gegentore = rnd.randint(20, 60)
+        slug = name.lower().replace(" ", "-").replace("&", "").replace(".", "")
+        cls = "odd" if rank % 2 else "even"
+        rows.append(f"""
+        <tr class="{cls}">
+          <td class="rechts tab-platz-{rank}">{rank}</td>
+          <td class="zentriert">{rank}</td>
+          <td class="zentriert no-border-rechts"><a href="/{slug}/spielplan/verein/{tm_id}/saison_id/2025"><img src="https://tmssl.akamaized.net/images/wappen/tiny/{tm_id}.png" title="{name}" alt="{name}" class="" /></a></td>
+          <td class="no-border-links hauptlink"><a title="{name}" href="/{slug}/spielplan/verein/{tm_id}/saison_id/2025">{name}</a></td>
+          <td class="zentriert"><a title="{name}" href="/{slug}/spielplan/verein/{tm_id}/saison_id/2025">{played}</a></td>
+          <td class="zentriert">{wins}</td>
+          <td class="zentriert">{draws}</td>
+          <td class="zentriert">{losses}</td>
+          <td class="zentriert">{tore}:{gegentore}</td>
+          <td class="zentriert">{tore - gegentore}</td>
+          <td class="zentriert">{wins * 3 + draws}</td>
+        </tr>""")
+
+    ads = "".join(
+        f'<div class="werbung werbung-{i}"><div id="ad-{i}" data-sizes="300x250">'
+        f'{"<span class=filler>&nbsp;</span>" * 40}</div></div>'
+        for i in range(30)
+    )
+    return f"""<!DOCTYPE html>
+<html lang="de">
+<head>
+  <meta charset="utf-8">
+  <title>Tabelle {wid} 25/26 | Transfermarkt</title>
+  {SCRIPT % 200}
+  {SCRIPT % 150}
+  <link rel="stylesheet" href="/css/main.css">
+</head>
+<body>
+  <header><nav><ul class="main-nav">{NAV}</ul></nav></header>
+  {ads}
+  <main>
+    <div class="box">
+      <h2 class="content-box-headline">Tabelle</h2>
+      <div class="responsive-table">
+        <table class="items">
+          <thead>
+            <tr>
+              <th class="zentriert">#</th><th class="zentriert">#</th><th colspan="2">Verein</th>
+              <th class="zentriert">Sp.</th><th class="zentriert">S</th><th class="zentriert">U</th>
+              <th class="zentriert">N</th><th class="zentriert">Tore</th><th class="zentriert">+/-</th>
+              <th class="zentriert">Pkt.</th>
+            </tr>
+          </thead>
+          <tbody>{"".join(rows)}
+          </tbody>
+        </table>
+      </div>
+    </div>
+  </main>
+  {ads}
+  <footer>{NAV}</footer>
+  {SCRIPT % 300}
+</body>
+</html>
+"""
+
+
+# =========================
+# Vereinsseiten (Kader, Leistungsdaten, Startseite)
+# =========================
+# Werden nicht eingecheckt: tools/stub_server.py erzeugt sie bei Bedarf,
+# deterministisch pro Vereins-ID (Seed = tm_id).
+FIRST_NAMES = ["Bukayo", "Martin", "Declan", "William", "Gabriel", "Kai", "Leandro", "Jurriën", "Ben", "David",
+               "Jorginho", "Thomas", "Pedro", "N'Golo", "Mikel", "Lucas", "Jules", "Florian", "Jamal", "Joshua",
+               "Aurélien", "Federico", "Antoine", "Rafael", "Nicolò", "Khvicha", "Victor", "Lautaro", "Moritz"]
+LAST_NAMES = ["Saka", "Ødegaard", "Rice", "Saliba", "Martinelli", "Havertz", "Trossard", "Timber", "White",
+              "Raya", "Kimmich", "Müller", "González", "Kanté", "Merino", "Hernández", "Koundé", "Wirtz",
+              "Musiala", "Tchouaméni", "Valverde", "Griezmann", "Leão", "Barella", "Kvaratskhelia",
+              "Osimhen", "Martínez", "Nübel", "Alexander-Arnold", "Fernández de la Cruz Echeverría"]
+SINGLE_NAMES = ["Rodri", "Pedri", "Gavi", "Casemiro", "Vitinha"]
+POSITIONS = ["Goalkeeper"] * 3 + ["Centre-Back"] * 5 + ["Left-Back", "Right-Back"] * 2 + \
+            ["Defensive Midfield", "Central Midfield", "Central Midfield", "Attacking Midfield"] * 2 + \
+            ["Left Winger", "Right Winger", "Centre-Forward", "Centre-Forward", "Second Striker"]
+COACHES = ["Mikel Arteta", "Pep Guardiola", "Arne Slot", "Enzo Maresca", "Unai Emery", "Carlo Ancelotti",
+           "Hansi Flick", "Diego Simeone", "Simone Inzaghi", "Xabi Alonso", "Vincent Kompany", "Luis Enrique"]
+
+PLAYERS_PER_CLUB = 26
+
+
+def club_name(tm_id):
+    for clubs in LEAGUES.values():
+        for name, cid in clubs:
+            if cid == tm_id:
+                return name
+    return f"Verein {tm_id}"
+
+
+def slugify(name):
+    return name.lower().replace(" ", "-").replace("&", "").replace(".", "")
+
+
+def squad(tm_id):
+    """[(spieler_id, name, position, marktwert_text, tore, vorlagen)] für einen Verein."""
+    rnd = random.Random(tm_id)
+    out = []
+    for i, position in enumerate(POSITIONS[:PLAYERS_PER_CLUB]):
+        if rnd.random() < 0.08:
+            name = rnd.choice(SINGLE_NAMES)
+        else:
+            name = f"{rnd.choice(FIRST_NAMES)} {rnd.choice(LAST_NAMES)}"
+        mv = rnd.choice([f"€{rnd.randint(1, 180)}.00m", f"€{rnd.randint(1, 9) * 100}k", "-"])
+        attacking = "Forward" in position or "Winger" in position or "Striker" in position
+        tore = rnd.randint(0, 25) if attacking else rnd.randint(0, 4)
+        vorlagen = rnd.randint(0, 12) if position != "Goalkeeper" else 0
+        out.append((tm_id * 100 + i, name, position, mv, tore, vorlagen))
+    return out
+
+
+def _page(title, body):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>{title} | Transfermarkt</title>
+  {SCRIPT % 60}
+</head>
+<body>
+  <header><nav><ul class="main-nav">{NAV}</ul></nav></header>
+  <main>{body}</main>
+  <footer>{NAV}</footer>
+</body>
+</html>
+"""
+
+
+def _player_td(pid, name, position):
+    slug = slugify(name)
+    return f"""<td class="posrela">
+            <table class="inline-table">
+              <tr>
+                <td rowspan="2"><img src="https://img.a.transfermarkt.technology/portrait/small/{pid}.jpg" title="{name}" class="bilderrahmen-fixed" /></td>
+                <td class="hauptlink"><a title="{name}" href="/{slug}/profil/spieler/{pid}">{name}</a></td>
+              </tr>
+              <tr><td>{position}</td></tr>
+            </table>
+          </td>"""
+
+
+def kader_page(tm_id):
+    rows = []
+    for i, (pid, name, position, mv, _, _) in enumerate(squad(tm_id), start=1):
+        cls = "odd" if i % 2 else "even"
+        rows.append(f"""
+        <tr class="{cls}">
+          <td class="zentriert rueckennummer"><div class="rn_nummer">{i}</div></td>
+          {_player_td(pid, name, position)}
+          <td class="zentriert">Sep 5, 2001 ({20 + i % 12})</td>
+          <td class="zentriert"><img src="/flagge/189.png" title="England" class="flaggenrahmen" /></td>
+          <td class="zentriert">1,{78 + i % 15}m</td>
+          <td class="zentriert">right</td>
+          <td class="zentriert">Jul 1, 2021</td>
+          <td class="rechts hauptlink"><a href="/{slugify(name)}/marktwertverlauf/spieler/{pid}">{mv}</a></td>
+        </tr>""")
+    body = f"""
+    <div class="box">
+      <h2 class="content-box-headline">Squad {club_name(tm_id)}</h2>
+      <table class="items">
+        <thead><tr>
+          <th>#</th><th>Player</th><th>Date of birth/Age</th><th>Nat.</th><th>Height</th>
+          <th>Foot</th><th>Joined</th><th class="rechts">Market value</th>
+        </tr></thead>
+        <tbody>{"".join(rows)}
+        </tbody>
+      </table>
+    </div>"""
+    return _page(f"{club_name(tm_id)} - Squad", body)
+
+
+def leistungsdaten_page(tm_id):
+    rows = []
+    for i, (pid, name, position, _, tore, vorlagen) in enumerate(squad(tm_id), start=1):
+        cls = "odd" if i % 2 else "even"
+        apps = max(tore, vorlagen, i % 30)
+        rows.append(f"""
+        <tr class="{cls}">
+          <td class="zentriert rueckennummer"><div class="rn_nummer">{i}</div></td>
+          {_player_td(pid, name, position)}
+          <td class="zentriert">{20 + i % 12}</td>
+          <td class="zentriert"><img src="/flagge/189.png" title="England" class="flaggenrahmen" /></td>
+          <td class="zentriert">{apps + 2}</td>
+          <td class="zentriert">{apps or "-"}</td>
+          <td class="zentriert">{tore or "-"}</td>
+          <td class="zentriert">{vorlagen or "-"}</td>
+          <td class="zentriert">{i % 6 or "-"}</td>
+          <td class="rechts">{apps * 71}'</td>
+        </tr>""")
+    body = f"""
+    <div class="box">
+      <h2 class="content-box-headline">Detailed stats {club_name(tm_id)}</h2>
+      <table class="items">
+        <thead><tr>
+          <th>#</th><th>Player</th><th class="zentriert">Age</th><th class="zentriert">Nat.</th>
+          <th class="zentriert">In squad</th>
+          <th class="zentriert"><span title="Appearances" class="icon-einsatz-table-header">&nbsp;</span></th>
+          <th class="zentriert"><span title="Goals" class="icon-tor-table-header">&nbsp;</span></th>
+          <th class="zentriert"><span title="Assists" class="icon-vorlage-table-header">&nbsp;</span></th>
+          <th class="zentriert"><span title="Yellow cards" class="icon-gelb-table-header">&nbsp;</span></th>
+          <th class="rechts"><span title="Minutes played" class="icon-minuten-table-header">&nbsp;</span></th>
+        </tr></thead>
+        <tbody>{"".join(rows)}
+        </tbody>
+      </table>
+    </div>"""
+    return _page(f"{club_name(tm_id)} - Detailed stats", body)
+
+
+def startseite_page(tm_id):
+    name = club_name(tm_id)
+    coach = COACHES[tm_id % len(COACHES)]
+    players = "".join(
+        f'<li><a href="/{slugify(n)}/profil/spieler/{pid}">{n}</a></li>' for pid, n, *_ in squad(tm_id)[:5]
+    )
+    body = f"""
+    <div class="data-header"><h1>{name}</h1></div>
+    <div class="box"><h2 class="content-box-headline">Top players</h2><ul>{players}</ul></div>
+    <div class="box">
+      <h2 class="content-box-headline">Manager</h2>
+      <div class="container-hauptinfo">
+        <a href="/{slugify(coach)}/profil/trainer/{900000 + tm_id}" title="{coach}">{coach}</a>
+      </div>
+    </div>"""
+    return _page(f"{name} - Club profile", body)
+
+
+CLUB_PAGES = {
+    "kader": kader_page,
+    "leistungsdaten": leistungsdaten_page,
+    "startseite": startseite_page,
+}
+
+
+def main():
+    rnd = random.Random(2025)
+    os.makedirs(OUT, exist_ok=True)
+    for wid, clubs in LEAGUES.items():
+        path = os.path.join(OUT, f"standings_{wid}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(standings_page(wid, clubs, rnd))
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
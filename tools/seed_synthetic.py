@@ -0,0 +1,164 @@
+"""
+Synthetischer Datensatz für Last- und Benchmark-Tests.
+
+Füllt Liga, Clubs, Spieler und Cheftrainer in beliebiger Grösse, alles mit
+db.bulk_load (executemany-Batches bzw. LOAD DATA mit --method infile).
+Deterministisch (--seed), damit Messläufe vergleichbar bleiben.
+
+    python tools/seed_synthetic.py --leagues 50 --clubs 1000 --players 100000
+    python tools/seed_synthetic.py --clean                 # nur synthetische Daten löschen
+    python tools/seed_synthetic.py --user loadtest:geheim  # Login für tools/loadtest.py
+
+Synthetische Ligen haben land = SYNTH_LAND; --clean löscht genau diese mit
+ihren Clubs, Spielern und Trainern. Echte Importdaten bleiben unberührt.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+
+import db  # noqa: E402
+import leaderboards  # noqa: E402
+import resultcache  # noqa: E402
+from make_fixtures import COACHES, FIRST_NAMES, LAST_NAMES, POSITIONS  # noqa: E402
+
+SYNTH_LAND = "Synthetisch"
+NAME_LEN = 20  # VARCHAR(20) in Liga / Spieler / Cheftrainer
+
+
+def _ids(cur, sql, params):
+    cur.execute(sql, params)
+    return [r[0] for r in cur.fetchall()]
+
+
+def clean():
+    """Synthetische Ligen samt abhängigen Zeilen löschen (Kinder zuerst)."""
+    conn = db.get_conn()
+    cur = conn.cursor()
+    try:
+        leagues = _ids(cur, "SELECT liganr FROM Liga WHERE land = %s", (SYNTH_LAND,))
+        if not leagues:
+            return 0
+        marks = ", ".join(["%s"] * len(leagues))
+        club_sql = f"SELECT teamnr FROM Clubs WHERE liga IN ({marks})"
+        for table in ("Spieler", "Cheftrainer"):
+            cur.execute(f"DELETE FROM {table} WHERE team IN ({club_sql})", tuple(leagues))
+        cur.execute(f"DELETE FROM Clubs WHERE liga IN ({marks})", tuple(leagues))
+        cur.execute(f"DELETE FROM Liga WHERE liganr IN ({marks})", tuple(leagues))
+        conn.commit()
+        return len(leagues)
+    finally:
+        cur.close()
+        conn.close()
+
+
+def seed(n_leagues, n_clubs, n_players, rnd, method=None):
+    """Legt die Zeilen an und gibt [db.LoadStats] zurück."""
+    stats = []
+    stats.append(db.bulk_load(
+        "Liga", ("name", "land"),
+        [(f"Syn Liga {i}"[:NAME_LEN], SYNTH_LAND) for i in range(1, n_leagues + 1)],
+        method=method,
+    ))
+
+    conn = db.get_conn()
+    cur = conn.cursor()
+    try:
+        leagues = _ids(cur, "SELECT liganr FROM Liga WHERE land = %s ORDER BY liganr", (SYNTH_LAND,))[-n_leagues:]
+
+        # Clubs reihum auf die Ligen verteilen, Platzierung innerhalb der Liga
+        def club_rows():
+            for i in range(n_clubs):
+                liga = leagues[i % len(leagues)]
+                tore = rnd.randint(10, 90)
+                yield (liga, tore, rnd.randint(10, 90), f"Syn FC {i + 1}", i // len(leagues) + 1)
+
+        stats.append(db.bulk_load("Clubs", ("liga", "tore", "gegentore", "name", "platzierung"), club_rows(), method=method))
+        marks = ", ".join(["%s"] * len(leagues))
+        teams = _ids(cur, f"SELECT teamnr FROM Clubs WHERE liga IN ({marks}) ORDER BY teamnr", tuple(leagues))
+    finally:
+        cur.close()
+        conn.close()
+
+    def player_rows():
+        for _ in range(n_players):
+            yield (
+                rnd.choice(teams),
+                rnd.choice(FIRST_NAMES)[:NAME_LEN],
+                rnd.choice(LAST_NAMES)[:NAME_LEN],
+                rnd.randint(0, 40),
+                rnd.randint(0, 25),
+                # Marktwert in Mio., grob logarithmisch verteilt wie in echt
+                int(min(200, rnd.lognormvariate(1.5, 1.2))),
+                rnd.choice(POSITIONS)[:NAME_LEN],
+            )
+
+    stats.append(db.bulk_load(
+        "Spieler", ("team", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position"),
+        player_rows(), method=method,
+    ))
+
+    def coach_rows():
+        for team in teams:
+            vorname, nachname = rnd.choice(COACHES).split(" ", 1)
+            yield (team, vorname[:NAME_LEN], nachname[:NAME_LEN])
+
+    stats.append(db.bulk_load("Cheftrainer", ("team", "vorname", "nachname"), coach_rows(), method=method))
+    return stats
+
+
+def refresh_derived():
+    """bulk_load geht an leaderboards/resultcache vorbei: Ranglisten neu, Generation hoch."""
+    clubs, players = leaderboards.rebuild()
+    resultcache.bump()
+    print(f"Ranglisten neu aufgebaut: {clubs} Clubs, {players} Spieler")
+
+
+def ensure_user(spec):
+    """"name:passwort" anlegen, falls es den Benutzer noch nicht gibt."""
+    from auth import register_user
+
+    username, _, password = spec.partition(":")
+    if not password:
+        raise SystemExit("--user erwartet name:passwort")
+    return register_user(username, password)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetische Fussballdaten anlegen")
+    ap.add_argument("--leagues", type=int, default=50)
+    ap.add_argument("--clubs", type=int, default=1000)
+    ap.add_argument("--players", type=int, default=100000)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--method", choices=("insert", "infile"), default=None, help="Standard: DB_BULK_METHOD")
+    ap.add_argument("--clean", action="store_true", help="nur synthetische Daten löschen")
+    ap.add_argument("--keep", action="store_true", help="vorhandene synthetische Daten nicht vorher löschen")
+    ap.add_argument("--user", default="", help="Login für den Lasttest anlegen, z. B. loadtest:geheim")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    if args.clean or not args.keep:
+        n = clean()
+        print(f"{n} synthetische Ligen gelöscht ({time.perf_counter() - t0:.1f}s)")
+    if args.clean:
+        refresh_derived()
+        return
+
+    if args.leagues < 1 or args.clubs < 1:
+        raise SystemExit("--leagues und --clubs müssen mindestens 1 sein")
+    for s in seed(args.leagues, args.clubs, args.players, random.Random(args.seed), args.method):
+        print(f"  {s}")
+    refresh_derived()
+    if args.user:
+        created = ensure_user(args.user)
+        print(f"Benutzer {args.user.partition(':')[0]} {'angelegt' if created else 'existiert schon'}")
+    print(f"Fertig in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
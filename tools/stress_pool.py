@@ -0,0 +1,104 @@
+"""
+Lasttest für den Verbindungspool in db.py.
+
+Viele Threads holen gleichzeitig Verbindungen und halten sie kurz
+(SELECT SLEEP). Am Ende werden die Pool-Metriken ausgegeben.
+
+    DB_POOL_SIZE=2 DB_POOL_OVERFLOW=1 DB_POOL_TIMEOUT=2 python tools/stress_pool.py --threads 20
+
+Realistisch wird es mit einem eigenen MySQL-User mit kleinem Limit, z. B.:
+
+    CREATE USER 'pooltest'@'localhost' IDENTIFIED BY '...' WITH MAX_USER_CONNECTIONS 3;
+
+--kill-after N beendet nach N Sekunden alle Verbindungen des Users serverseitig
+(KILL), um das Wiederverbinden zu prüfen (braucht PROCESS/CONNECTION_ADMIN).
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db  # noqa: E402
+
+
+def worker(pool, n, hold, results, lock):
+    for _ in range(n):
+        try:
+            conn = pool.get_connection()
+        except db.PoolTimeout:
+            outcome = "timeout"
+        except Exception as e:
+            outcome = f"error: {type(e).__name__}"
+        else:
+            try:
+                cur = conn.cursor()
+                cur.execute("SELECT SLEEP(%s)", (hold,))
+                cur.fetchall()
+                cur.close()
+                outcome = "ok"
+            except Exception as e:
+                outcome = f"query error: {type(e).__name__}"
+            finally:
+                conn.close()
+        with lock:
+            results[outcome] = results.get(outcome, 0) + 1
+
+
+def kill_connections(after):
+    time.sleep(after)
+    conn = db.mysql.connector.connect(**db.DB_CONFIG)
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM information_schema.processlist WHERE user = CURRENT_USER() AND id <> CONNECTION_ID()")
+    ids = [r[0] for r in cur.fetchall()]
+    for pid in ids:
+        try:
+            cur.execute(f"KILL {int(pid)}")
+        except Exception:
+            pass
+    print(f"{len(ids)} Verbindungen serverseitig beendet")
+    cur.close()
+    conn.close()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threads", type=int, default=20)
+    ap.add_argument("--requests", type=int, default=10, help="Checkouts pro Thread")
+    ap.add_argument("--hold", type=float, default=0.05, help="Sekunden pro Abfrage")
+    ap.add_argument("--kill-after", type=float, default=0)
+    ap.add_argument("--ping-idle", type=float, default=None, help="überschreibt DB_POOL_PING_IDLE")
+    args = ap.parse_args()
+
+    pool = db.get_pool()
+    if args.ping_idle is not None:
+        pool.ping_idle = args.ping_idle
+
+    results = {}
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=worker, args=(pool, args.requests, args.hold, results, lock))
+        for _ in range(args.threads)
+    ]
+    if args.kill_after:
+        threading.Thread(target=kill_connections, args=(args.kill_after,), daemon=True).start()
+
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    print(f"{args.threads} Threads x {args.requests} Checkouts in {elapsed:.2f}s")
+    for outcome, n in sorted(results.items()):
+        print(f"  {outcome:20} {n}")
+    print("Pool:")
+    for k, v in pool.metrics().items():
+        print(f"  {k:12} {v:.1f}" if isinstance(v, float) else f"  {k:12} {v}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Lokaler Stub-Server, der die Fixture-Seiten aus fixtures/transfermarkt/
+unter den Transfermarkt-URLs ausliefert.
+
+    python tools/stub_server.py --port 8765 --latency 0.3 --throttle 7
+    TM_BASE=http://127.0.0.1:8765 TM_DELAY_SEC=0.5 python transfermarktimport.py
+
+--latency  künstliche Antwortzeit pro Request (Sekunden)
+--throttle jede N-te Anfrage mit 429 + Retry-After beantworten
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "fixtures", "transfermarkt")
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import make_fixtures  # noqa: E402
+
+# (URL-Muster, Dateiname) - die Saison wird ignoriert
+ROUTES = [
+    (re.compile(r"^/(?P<wid>[A-Z0-9]+)/tabelle/wettbewerb/(?P=wid)/saison_id/\d+"), "standings_{wid}.html"),
+    (re.compile(r"^/[^/]+/(?P<page>kader|leistungsdaten|startseite)/verein/(?P<id>\d+)"), "{page}_{id}.html"),
+]
+
+# Vereinsseiten ohne Fixture-Datei werden erzeugt (make_fixtures.CLUB_PAGES)
+STARTED = time.time()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    counter = itertools.count(1)
+    lock = threading.Lock()
+    latency = 0.0
+    throttle = 0
+    retry_after = 1
+
+    def do_GET(self):
+        with self.lock:
+            n = next(self.counter)
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.throttle and n % self.throttle == 0:
+            self.send_response(429)
+            self.send_header("Retry-After", str(self.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        found = self.resolve(self.path)
+        if not found:
+            self.send_error(404)
+            return
+
+        body, mtime = found
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        last_modified = formatdate(mtime, usegmt=True)
+
+        # Revalidierung wie ein echter Server (für htmlcache.py)
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    @staticmethod
+    def resolve(url_path):
+        """(body, mtime) für den Pfad, oder None."""
+        for pattern, name in ROUTES:
+            m = pattern.match(url_path)
+            if not m:
+                continue
+            path = os.path.join(FIXTURES, name.format(**m.groupdict()))
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    return f.read(), os.path.getmtime(path)
+            page = m.groupdict().get("page")
+            if page in make_fixtures.CLUB_PAGES:
+                return make_fixtures.CLUB_PAGES[page](int(m.group("id"))).encode("utf-8"), STARTED
+        return None
+
+
+def serve(port=8765, latency=0.0, throttle=0, retry_after=1):
+    """Startet den Server in einem Hintergrund-Thread, gibt ihn zurück."""
+    StubHandler.latency = latency
+    StubHandler.throttle = throttle
+    StubHandler.retry_after = retry_after
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--throttle", type=int, default=0)
+    ap.add_argument("--retry-after", type=int, default=1)
+    args = ap.parse_args()
+
+    server = serve(args.port, args.latency, args.throttle, args.retry_after)
+    print(f"Stub-Server auf http://127.0.0.1:{args.port} (Fixtures: {FIXTURES})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
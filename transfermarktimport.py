@@ -1,28 +1,35 @@
+import logging
 import os
 import re
-import time
+import threading
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
-# =====================================================
-# HARD DISABLE ALL PROXIES (VERY IMPORTANT)
-# =====================================================
-for k in [
-    "HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY",
-    "http_proxy", "https_proxy", "all_proxy", "no_proxy"
-]:
-    os.environ.pop(k, None)
+import tmparse
+from fetcher import Fetcher
+from htmlcache import HtmlCache
+from pipeline import PipelineStats
 
-import requests
-import pandas as pd
-from bs4 import BeautifulSoup
+logger = logging.getLogger(__name__)
 
 # =========================
 # Konfiguration
 # =========================
-BASE = "https://www.transfermarkt.com"
-SEASON_ID = 2025
-DELAY_SEC = 8.0  # stark erhöht gegen Block/Rate-Limit
+# TM_BASE zeigt für Tests auf tools/stub_server.py (z. B. http://127.0.0.1:8765)
+BASE = os.getenv("TM_BASE", "https://www.transfermarkt.com")
+SEASON_ID = int(os.getenv("TM_SEASON", "2025"))  # Saison der Live-Tabellen; ältere per backfill.py
+DELAY_SEC = float(os.getenv("TM_DELAY_SEC", "8.0"))  # stark erhöht gegen Block/Rate-Limit
+
+# Höflichkeitsbudget: im Schnitt ein Request pro DELAY_SEC, die Worker
+# überbrücken nur die Wartezeit auf die Antworten.
+FETCH_WORKERS = int(os.getenv("TM_WORKERS", "4"))
+FETCH_BURST = float(os.getenv("TM_BURST", "1"))
+
+# HTML-Cache auf der Platte (TM_CACHE_TTL=0 -> immer revalidieren)
+CACHE_DIR = os.getenv("TM_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "transfermarkt"))
+CACHE_TTL = float(os.getenv("TM_CACHE_TTL", str(6 * 3600)))
+CACHE_MAX_MB = float(os.getenv("TM_CACHE_MAX_MB", "200"))
+OFFLINE = os.getenv("TM_OFFLINE", "") == "1"  # Import nur aus dem Cache abspielen
 
 HEADERS = {
     "User-Agent": (
@@ -46,37 +53,72 @@ TOP_LEAGUES = [
 ]
 
 # =========================
-# HTTP Session (proxyfrei)
+# HTTP Session (proxyfrei), erst beim ersten Request
 # =========================
-SESSION = requests.Session()
-SESSION.trust_env = False  # <<< absolut entscheidend
+# Session, HTML-Cache und Fetcher entstehen in fetcher() statt beim Import:
+# die Web-Worker laden dieses Modul nur noch für einen Import-Job und sollen
+# beim Start weder requests laden noch die Proxy-Variablen umschreiben.
+SESSION = None
+CACHE = None
+FETCHER = None
+_setup_lock = threading.Lock()
 
-def get_html(url: str) -> str:
-    for attempt in range(3):
-        try:
-            r = SESSION.get(
-                url,
+
+def _session():
+    # =====================================================
+    # HARD DISABLE ALL PROXIES (VERY IMPORTANT)
+    # =====================================================
+    for k in [
+        "HTTP_PROXY", "HTTPS_PROXY", "ALL_PROXY", "NO_PROXY",
+        "http_proxy", "https_proxy", "all_proxy", "no_proxy"
+    ]:
+        os.environ.pop(k, None)
+
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.trust_env = False  # <<< absolut entscheidend
+    # Keep-Alive-Verbindungen für alle Worker wiederverwenden
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS))
+    session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=FETCH_WORKERS))
+    return session
+
+
+def fetcher() -> Fetcher:
+    global SESSION, CACHE, FETCHER
+    with _setup_lock:
+        if FETCHER is None:
+            SESSION = _session()
+            CACHE = HtmlCache(CACHE_DIR, ttl=CACHE_TTL, max_bytes=int(CACHE_MAX_MB * 1024 * 1024), offline=OFFLINE)
+            FETCHER = Fetcher(
+                SESSION,
                 headers=HEADERS,
-                timeout=40,
-                proxies={"http": None, "https": None},
+                rate=1.0 / DELAY_SEC,
+                burst=FETCH_BURST,
+                workers=FETCH_WORKERS,
+                cache=CACHE,
             )
-            if r.status_code == 403:
-                raise RuntimeError(f"403 Forbidden (Transfermarkt blockt): {url}")
-            r.raise_for_status()
-            return r.text
-        except Exception as e:
-            if attempt == 2:
-                raise
-            time.sleep(5 + attempt * 5)
+        return FETCHER
 
-def soup(url: str) -> BeautifulSoup:
-    return BeautifulSoup(get_html(url), "lxml")
+def set_offline(offline: bool = True):
+    global OFFLINE
+    OFFLINE = offline
+    if CACHE is not None:
+        CACHE.offline = offline
 
-def sleep_polite():
-    time.sleep(DELAY_SEC)
+def get_html(url: str) -> str:
+    return fetcher().get(url, SEASON_ID)
 
 def esc(s: Optional[str]) -> str:
-    return (s or "").replace("'", "''").strip()
+    return (s or "").replace("\\", "\\\\").replace("'", "''").strip()
+
+def sql_literal(v) -> str:
+    if v is None:
+        return "NULL"
+    if isinstance(v, int):
+        return str(v)
+    return f"'{esc(str(v))}'"
 
 def split_name(full: str) -> Tuple[str, Optional[str]]:
     parts = full.strip().split()
@@ -110,62 +152,276 @@ class ClubRow:
     gegentore: int
     wettbewerb_id: str
 
+def standings_url(wettbewerb_id, season=SEASON_ID):
+    return f"{BASE}/{wettbewerb_id}/tabelle/wettbewerb/{wettbewerb_id}/saison_id/{season}"
+
+def parse_top5_clubs(html):
+    # nur table.items wird geparst (tmparse), nicht die ganze Seite
+    return [(name, tm_id, tore, gegentore) for name, tm_id, tore, gegentore, _ in tmparse.parse_standings(html, 5)]
+
 def fetch_top5_clubs_from_standings(liganr, wettbewerb_id):
-    url = f"{BASE}/{wettbewerb_id}/tabelle/wettbewerb/{wettbewerb_id}/saison_id/{SEASON_ID}"
-    page = soup(url)
-    table = page.select_one("table.items")
-    rows = table.select("tbody tr")
-
-    out = []
-    for tr in rows:
-        rank = tr.select_one("td.zentriert")
-        if not rank or not rank.text.isdigit():
-            continue
-        r = int(rank.text)
-        if r > 5:
-            continue
+    return parse_top5_clubs(get_html(standings_url(wettbewerb_id)))
+
+# =========================
+# Kader und Trainer (Streaming-Pipeline)
+# =========================
+# Pro Verein drei Seiten: Kader (Name, Position, Marktwert),
+# Leistungsdaten (Tore, Vorlagen) und Startseite (Trainer).
+CLUB_PAGES = ("kader", "leistungsdaten", "startseite")
+NAME_LEN = 20  # vorname/nachname/position sind VARCHAR(20)
+
+@dataclass
+class PlayerRow:
+    tm_id: int
+    club: ClubRow
+    vorname: Optional[str]
+    nachname: str
+    tore: int
+    vorlagen: int
+    marktwert: int
+    position: Optional[str]
+
+@dataclass
+class CoachRow:
+    tm_id: int
+    club: ClubRow
+    vorname: Optional[str]
+    nachname: str
+
+def club_slug(name):
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "-"
+
+def club_page_url(club, page, season=SEASON_ID):
+    slug = club_slug(club.name)
+    if page == "kader":
+        return f"{BASE}/{slug}/kader/verein/{club.tm_id}/saison_id/{season}/plus/1"
+    if page == "leistungsdaten":
+        return f"{BASE}/{slug}/leistungsdaten/verein/{club.tm_id}/reldata/{club.wettbewerb_id}%26{season}/plus/1"
+    return f"{BASE}/{slug}/startseite/verein/{club.tm_id}/saison_id/{season}"
+
+def person_name(full):
+    """(vorname, nachname), gekürzt auf NAME_LEN; Einzelnamen ("Rodri") sind Nachnamen."""
+    vorname, nachname = split_name(full)
+    if nachname is None:
+        vorname, nachname = None, vorname
+    return (vorname[:NAME_LEN] if vorname else None), nachname[:NAME_LEN]
+
+class SquadPipeline:
+    """
+    Vereine -> fetch -> parse -> normalize -> (Loader), alles Generatoren:
+    Spieler eines Vereins sind schon geschrieben, während spätere Vereine
+    noch geholt werden. Gleichzeitig offen sind nur die Seiten im Fenster
+    von Fetcher.imap, gepuffert nur Vereine mit noch unvollständigen Seiten.
 
-        club = tr.select_one("td.hauptlink a")
-        href = club.get("href", "")
-        tm_id = int(re.search(r"/verein/(\d+)", href).group(1))
+    Iterieren liefert PlayerRow; die Trainer (einer pro Verein) landen
+    nebenbei in self.coaches. self.stats zählt pro Stufe.
+    """
 
-        score = re.search(r"(\d+)\s*:\s*(\d+)", tr.text)
-        tore, gegentore = (int(score.group(1)), int(score.group(2))) if score else (0, 0)
+    def __init__(self, clubs, progress=None, season=SEASON_ID):
+        self.clubs = clubs
+        self.progress = progress
+        self.season = season
+        self.coaches = []
+        self._coach_ids = set()
+        self.stats = PipelineStats(sink="write")
 
-        out.append((club.text.strip(), tm_id, tore, gegentore, r))
+    def jobs(self):
+        for club in self.clubs:
+            for page in CLUB_PAGES:
+                yield (club, page), club_page_url(club, page, self.season)
 
-    out.sort(key=lambda x: x[4])
-    return [(a, b, c, d) for a, b, c, d, _ in out]
+    def fetch(self):
+        for (club, page), url, html, err in fetcher().imap(self.jobs(), self.season):
+            if err:
+                raise err
+            if self.progress:
+                self.progress.page_fetched()
+            yield club, page, html
+
+    def parse(self, pages):
+        waiting = {}
+        for club, page, html in pages:
+            got = waiting.setdefault(club.tm_id, {})
+            got[page] = html
+            if len(got) < len(CLUB_PAGES):
+                continue
+            del waiting[club.tm_id]
+            yield (
+                club,
+                tmparse.parse_squad(got["kader"]),
+                tmparse.parse_performance(got["leistungsdaten"]),
+                tmparse.parse_coach(got["startseite"]),
+            )
+
+    @staticmethod
+    def normalize_club(club, squad, performance, coach):
+        """Geparste Seiten eines Vereins -> ([PlayerRow], CoachRow oder None)."""
+        players = []
+        for tm_id, name, position, mv in squad:
+            vorname, nachname = person_name(name)
+            tore, vorlagen = performance.get(tm_id, (0, 0))
+            players.append(PlayerRow(
+                tm_id, club, vorname, nachname, tore, vorlagen,
+                mv_to_int_million(mv), position[:NAME_LEN] if position else None,
+            ))
+        coach_row = CoachRow(coach[0], club, *person_name(coach[1])) if coach else None
+        return players, coach_row
+
+    def normalize(self, parsed):
+        seen = set()  # Spieler-IDs sind UNIQUE (Wechsel in der Saison -> doppelt gelistet)
+        for parsed_club in parsed:
+            players, coach = self.normalize_club(*parsed_club)
+            if coach and coach.tm_id not in self._coach_ids:
+                self._coach_ids.add(coach.tm_id)
+                self.coaches.append(coach)
+            for p in players:
+                if p.tm_id not in seen:
+                    seen.add(p.tm_id)
+                    yield p
+            if self.progress:
+                self.progress.set_stages(str(self.stats))
+
+    def __iter__(self):
+        pages = self.stats.stage("fetch", self.fetch())
+        parsed = self.stats.stage("parse", self.parse(pages))
+        players = self.stats.stage("normalize", self.normalize(parsed))
+        yield from players
+        logger.info("Kader-Pipeline: %s", self.stats)
+        if self.progress:
+            self.progress.set_stages(str(self.stats))
+
+def _collect(items, into):
+    for item in items:
+        into.append(item)
+        yield item
 
 # =========================
-# SQL Builder
+# Zeilen für den Bulk-Loader (db.bulk_load)
 # =========================
-def build_sql() -> str:
-    lines = ["SET FOREIGN_KEY_CHECKS=0;"]
+LIGA_COLUMNS = ("liganr", "tm_id", "name", "land")
+CLUB_COLUMNS = ("teamnr", "tm_id", "liga", "tore", "gegentore", "name", "platzierung")
 
-    # Liga
-    lines.append("INSERT INTO Liga (liganr, name, land) VALUES")
-    lines.append(",\n".join(
-        f"({l['liganr']}, '{esc(l['name'])}', '{esc(l['land'])}')"
-        for l in TOP_LEAGUES
-    ) + ";")
+def liga_rows(leagues=TOP_LEAGUES):
+    for l in leagues:
+        yield (l["liganr"], l["wettbewerb_id"], l["name"], l["land"])
 
-    clubs = []
+def iter_clubs(leagues=TOP_LEAGUES, progress=None, season=SEASON_ID):
+    """
+    ClubRow pro Club, sobald die Tabelle seiner Liga da ist
+    (Reihenfolge = Fertigstellung der Requests, nicht TOP_LEAGUES).
+    progress (jobs.ImportProgress) zählt die Seiten und kann abbrechen.
+    """
+    by_url = {standings_url(l["wettbewerb_id"], season): l for l in leagues}
     teamnr = 1
-    for l in TOP_LEAGUES:
-        for name, tm_id, tore, gegentore in fetch_top5_clubs_from_standings(l["liganr"], l["wettbewerb_id"]):
-            clubs.append(ClubRow(teamnr, l["liganr"], name, tm_id, teamnr % 5 + 1, tore, gegentore, l["wettbewerb_id"]))
+    for url, html, err in fetcher().map(by_url, season):
+        if err:
+            raise err
+        if progress:
+            progress.page_fetched()
+        l = by_url[url]
+        for name, tm_id, tore, gegentore, platz in tmparse.parse_standings(html, 5):
+            yield ClubRow(teamnr, l["liganr"], name, tm_id, platz, tore, gegentore, l["wettbewerb_id"])
             teamnr += 1
-        sleep_polite()
 
-    lines.append("INSERT INTO Clubs (teamnr, liga, tore, gegentore, name, platzierung) VALUES")
-    lines.append(",\n".join(
-        f"({c.teamnr},{c.liganr},{c.tore},{c.gegentore},'{esc(c.name)}',{c.platz})"
-        for c in clubs
-    ) + ";")
+def club_rows(clubs):
+    for c in clubs:
+        yield (c.teamnr, c.tm_id, c.liganr, c.tore, c.gegentore, c.name, c.platz)
+
+SPIELER_COLUMNS = ("tm_id", "team", "vorname", "nachname", "tore", "vorlagen", "marktwert", "position")
+TRAINER_COLUMNS = ("tm_id", "team", "vorname", "nachname")
+
+def spieler_rows(players):
+    for p in players:
+        yield (p.tm_id, p.club.teamnr, p.vorname, p.nachname, p.tore, p.vorlagen, p.marktwert, p.position)
+
+def trainer_rows(squads):
+    # erst lesen, wenn die Spieler durch sind (dann ist squads.coaches voll)
+    for c in squads.coaches:
+        yield (c.tm_id, c.club.teamnr, c.vorname, c.nachname)
+
+def import_tables(leagues=TOP_LEAGUES, progress=None):
+    """
+    [(tabelle, spalten, zeilen)] in FK-Reihenfolge. Die Zeilen sind Generatoren:
+    die Seiten werden erst geholt, während der Loader schreibt. Die Tabellen
+    müssen in dieser Reihenfolge geladen werden (Kader braucht die Clubs).
+    """
+    clubs = []
+    squads = SquadPipeline(clubs, progress)
+    return [
+        ("Liga", LIGA_COLUMNS, liga_rows(leagues)),
+        ("Clubs", CLUB_COLUMNS, club_rows(_collect(iter_clubs(leagues, progress), clubs))),
+        ("Spieler", SPIELER_COLUMNS, spieler_rows(squads)),
+        ("Cheftrainer", TRAINER_COLUMNS, trainer_rows(squads)),
+    ]
+
+# =========================
+# Datensätze für den inkrementellen Import (importer.run_incremental_import)
+# =========================
+# Schlüssel ist die Transfermarkt-ID; Fremdschlüssel zeigen auf die tm_id
+# der Elterntabelle (liga -> Liga.tm_id), nicht auf liganr/teamnr.
+def liga_records(leagues=TOP_LEAGUES):
+    for l in leagues:
+        yield {"tm_id": l["wettbewerb_id"], "name": l["name"], "land": l["land"]}
+
+def club_records(clubs):
+    for c in clubs:
+        yield {
+            "tm_id": c.tm_id,
+            "liga": c.wettbewerb_id,
+            "tore": c.tore,
+            "gegentore": c.gegentore,
+            "name": c.name,
+            "platzierung": c.platz,
+        }
+
+def spieler_records(players):
+    for p in players:
+        yield {
+            "tm_id": p.tm_id,
+            "team": p.club.tm_id,
+            "vorname": p.vorname,
+            "nachname": p.nachname,
+            "tore": p.tore,
+            "vorlagen": p.vorlagen,
+            "marktwert": p.marktwert,
+            "position": p.position,
+        }
+
+def trainer_records(squads):
+    for c in squads.coaches:
+        yield {"tm_id": c.tm_id, "team": c.club.tm_id, "vorname": c.vorname, "nachname": c.nachname}
+
+def import_records(leagues=TOP_LEAGUES, progress=None):
+    """(tabelle, datensätze) in FK-Reihenfolge; jede Tabelle vor der nächsten lesen."""
+    clubs = []
+    squads = SquadPipeline(clubs, progress)
+    yield "Liga", liga_records(leagues)
+    yield "Clubs", club_records(_collect(iter_clubs(leagues, progress), clubs))
+    yield "Spieler", spieler_records(squads)
+    yield "Cheftrainer", trainer_records(squads)
+
+# =========================
+# SQL Builder (Export)
+# =========================
+def build_sql(leagues=TOP_LEAGUES) -> str:
+    lines = ["SET FOREIGN_KEY_CHECKS=0;"]
+
+    for table, columns, rows in import_tables(leagues):
+        values = [f"({', '.join(sql_literal(v) for v in row)})" for row in rows]
+        if not values:
+            continue
+        lines.append(f"INSERT INTO {table} ({', '.join(columns)}) VALUES")
+        lines.append(",\n".join(values) + ";")
 
     lines.append("SET FOREIGN_KEY_CHECKS=1;")
     return "\n".join(lines)
 
 if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Transfermarkt-Import als SQL ausgeben")
+    ap.add_argument("--offline", action="store_true", help="nur aus dem HTML-Cache lesen")
+    args = ap.parse_args()
+    if args.offline:
+        set_offline(True)
     print(build_sql())